@@ -120,6 +120,8 @@ class LLMSession:
         self.window_size = window_size
         self.llm_client = llm_client
         self._trimmed_summary: Optional[str] = None
+        # get_messages 渲染缓存，消息变更时置空
+        self._rendered: Optional[List[Dict[str, Any]]] = None
 
         if session_id is None:
             session_id = f"{agent_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -152,6 +154,7 @@ class LLMSession:
         )
         self.state.messages.append(msg)
         self.state.updated_at = datetime.now()
+        self._rendered = None
 
         # 超过最大数量时裁剪
         if len(self.state.messages) > self.max_messages:
@@ -238,7 +241,7 @@ class LLMSession:
             use_window: 是否使用滑动窗口
 
         Returns:
-            消息列表
+            消息列表 (非窗口模式下返回缓存列表，调用方请勿原地修改)
         """
         if use_window:
             msgs = self._trim_to_window()
@@ -254,8 +257,14 @@ class LLMSession:
             result.extend([{"role": m.role, "content": m.content} for m in msgs])
             return result
 
-        msgs = self.state.messages[-limit:] if limit else self.state.messages
-        return [{"role": m.role, "content": m.content} for m in msgs]
+        rendered = self._rendered
+        if rendered is None:
+            rendered = self._rendered = [
+                {"role": m.role, "content": m.content} for m in self.state.messages
+            ]
+        if limit and limit < len(rendered):
+            return rendered[-limit:]
+        return rendered
 
     def set_context(self, key: str, value: Any) -> None:
         """设置上下文"""
@@ -303,6 +312,7 @@ class LLMSession:
             with open(file_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
             self.state = SessionState.from_dict(data)
+            self._rendered = None
             return True
         except Exception as e:
             print(f"加载会话失败: {e}")
@@ -313,6 +323,7 @@ class LLMSession:
         self.state.messages = []
         self.state.context = {}
         self.state.updated_at = datetime.now()
+        self._rendered = None
 
     def list_sessions(self) -> List[str]:
         """列出所有会话"""
@@ -10,14 +10,84 @@ Provides visualization tools for agent decision chains:
 
 from __future__ import annotations
 
+import functools
+import io
 import json
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from html import escape
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson
 
-@dataclass
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+# Precomputed fragments for the to_html decision table
+_ROW_TMPL = (
+    "<tr><td>{indent}{agent}</td><td>{decision}</td><td>{rationale}</td>"
+    '<td class="{conf_class}">{confidence:.0%}</td><td>{timestamp}</td></tr>\n'
+)
+_INDENT_CACHE = tuple("&nbsp;" * (depth * 4) for depth in range(32))
+
+# Confidence class definitions appended to every Mermaid diagram
+_MERMAID_CLASS_DEFS = (
+    "\n"
+    "\n    classDef high fill:#90EE90,stroke:#228B22"
+    "\n    classDef medium fill:#FFD700,stroke:#DAA520"
+    "\n    classDef low fill:#FFA07A,stroke:#CD5C5C"
+)
+
+# ANSI colors and tree indents for to_cli
+_GREEN, _YELLOW, _RED, _BLUE, _GRAY, _RESET = (
+    "\033[92m", "\033[93m", "\033[91m", "\033[94m", "\033[90m", "\033[0m"
+)
+_CLI_INDENTS = tuple("│   " * depth for depth in range(64))
+
+
+@functools.lru_cache(maxsize=4096)
+def _esc(text: str) -> str:
+    """HTML-escape user-supplied text (memoized for repeated exports)."""
+    return escape(text)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mermaid_label(text: str) -> str:
+    """Quote-safe, truncated Mermaid label (memoized for repeated exports)."""
+    if '"' in text:
+        text = text.replace('"', "'")
+    return text[:40]
+
+
+def _html_indent(depth: int) -> str:
+    """Return the table indent for a tree depth, cached for shallow depths."""
+    if depth < len(_INDENT_CACHE):
+        return _INDENT_CACHE[depth]
+    return "&nbsp;" * (depth * 4)
+
+
+def _cli_indent(depth: int) -> str:
+    """Return the CLI tree indent for a depth, cached for shallow depths."""
+    if depth < len(_CLI_INDENTS):
+        return _CLI_INDENTS[depth]
+    return "│   " * depth
+
+
+def _confidence_tier(confidence: float) -> str:
+    """Map a confidence value to its display tier."""
+    if confidence >= 0.8:
+        return "high"
+    if confidence >= 0.5:
+        return "medium"
+    return "low"
+
+
+@dataclass(slots=True)
 class DecisionNode:
     """
     A node in a decision tree.
@@ -40,6 +110,18 @@ class DecisionNode:
     timestamp: Optional[str] = None
     children: List["DecisionNode"] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    _tier: str = field(default="", init=False, repr=False, compare=False)
+    _tier_confidence: Optional[float] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def tier(self) -> str:
+        """Confidence tier ("high" / "medium" / "low"), computed once per confidence value."""
+        if self._tier_confidence != self.confidence:
+            self._tier = _confidence_tier(self.confidence)
+            self._tier_confidence = self.confidence
+        return self._tier
 
     def add_child(self, child: "DecisionNode") -> None:
         """Add a child decision node."""
@@ -58,6 +140,26 @@ class DecisionNode:
             "metadata": self.metadata,
         }
 
+    def _json_fields(self) -> Dict[str, Any]:
+        """Shallow dict for JSON encoders; children stay nodes and are encoded lazily."""
+        return {
+            "id": self.id,
+            "agent": self.agent,
+            "decision": self.decision,
+            "rationale": self.rationale,
+            "confidence": self.confidence,
+            "timestamp": self.timestamp,
+            "children": self.children,
+            "metadata": self.metadata,
+        }
+
+
+def _encode_node(obj: Any) -> Dict[str, Any]:
+    """JSON ``default`` hook that expands DecisionNode one level at a time."""
+    if isinstance(obj, DecisionNode):
+        return obj._json_fields()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 
 class DecisionVisualizer:
     """
@@ -86,6 +188,7 @@ class DecisionVisualizer:
         self.title = title
         self.decisions: List[DecisionNode] = []
         self._node_counter = 0
+        self._index: Dict[str, DecisionNode] = {}
 
     def add_decision(
         self,
@@ -122,9 +225,10 @@ class DecisionVisualizer:
             timestamp=datetime.now().isoformat(),
             metadata=metadata,
         )
+        self._index[node_id] = node
 
         if parent_id:
-            parent = self._find_node(parent_id)
+            parent = self._index.get(parent_id)
             if parent:
                 parent.add_child(node)
             else:
@@ -135,16 +239,17 @@ class DecisionVisualizer:
         return node_id
 
     def _find_node(self, node_id: str) -> Optional[DecisionNode]:
-        """Find a node by ID (DFS)."""
-        def search(nodes: List[DecisionNode]) -> Optional[DecisionNode]:
-            for node in nodes:
-                if node.id == node_id:
-                    return node
-                found = search(node.children)
-                if found:
-                    return found
-            return None
-        return search(self.decisions)
+        """Find a node by ID (index lookup, iterative DFS fallback)."""
+        node = self._index.get(node_id)
+        if node is not None:
+            return node
+        stack = deque(reversed(self.decisions))
+        while stack:
+            node = stack.pop()
+            if node.id == node_id:
+                return node
+            stack.extend(reversed(node.children))
+        return None
 
     def to_mermaid(self, direction: str = "TD") -> str:
         """
@@ -156,28 +261,40 @@ class DecisionVisualizer:
         Returns:
             str: Mermaid diagram markup
         """
-        lines = [f"graph {direction}"]
-
-        def render_node(node: DecisionNode, parent_id: Optional[str] = None) -> None:
-            # Escape special characters
-            label = node.decision.replace('"', "'")[:40]
-            conf_pct = int(node.confidence * 100)
-
-            # Style based on confidence
-            if node.confidence >= 0.8:
-                shape = f"{node.id}[[\"{node.agent}: {label}\n({conf_pct}%)\"]]"
-            elif node.confidence >= 0.5:
-                shape = f"{node.id}[\"{node.agent}: {label}\n({conf_pct}%)\"]"
-            else:
-                shape = f"{node.id}([\"{node.agent}: {label}\n({conf_pct}%)\"])"
-
-            lines.append(f"    {shape}")
-
-            if parent_id:
-                lines.append(f"    {parent_id} --> {node.id}")
-
-            for child in node.children:
-                render_node(child, node.id)
+        buf = io.StringIO()
+        write = buf.write
+        write(f"graph {direction}")
+        high_nodes: List[str] = []
+        medium_nodes: List[str] = []
+        low_nodes: List[str] = []
+
+        def render_node(root: DecisionNode, root_parent_id: Optional[str]) -> None:
+            stack = deque([(root, root_parent_id)])
+            while stack:
+                node, parent_id = stack.pop()
+                # Escape special characters
+                label = _mermaid_label(node.decision)
+                conf_pct = int(node.confidence * 100)
+
+                # Style based on confidence (shape and class in one pass)
+                tier = node.tier
+                if tier == "high":
+                    shape = f"{node.id}[[\"{node.agent}: {label}\n({conf_pct}%)\"]]"
+                    high_nodes.append(node.id)
+                elif tier == "medium":
+                    shape = f"{node.id}[\"{node.agent}: {label}\n({conf_pct}%)\"]"
+                    medium_nodes.append(node.id)
+                else:
+                    shape = f"{node.id}([\"{node.agent}: {label}\n({conf_pct}%)\"])"
+                    low_nodes.append(node.id)
+
+                write("\n    ")
+                write(shape)
+
+                if parent_id:
+                    write(f"\n    {parent_id} --> {node.id}")
+
+                stack.extend((child, node.id) for child in reversed(node.children))
 
         # Render chain
         prev_id = None
@@ -187,39 +304,17 @@ class DecisionVisualizer:
                 prev_id = node.id
 
         # Add styling
-        lines.extend([
-            "",
-            "    classDef high fill:#90EE90,stroke:#228B22",
-            "    classDef medium fill:#FFD700,stroke:#DAA520",
-            "    classDef low fill:#FFA07A,stroke:#CD5C5C",
-        ])
+        write(_MERMAID_CLASS_DEFS)
 
         # Apply styles
-        high_nodes = []
-        medium_nodes = []
-        low_nodes = []
-
-        def categorize(node: DecisionNode):
-            if node.confidence >= 0.8:
-                high_nodes.append(node.id)
-            elif node.confidence >= 0.5:
-                medium_nodes.append(node.id)
-            else:
-                low_nodes.append(node.id)
-            for child in node.children:
-                categorize(child)
-
-        for node in self.decisions:
-            categorize(node)
-
         if high_nodes:
-            lines.append(f"    class {','.join(high_nodes)} high")
+            write(f"\n    class {','.join(high_nodes)} high")
         if medium_nodes:
-            lines.append(f"    class {','.join(medium_nodes)} medium")
+            write(f"\n    class {','.join(medium_nodes)} medium")
         if low_nodes:
-            lines.append(f"    class {','.join(low_nodes)} low")
+            write(f"\n    class {','.join(low_nodes)} low")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     def to_cli(self, use_color: bool = True) -> str:
         """
@@ -233,53 +328,71 @@ class DecisionVisualizer:
         """
         lines = [f"=== {self.title} ===", ""]
 
-        def color(text: str, code: str) -> str:
-            if use_color:
-                return f"\033[{code}m{text}\033[0m"
-            return text
+        if use_color:
+            green, yellow, red, blue, gray, reset = (
+                _GREEN, _YELLOW, _RED, _BLUE, _GRAY, _RESET
+            )
+        else:
+            green = yellow = red = blue = gray = reset = ""
+        rationale_label = gray + "Rationale:" + reset
+        tier_colors = {"high": green, "medium": yellow, "low": red}
 
-        def render_node(node: DecisionNode, indent: int = 0) -> None:
-            prefix = "│   " * indent + "├── " if indent > 0 else ""
+        def render_node(node: DecisionNode, indent: int) -> None:
+            prefix = _cli_indent(indent) + "├── " if indent > 0 else ""
 
             # Color based on confidence
-            if node.confidence >= 0.8:
-                conf_text = color(f"[{node.confidence:.0%}]", "92")  # Green
-            elif node.confidence >= 0.5:
-                conf_text = color(f"[{node.confidence:.0%}]", "93")  # Yellow
-            else:
-                conf_text = color(f"[{node.confidence:.0%}]", "91")  # Red
-
-            agent_text = color(node.agent, "94")  # Blue
+            conf_color = tier_colors[node.tier]
+            conf_text = conf_color + f"[{node.confidence:.0%}]" + reset
 
-            lines.append(f"{prefix}{agent_text}: {node.decision} {conf_text}")
+            lines.append(
+                prefix + blue + node.agent + reset + ": " + node.decision + " " + conf_text
+            )
 
             if node.rationale:
-                rationale_prefix = "│   " * (indent + 1) if indent >= 0 else "    "
-                lines.append(f"{rationale_prefix}└─ {color('Rationale:', '90')} {node.rationale}")
+                lines.append(
+                    _cli_indent(indent + 1) + "└─ " + rationale_label + " " + node.rationale
+                )
 
-            for child in node.children:
-                render_node(child, indent + 1)
-
-        for i, node in enumerate(self.decisions):
+        for i, root in enumerate(self.decisions):
             if i > 0:
                 lines.append("│")
-            render_node(node)
+            stack = deque([(root, 0)])
+            while stack:
+                node, indent = stack.pop()
+                render_node(node, indent)
+                stack.extend((child, indent + 1) for child in reversed(node.children))
 
         lines.append("")
         lines.append(f"Total decisions: {self._count_decisions()}")
 
         return "\n".join(lines)
 
+    def _walk(self) -> List[Tuple[DecisionNode, int]]:
+        """Flatten the tree in pre-order as (node, depth) pairs (iterative DFS)."""
+        result: List[Tuple[DecisionNode, int]] = []
+        append = result.append
+        # Parallel node/depth stacks avoid a tuple per pushed child
+        nodes = list(reversed(self.decisions))
+        depths = [0] * len(nodes)
+        pop_node, pop_depth = nodes.pop, depths.pop
+        while nodes:
+            node = pop_node()
+            depth = pop_depth()
+            append((node, depth))
+            children = node.children
+            if children:
+                nodes.extend(children[::-1])
+                depths.extend([depth + 1] * len(children))
+        return result
+
+    def _stats(self) -> Tuple[int, List[DecisionNode], float]:
+        """Single pass over the tree: (count, flattened nodes, confidence sum)."""
+        nodes = self._all_nodes()
+        return len(nodes), nodes, sum(n.confidence for n in nodes)
+
     def _count_decisions(self) -> int:
         """Count total decisions."""
-        count = 0
-        def count_recursive(nodes: List[DecisionNode]):
-            nonlocal count
-            for node in nodes:
-                count += 1
-                count_recursive(node.children)
-        count_recursive(self.decisions)
-        return count
+        return len(self._all_nodes())
 
     def to_html(self) -> str:
         """
@@ -288,36 +401,38 @@ class DecisionVisualizer:
         Returns:
             str: HTML content
         """
-        mermaid = self.to_mermaid()
+        # Mermaid reads the div's text content, so entities are decoded
+        # before parsing; escaping keeps agent/decision text out of the DOM
+        mermaid = escape(self.to_mermaid())
 
-        # Build decisions table
-        rows = []
-        def add_row(node: DecisionNode, depth: int = 0):
-            indent = "&nbsp;" * (depth * 4)
-            conf_class = "high" if node.confidence >= 0.8 else "medium" if node.confidence >= 0.5 else "low"
-            rows.append(f"""
-                <tr>
-                    <td>{indent}{node.agent}</td>
-                    <td>{node.decision}</td>
-                    <td>{node.rationale or '-'}</td>
-                    <td class="{conf_class}">{node.confidence:.0%}</td>
-                    <td>{node.timestamp or '-'}</td>
-                </tr>
-            """)
-            for child in node.children:
-                add_row(child, depth + 1)
-
-        for node in self.decisions:
-            add_row(node)
+        count, nodes, conf_sum = self._stats()
+        agent_count = len({n.agent for n in nodes})
+        avg_confidence = conf_sum / count if count else 0.0
 
-        table_rows = "\n".join(rows)
+        # Build decisions table
+        buf = io.StringIO()
+        write = buf.write
+        for node, depth in self._walk():
+            conf_class = node.tier
+            write(_ROW_TMPL.format_map({
+                "indent": _html_indent(depth),
+                "agent": _esc(node.agent),
+                "decision": _esc(node.decision),
+                "rationale": _esc(node.rationale) if node.rationale else "-",
+                "conf_class": conf_class,
+                "confidence": node.confidence,
+                "timestamp": _esc(str(node.timestamp)) if node.timestamp else "-",
+            }))
+
+        table_rows = buf.getvalue()
+        title = _esc(self.title)
 
         html = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title}</title>
+    <title>{title}</title>
     <script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
     <style>
         body {{
@@ -397,22 +512,22 @@ class DecisionVisualizer:
 </head>
 <body>
     <div class="container">
-        <h1>🤖 {self.title}</h1>
+        <h1>🤖 {title}</h1>
         <p class="timestamp">Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
 
         <div class="section">
             <h2>📊 Summary</h2>
             <div class="stats">
                 <div class="stat-card">
-                    <div class="stat-value">{self._count_decisions()}</div>
+                    <div class="stat-value">{count}</div>
                     <div class="stat-label">Decisions</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{len(set(n.agent for n in self._all_nodes()))}</div>
+                    <div class="stat-value">{agent_count}</div>
                     <div class="stat-label">Agents</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{self._avg_confidence():.0%}</div>
+                    <div class="stat-value">{avg_confidence:.0%}</div>
                     <div class="stat-label">Avg Confidence</div>
                 </div>
             </div>
@@ -453,21 +568,23 @@ class DecisionVisualizer:
         return html
 
     def _all_nodes(self) -> List[DecisionNode]:
-        """Get all nodes flattened."""
-        nodes = []
-        def collect(node_list: List[DecisionNode]):
-            for node in node_list:
-                nodes.append(node)
-                collect(node.children)
-        collect(self.decisions)
+        """Get all nodes flattened (pre-order)."""
+        nodes: List[DecisionNode] = []
+        append = nodes.append
+        stack = self.decisions[::-1]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node = pop()
+            append(node)
+            children = node.children
+            if children:
+                extend(children[::-1])
         return nodes
 
     def _avg_confidence(self) -> float:
         """Calculate average confidence."""
-        nodes = self._all_nodes()
-        if not nodes:
-            return 0.0
-        return sum(n.confidence for n in nodes) / len(nodes)
+        count, _, conf_sum = self._stats()
+        return conf_sum / count if count else 0.0
 
     def export_html(self, path: str) -> None:
         """Export HTML report to file."""
@@ -479,14 +596,29 @@ class DecisionVisualizer:
             "title": self.title,
             "generated": datetime.now().isoformat(),
             "total_decisions": self._count_decisions(),
-            "decisions": [d.to_dict() for d in self.decisions],
+            "decisions": self.decisions,
         }
-        Path(path).write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        if HAS_ORJSON:
+            try:
+                payload = orjson.dumps(
+                    data, default=_encode_node, option=orjson.OPT_INDENT_2
+                )
+            except orjson.JSONEncodeError:
+                pass  # e.g. nesting deeper than orjson supports
+            else:
+                Path(path).write_bytes(payload)
+                return
+
+        # Serialize fully before opening the file so an encoding error
+        # cannot leave a truncated export behind
+        payload = json.dumps(data, indent=2, ensure_ascii=False, default=_encode_node)
+        Path(path).write_text(payload, encoding="utf-8")
 
     def clear(self) -> None:
         """Clear all decisions."""
         self.decisions.clear()
         self._node_counter = 0
+        self._index.clear()
 
 
 def visualize_from_records(records: list, title: str = "Decision Chain") -> DecisionVisualizer:
@@ -494,20 +626,25 @@ def visualize_from_records(records: list, title: str = "Decision Chain") -> Deci
     Create a visualizer from DecisionRecord list.
 
     Args:
-        records: List of DecisionRecord from StructuredLogger
+        records: List of DecisionRecord from StructuredLogger (or plain dicts)
         title: Visualization title
 
     Returns:
         DecisionVisualizer instance
     """
     viz = DecisionVisualizer(title)
+    add = viz.add_decision
     for record in records:
-        viz.add_decision(
-            agent=record.agent if hasattr(record, 'agent') else record.get('agent', 'unknown'),
-            decision=record.decision if hasattr(record, 'decision') else record.get('decision', ''),
-            rationale=record.rationale if hasattr(record, 'rationale') else record.get('rationale', ''),
-            confidence=record.confidence if hasattr(record, 'confidence') else record.get('confidence', 0.0),
-        )
+        # One type check per record instead of four hasattr probes
+        if isinstance(record, dict):
+            add(
+                record.get('agent', 'unknown'),
+                record.get('decision', ''),
+                record.get('rationale', ''),
+                record.get('confidence', 0.0),
+            )
+        else:
+            add(record.agent, record.decision, record.rationale, record.confidence)
     return viz
 
 
@@ -6,13 +6,35 @@ Provides automatic tracing of agent actions with OpenTelemetry-compatible output
 
 import functools
 import logging
-from typing import Any, Callable, Dict, List, Optional
+import os
+import queue
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from os import urandom
 
 logger = logging.getLogger(__name__)
 
+# (epoch seconds, isoformat) of the last formatted event timestamp
+_ts_cache: Tuple[float, str] = (0.0, "")
+
+
+def _iso_now() -> str:
+    """Current time in ISO format, reused for events within the same millisecond"""
+    global _ts_cache
+    now = time.time()
+    cached_at, cached = _ts_cache
+    if 0.0 <= now - cached_at < 0.001:
+        return cached
+    iso = datetime.fromtimestamp(now).isoformat()
+    _ts_cache = (now, iso)
+    return iso
+
 
 class TraceLevel(Enum):
     """Trace verbosity levels"""
@@ -22,12 +44,14 @@ class TraceLevel(Enum):
     VERBOSE = 3  # All actions
 
 
-@dataclass
+@dataclass(slots=True)
 class Span:
     """
     A single span in a trace
 
     Represents one unit of work (e.g., one think() or vote() call).
+    Timestamps are kept as epoch seconds and only formatted in to_dict();
+    durations come from the monotonic clock (start_ns/end_ns).
     """
 
     trace_id: str
@@ -35,32 +59,45 @@ class Span:
     parent_span_id: Optional[str]
     operation_name: str
     agent_name: str
-    start_time: datetime
-    end_time: Optional[datetime] = None
+    start_time: float
+    end_time: Optional[float] = None
     status: str = "OK"
     attributes: Dict[str, Any] = field(default_factory=dict)
     events: List[Dict[str, Any]] = field(default_factory=list)
+    start_ns: int = field(default_factory=time.monotonic_ns)
+    end_ns: Optional[int] = None
 
     def add_event(self, name: str, attributes: Optional[Dict] = None) -> None:
         """Add an event to this span"""
         self.events.append(
             {
                 "name": name,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _iso_now(),
                 "attributes": attributes or {},
             }
         )
 
+    def __post_init__(self) -> None:
+        # Accept datetime for backward compatibility
+        if isinstance(self.start_time, datetime):
+            self.start_time = self.start_time.timestamp()
+        if isinstance(self.end_time, datetime):
+            self.end_time = self.end_time.timestamp()
+
     def finish(self, status: str = "OK") -> None:
         """Finish the span"""
-        self.end_time = datetime.now()
+        self.end_ns = time.monotonic_ns()
+        # Wall-clock end derived from the monotonic delta (no second clock read)
+        self.end_time = self.start_time + (self.end_ns - self.start_ns) / 1e9
         self.status = status
 
     @property
     def duration_ms(self) -> float:
         """Get duration in milliseconds"""
-        if self.end_time:
-            return (self.end_time - self.start_time).total_seconds() * 1000
+        if self.end_ns is not None:
+            return (self.end_ns - self.start_ns) / 1_000_000.0
+        if self.end_time is not None:
+            return (self.end_time - self.start_time) * 1000.0
         return 0.0
 
     def to_dict(self) -> Dict[str, Any]:
@@ -70,8 +107,12 @@ class Span:
             "spanId": self.span_id,
             "parentSpanId": self.parent_span_id,
             "operationName": self.operation_name,
-            "startTime": self.start_time.isoformat(),
-            "endTime": self.end_time.isoformat() if self.end_time else None,
+            "startTime": datetime.fromtimestamp(self.start_time).isoformat(),
+            "endTime": (
+                datetime.fromtimestamp(self.end_time).isoformat()
+                if self.end_time is not None
+                else None
+            ),
             "duration": self.duration_ms,
             "status": self.status,
             "attributes": {
@@ -82,66 +123,189 @@ class Span:
         }
 
 
+class _singleton_method:
+    """Method callable on the instance or on the class (bound to the singleton)"""
+
+    def __init__(self, func: Callable) -> None:
+        self.func = func
+        functools.update_wrapper(self, func)
+
+    def __get__(self, obj: Any, cls: type) -> Callable:
+        if obj is None:
+            obj = cls()
+        return self.func.__get__(obj, cls)
+
+
 class TraceCollector:
     """
     Collects and stores traces
 
-    Singleton pattern for global trace collection.
+    Singleton pattern for global trace collection: ``TraceCollector()``
+    returns the module-level ``collector`` instance, and class-level calls
+    such as ``TraceCollector.record(span)`` act on it.
+
+    record() only enqueues the span; a daemon thread drains the queue in
+    batches into a bounded deque. When the queue is full the span is dropped
+    and counted rather than blocking the traced call. Readers flush pending
+    spans first, so get_traces() always sees everything recorded so far.
+    The drain thread does not survive fork(): the child gets a fresh queue
+    and starts its own worker on the next record().
     """
 
+    MAX_SPANS = 1000
+    QUEUE_SIZE = 4096
+    EXPORT_BATCH = 256
+    DROP_LOG_INTERVAL = 60.0  # seconds between drop warnings
+
+    __slots__ = (
+        "_spans",
+        "_level",
+        "_queue",
+        "_worker",
+        "_worker_lock",
+        "_dropped",
+        "_last_drop_log",
+    )
+
     _instance: Optional["TraceCollector"] = None
-    _spans: List[Span] = []
-    _level: TraceLevel = TraceLevel.NORMAL
 
     def __new__(cls) -> "TraceCollector":
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._spans = []
-            cls._level = TraceLevel.NORMAL
+            instance = super().__new__(cls)
+            instance._spans = deque(maxlen=cls.MAX_SPANS)
+            instance._level = TraceLevel.NORMAL
+            instance._queue = queue.Queue(maxsize=cls.QUEUE_SIZE)
+            instance._worker = None
+            instance._worker_lock = threading.Lock()
+            instance._dropped = 0
+            instance._last_drop_log = 0.0
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=instance._after_fork_in_child)
+            cls._instance = instance
         return cls._instance
 
-    @classmethod
-    def set_level(cls, level: TraceLevel) -> None:
+    @property
+    def dropped(self) -> int:
+        """Number of spans dropped because the export queue was full"""
+        return self._dropped
+
+    @_singleton_method
+    def set_level(self, level: TraceLevel) -> None:
         """Set trace verbosity level"""
-        cls._level = level
-
-    @classmethod
-    def record(cls, span: Span) -> None:
-        """Record a completed span"""
-        cls._spans.append(span)
-        # Keep only last 1000 spans
-        if len(cls._spans) > 1000:
-            cls._spans = cls._spans[-1000:]
-
-    @classmethod
-    def get_traces(cls, limit: int = 100) -> List[Dict]:
-        """Get recent traces as dicts"""
-        return [s.to_dict() for s in cls._spans[-limit:]]
+        self._level = level
 
-    @classmethod
-    def get_traces_for_agent(cls, agent_name: str, limit: int = 50) -> List[Dict]:
+    @_singleton_method
+    def record(self, span: Span) -> None:
+        """Record a completed span (non-blocking, drop-safe)"""
+        if self._worker is None:
+            self._start_worker()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._dropped += 1
+            now = time.monotonic()
+            if now - self._last_drop_log >= self.DROP_LOG_INTERVAL:
+                self._last_drop_log = now
+                logger.warning(
+                    f"TraceCollector queue full, {self._dropped} spans dropped so far"
+                )
+
+    def _start_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None:
+                worker = threading.Thread(
+                    target=self._drain, name="trace-collector", daemon=True
+                )
+                worker.start()
+                self._worker = worker
+
+    def _after_fork_in_child(self) -> None:
+        # Keep spans still queued in the parent, then start over without a worker
+        self._spans.extend(self._queue.queue)
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _drain(self) -> None:
+        """Background loop: move queued spans into the ring buffer in batches"""
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            try:
+                while len(batch) < self.EXPORT_BATCH:
+                    batch.append(q.get_nowait())
+            except queue.Empty:
+                pass
+            self._spans.extend(batch)
+            for _ in batch:
+                q.task_done()
+
+    @_singleton_method
+    def flush(self) -> None:
+        """Block until every pending span has reached the ring buffer"""
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            # No drain thread to wait for: move pending spans inline
+            q = self._queue
+            try:
+                while True:
+                    self._spans.append(q.get_nowait())
+                    q.task_done()
+            except queue.Empty:
+                return
+        self._queue.join()
+
+    @_singleton_method
+    def get_traces(self, limit: int = 100) -> List[Dict]:
+        """Get recent traces as dicts"""
+        self.flush()
+        if limit <= 0:
+            return []
+        recent = list(islice(reversed(self._spans), limit))
+        return [s.to_dict() for s in reversed(recent)]
+
+    @_singleton_method
+    def get_traces_for_agent(self, agent_name: str, limit: int = 50) -> List[Dict]:
         """Get traces for a specific agent"""
-        agent_spans = [s for s in cls._spans if s.agent_name == agent_name]
+        self.flush()
+        agent_spans = [s for s in list(self._spans) if s.agent_name == agent_name]
         return [s.to_dict() for s in agent_spans[-limit:]]
 
-    @classmethod
-    def clear(cls) -> None:
+    @_singleton_method
+    def clear(self) -> None:
         """Clear all traces"""
-        cls._spans = []
+        self.flush()
+        self._spans.clear()
 
 
-def generate_trace_id() -> str:
-    """Generate a unique trace ID"""
-    import uuid
+# Global trace collector
+collector = TraceCollector()
 
-    return uuid.uuid4().hex[:16]
+
+def generate_trace_id() -> str:
+    """Generate a unique trace ID (16 hex chars)"""
+    return urandom(8).hex()
 
 
 def generate_span_id() -> str:
-    """Generate a unique span ID"""
-    import uuid
+    """Generate a unique span ID (8 hex chars)"""
+    return urandom(4).hex()
+
+
+ERROR_LOG_INTERVAL = 10.0  # seconds between error logs per operation
+_err_last: Dict[str, float] = {}
+_err_lock = threading.Lock()
 
-    return uuid.uuid4().hex[:8]
+
+def _log_error(operation: str, exc: Exception) -> None:
+    """Log an observed exception, at most once per ERROR_LOG_INTERVAL per operation"""
+    now = time.monotonic()
+    with _err_lock:
+        last = _err_last.get(operation)
+        if last is not None and now - last < ERROR_LOG_INTERVAL:
+            return
+        _err_last[operation] = now
+    logger.error(f"[{operation}] Error: {exc}")
 
 
 def observable(method: Callable) -> Callable:
@@ -155,24 +319,50 @@ def observable(method: Callable) -> Callable:
                 ...
     """
 
-    @functools.wraps(method)
-    def wrapper(self, *args, **kwargs):
-        agent_name = getattr(self, "name", "unknown")
-        operation = f"{self.__class__.__name__}.{method.__name__}"
-
-        span = Span(
+    now = time.time
+    now_ns = time.monotonic_ns
+    method_name = method.__name__
+    # "<Class>.<method>" per concrete class, built once instead of per call
+    op_names: Dict[type, str] = {}
+
+    def new_span(
+        self, args: tuple, kwargs: dict, start_time: float, start_ns: int
+    ) -> Span:
+        cls = type(self)
+        operation = op_names.get(cls)
+        if operation is None:
+            operation = op_names[cls] = f"{cls.__name__}.{method_name}"
+        return Span(
             trace_id=generate_trace_id(),
             span_id=generate_span_id(),
             parent_span_id=None,
             operation_name=operation,
-            agent_name=agent_name,
-            start_time=datetime.now(),
+            agent_name=getattr(self, "name", "unknown"),
+            start_time=start_time,
+            start_ns=start_ns,
             attributes={
                 "args_count": len(args),
                 "has_kwargs": bool(kwargs),
             },
         )
 
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if collector._level is TraceLevel.MINIMAL:
+            # Only errors are traced: no span is allocated on the success path,
+            # but the clocks are read up front so error spans keep their duration
+            start_time, start_ns = now(), now_ns()
+            try:
+                return method(self, *args, **kwargs)
+            except Exception as e:
+                span = new_span(self, args, kwargs, start_time, start_ns)
+                span.finish("ERROR")
+                span.add_event("error", {"exception": str(e)})
+                _log_error(span.operation_name, e)
+                collector.record(span)
+                raise
+
+        span = new_span(self, args, kwargs, now(), now_ns())
         try:
             result = method(self, *args, **kwargs)
             span.finish("OK")
@@ -181,10 +371,10 @@ def observable(method: Callable) -> Callable:
         except Exception as e:
             span.finish("ERROR")
             span.add_event("error", {"exception": str(e)})
-            logger.error(f"[{operation}] Error: {e}")
+            _log_error(span.operation_name, e)
             raise
         finally:
-            TraceCollector.record(span)
+            collector.record(span)
 
     return wrapper
 
@@ -199,18 +389,18 @@ class LocalMemory:
 
     def __init__(self, max_items: int = 10):
         self.max_items = max_items
-        self._items: List[Dict[str, Any]] = []
+        self._items: Deque[Dict[str, Any]] = deque(maxlen=max_items)
 
     def add(self, item: Dict[str, Any]) -> None:
-        """Add an item to memory"""
-        item["_timestamp"] = datetime.now().isoformat()
+        """Add an item to memory (oldest items are evicted beyond max_items)"""
+        item["_timestamp"] = _iso_now()
         self._items.append(item)
-        if len(self._items) > self.max_items:
-            self._items = self._items[-self.max_items :]
 
     def get_recent(self, n: int = 5) -> List[Dict[str, Any]]:
         """Get the N most recent items"""
-        return self._items[-n:]
+        recent = list(islice(reversed(self._items), n))
+        recent.reverse()
+        return recent
 
     def search(self, key: str, value: Any) -> List[Dict[str, Any]]:
         """Search for items matching a key-value pair"""
@@ -218,7 +408,7 @@ class LocalMemory:
 
     def clear(self) -> None:
         """Clear all memory"""
-        self._items = []
+        self._items.clear()
 
     def to_context(self) -> str:
         """Convert to a context string for LLM prompts"""
@@ -226,7 +416,7 @@ class LocalMemory:
             return "No recent memory."
 
         lines = ["## Recent Memory:"]
-        for item in self._items[-5:]:
+        for item in self.get_recent(5):
             lines.append(f"- {item}")
         return "\n".join(lines)
 
@@ -236,6 +426,7 @@ __all__ = [
     "observable",
     "Span",
     "TraceCollector",
+    "collector",
     "TraceLevel",
     "LocalMemory",
     "generate_trace_id",
@@ -13,14 +13,22 @@ Agent Tracer - OpenTelemetry 追踪 + 结构化日志 (2026 Enhanced)
 - Cost estimation
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional
+from collections import deque
+from dataclasses import dataclass, field, fields
+from typing import Dict, Any, List, Optional, TextIO, Tuple
 from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
+import atexit
+import functools
+import itertools
 import json
+import os
+import queue
+import sys
 import time
 import threading
+import weakref
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,7 +37,11 @@ logger = logging.getLogger(__name__)
 try:
     from opentelemetry import trace
     from opentelemetry.sdk.trace import TracerProvider
-    from opentelemetry.sdk.trace.export import SimpleSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SimpleSpanProcessor,
+    )
     from opentelemetry.sdk.resources import Resource
 
     HAS_OTEL = True
@@ -37,6 +49,27 @@ except ImportError:
     HAS_OTEL = False
     trace = None
 
+# 可选的 C 实现 JSON 编码器
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize to JSON, using orjson when available."""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(
+                obj, default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bit: let the stdlib handle it
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
 
 # ============== 2026 Structured Logging Enhancements ==============
 
@@ -50,7 +83,7 @@ class LogLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True)
 class StructuredLogEntry:
     """
     Structured log entry for JSON logging (2026).
@@ -77,15 +110,23 @@ class StructuredLogEntry:
     span_id: Optional[str] = None
 
     def to_json(self) -> str:
-        """Convert to JSON string."""
-        return json.dumps(self.__dict__, ensure_ascii=False, default=str)
+        """Convert to JSON string (None fields omitted)."""
+        return _dumps(self.to_dict())
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        return {k: v for k, v in self.__dict__.items() if v is not None}
+        result = {}
+        for name in _LOG_ENTRY_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
+
+
+_LOG_ENTRY_FIELDS = tuple(f.name for f in fields(StructuredLogEntry))
 
 
-@dataclass
+@dataclass(slots=True)
 class DecisionRecord:
     """
     Record of an agent decision (2026).
@@ -101,10 +142,18 @@ class DecisionRecord:
     context: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
-        return self.__dict__
+        return {
+            "timestamp": self.timestamp,
+            "agent": self.agent,
+            "decision": self.decision,
+            "rationale": self.rationale,
+            "confidence": self.confidence,
+            "alternatives": self.alternatives,
+            "context": self.context,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class TokenUsageRecord:
     """
     Token usage record for cost tracking (2026).
@@ -119,7 +168,33 @@ class TokenUsageRecord:
     agent: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
-        return self.__dict__
+        return {
+            "timestamp": self.timestamp,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "estimated_cost_usd": self.estimated_cost_usd,
+            "task_type": self.task_type,
+            "agent": self.agent,
+        }
+
+
+# Log level name -> logging level (avoids getattr(logging, level.upper()) per call)
+_LEVEL_MAP = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
+
+def _truncate(value: Any, limit: int) -> str:
+    """截断为字符串 (短字符串直接返回，不做 str()/切片)"""
+    if type(value) is str:
+        return value if len(value) <= limit else value[:limit]
+    return str(value)[:limit]
 
 
 # Model pricing (USD per 1K tokens) - 2026 estimates
@@ -136,12 +211,91 @@ MODEL_PRICING = {
 }
 
 
+# Per-token (input, output) prices derived from MODEL_PRICING
+_PRICING_PER_TOKEN: Dict[str, tuple] = {
+    m: (p["input"] * 1e-3, p["output"] * 1e-3) for m, p in MODEL_PRICING.items()
+}
+
+
 def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
-    """Estimate cost in USD for token usage."""
-    pricing = MODEL_PRICING.get(model, MODEL_PRICING["default"])
-    input_cost = (prompt_tokens / 1000) * pricing["input"]
-    output_cost = (completion_tokens / 1000) * pricing["output"]
-    return round(input_cost + output_cost, 6)
+    """
+    Estimate cost in USD for token usage.
+
+    The result is unrounded; format it at display time.
+    """
+    prices = _PRICING_PER_TOKEN.get(model)
+    if prices is None:
+        # Models added to MODEL_PRICING at runtime are picked up lazily
+        p = MODEL_PRICING.get(model, MODEL_PRICING["default"])
+        prices = (p["input"] * 1e-3, p["output"] * 1e-3)
+        if model in MODEL_PRICING:
+            _PRICING_PER_TOKEN[model] = prices
+    price_in, price_out = prices
+    return price_in * prompt_tokens + price_out * completion_tokens
+
+
+# JSON output of all StructuredLoggers goes through one queue and one writer thread
+_LOG_QUEUE_SIZE = 10000
+_LOG_WRITE_BATCH = 256
+# Items are (serialized line, owning logger); the owner is charged for lost writes
+_log_queue: "queue.Queue[Tuple[str, StructuredLogger]]" = queue.Queue(
+    maxsize=_LOG_QUEUE_SIZE
+)
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+
+
+def _ensure_log_writer() -> None:
+    """Start the shared writer thread on first use."""
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None:
+            writer = threading.Thread(
+                target=_log_write_loop, name="slogger-writer", daemon=True
+            )
+            writer.start()
+            _log_writer = writer
+
+
+def _log_write_loop() -> None:
+    """Background loop: write queued JSON lines in batches."""
+    q = _log_queue
+    while True:
+        batch = [q.get()]
+        try:
+            while len(batch) < _LOG_WRITE_BATCH:
+                batch.append(q.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            out = sys.stdout
+            out.write("".join(line for line, _ in batch))
+            out.flush()
+        except Exception:
+            # stdout closed or unwritable: the batch is lost, count it as dropped
+            for _, owner in batch:
+                owner._count_dropped()
+        finally:
+            for _ in batch:
+                q.task_done()
+
+
+def _flush_log_queue() -> None:
+    """Block until all queued JSON entries have been written."""
+    if _log_writer is not None:
+        _log_queue.join()
+
+
+def _reset_log_writer_in_child() -> None:
+    # The writer thread does not survive fork(); start afresh in the child
+    global _log_queue, _log_writer
+    _log_queue = queue.Queue(maxsize=_LOG_QUEUE_SIZE)
+    _log_writer = None
+
+
+atexit.register(_flush_log_queue)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_log_writer_in_child)
 
 
 class StructuredLogger:
@@ -162,6 +316,13 @@ class StructuredLogger:
             rationale="Multiple independent subtasks detected",
             confidence=0.85
         )
+
+    JSON output is written by a background thread shared by all loggers:
+    _emit() serializes the entry and enqueues the line, and the writer
+    drains the queue in batches with a single write + flush per batch.
+    Entries are dropped and counted when the queue is full or their batch
+    cannot be written. Call flush() to wait for pending output (also run
+    at exit).
     """
 
     def __init__(
@@ -170,6 +331,7 @@ class StructuredLogger:
         output_json: bool = True,
         track_decisions: bool = True,
         track_tokens: bool = True,
+        max_records: int = 10_000,
     ):
         self.service_name = service_name
         self.output_json = output_json
@@ -177,21 +339,63 @@ class StructuredLogger:
         self.track_tokens = track_tokens
 
         self._lock = threading.Lock()
-        self._decision_chain: List[DecisionRecord] = []
-        self._token_usage: List[TokenUsageRecord] = []
+        # Only the most recent max_records entries are kept
+        self._decision_chain: deque = deque(maxlen=max_records)
+        self._token_usage: deque = deque(maxlen=max_records)
         self._total_cost_usd: float = 0.0
+        # Cumulative per-model usage, updated on every log_token_usage
+        self._usage_summary: Dict[str, Dict[str, Any]] = {}
+        self._total_calls = 0
+        # Revision counters + (rev, tuple) snapshots: getters only re-copy after a change
+        self._decision_rev = 0
+        self._usage_rev = 0
+        self._decision_snap: tuple = (-1, ())
+        self._usage_snap: tuple = (-1, ())
+
+        self._dropped = 0
+        # (epoch second, isoformat of that second) for _now_iso
+        self._ts_cache: tuple = (0, "")
+
+    def _now_iso(self) -> str:
+        """ISO timestamp with millisecond precision; the date part is formatted once per second."""
+        now = time.time()
+        sec = int(now)
+        cached_sec, cached = self._ts_cache
+        if sec != cached_sec:
+            cached = datetime.fromtimestamp(sec).isoformat()
+            self._ts_cache = (sec, cached)
+        return f"{cached}.{int((now - sec) * 1000):03d}"
+
+    @property
+    def dropped(self) -> int:
+        """Number of JSON entries dropped (output queue full or write failed)."""
+        return self._dropped
+
+    def _count_dropped(self) -> None:
+        with self._lock:
+            self._dropped += 1
 
-    def _emit(self, entry: StructuredLogEntry) -> None:
+    def _emit(self, entry: StructuredLogEntry, level: int = logging.INFO) -> None:
         """Emit a log entry."""
         if self.output_json:
-            print(entry.to_json())
+            if _log_writer is None:
+                _ensure_log_writer()
+            # Serialize now: callers may mutate data after log_* returns
+            try:
+                _log_queue.put_nowait((entry.to_json() + "\n", self))
+            except queue.Full:
+                self._count_dropped()
         else:
             logger.log(
-                getattr(logging, entry.level.upper(), logging.INFO),
+                level,
                 f"[{entry.event_type}] {entry.agent}: {entry.message}",
                 extra=entry.data
             )
 
+    def flush(self) -> None:
+        """Block until all queued JSON entries have been written."""
+        _flush_log_queue()
+
     def log(
         self,
         level: str,
@@ -200,10 +404,18 @@ class StructuredLogger:
         message: str,
         model: Optional[str] = None,
         **data,
-    ) -> StructuredLogEntry:
-        """Create and emit a structured log entry."""
+    ) -> Optional[StructuredLogEntry]:
+        """
+        Create and emit a structured log entry.
+
+        Returns None without building the entry when output_json is False
+        and the underlying logger is not enabled for ``level``.
+        """
+        lvl = _LEVEL_MAP.get(level, logging.INFO)
+        if not self.output_json and not logger.isEnabledFor(lvl):
+            return None
         entry = StructuredLogEntry(
-            timestamp=datetime.now().isoformat(),
+            timestamp=self._now_iso(),
             level=level,
             event_type=event_type,
             agent=agent,
@@ -211,7 +423,7 @@ class StructuredLogger:
             model=model,
             data=data,
         )
-        self._emit(entry)
+        self._emit(entry, lvl)
         return entry
 
     def log_decision(
@@ -238,7 +450,7 @@ class StructuredLogger:
             DecisionRecord
         """
         record = DecisionRecord(
-            timestamp=datetime.now().isoformat(),
+            timestamp=self._now_iso(),
             agent=agent,
             decision=decision,
             rationale=rationale,
@@ -250,6 +462,7 @@ class StructuredLogger:
         if self.track_decisions:
             with self._lock:
                 self._decision_chain.append(record)
+                self._decision_rev += 1
 
         self.log(
             level="info",
@@ -287,7 +500,7 @@ class StructuredLogger:
         cost = estimate_cost(model, prompt_tokens, completion_tokens)
 
         record = TokenUsageRecord(
-            timestamp=datetime.now().isoformat(),
+            timestamp=self._now_iso(),
             model=model,
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
@@ -300,7 +513,23 @@ class StructuredLogger:
         if self.track_tokens:
             with self._lock:
                 self._token_usage.append(record)
+                self._usage_rev += 1
                 self._total_cost_usd += cost
+                self._total_calls += 1
+                s = self._usage_summary.get(model)
+                if s is None:
+                    s = self._usage_summary[model] = {
+                        "calls": 0,
+                        "prompt_tokens": 0,
+                        "completion_tokens": 0,
+                        "total_tokens": 0,
+                        "cost_usd": 0.0,
+                    }
+                s["calls"] += 1
+                s["prompt_tokens"] += prompt_tokens
+                s["completion_tokens"] += completion_tokens
+                s["total_tokens"] += total_tokens
+                s["cost_usd"] += cost
 
         self.log(
             level="info",
@@ -321,7 +550,7 @@ class StructuredLogger:
         error: str,
         error_type: str = "unknown",
         **context,
-    ) -> StructuredLogEntry:
+    ) -> Optional[StructuredLogEntry]:
         """Log an error."""
         return self.log(
             level="error",
@@ -341,7 +570,7 @@ class StructuredLogger:
         latency_ms: float = 0,
         success: bool = True,
         **extra,
-    ) -> StructuredLogEntry:
+    ) -> Optional[StructuredLogEntry]:
         """Log an LLM API call."""
         return self.log(
             level="info" if success else "error",
@@ -349,22 +578,38 @@ class StructuredLogger:
             agent=agent,
             message=f"LLM call to {model}" + (" OK" if success else " FAILED"),
             model=model,
-            prompt_preview=prompt_preview[:200],
-            response_preview=response_preview[:200] if response_preview else "",
+            prompt_preview=_truncate(prompt_preview, 200),
+            response_preview=_truncate(response_preview, 200) if response_preview else "",
             latency_ms=latency_ms,
             success=success,
             **extra,
         )
 
+    def _decision_snapshot(self) -> tuple:
+        """Immutable snapshot of the decision chain, re-copied only after a change."""
+        with self._lock:
+            rev, snap = self._decision_snap
+            if rev != self._decision_rev:
+                snap = tuple(self._decision_chain)
+                self._decision_snap = (self._decision_rev, snap)
+        return snap
+
+    def _usage_snapshot(self) -> tuple:
+        """Immutable snapshot of token usage records, re-copied only after a change."""
+        with self._lock:
+            rev, snap = self._usage_snap
+            if rev != self._usage_rev:
+                snap = tuple(self._token_usage)
+                self._usage_snap = (self._usage_rev, snap)
+        return snap
+
     def get_decision_chain(self) -> List[DecisionRecord]:
         """Get the full decision chain."""
-        with self._lock:
-            return list(self._decision_chain)
+        return list(self._decision_snapshot())
 
     def get_token_usage(self) -> List[TokenUsageRecord]:
         """Get all token usage records."""
-        with self._lock:
-            return list(self._token_usage)
+        return list(self._usage_snapshot())
 
     def get_total_cost(self) -> float:
         """Get total estimated cost in USD."""
@@ -372,45 +617,51 @@ class StructuredLogger:
             return self._total_cost_usd
 
     def get_usage_summary(self) -> Dict[str, Any]:
-        """Get token usage summary by model."""
-        with self._lock:
-            summary: Dict[str, Dict[str, Any]] = {}
-            for record in self._token_usage:
-                if record.model not in summary:
-                    summary[record.model] = {
-                        "calls": 0,
-                        "prompt_tokens": 0,
-                        "completion_tokens": 0,
-                        "total_tokens": 0,
-                        "cost_usd": 0.0,
-                    }
-                s = summary[record.model]
-                s["calls"] += 1
-                s["prompt_tokens"] += record.prompt_tokens
-                s["completion_tokens"] += record.completion_tokens
-                s["total_tokens"] += record.total_tokens
-                s["cost_usd"] += record.estimated_cost_usd
+        """
+        Get token usage summary by model.
 
+        Totals are cumulative since the last clear(), including records
+        already evicted from the bounded usage history.
+        """
+        with self._lock:
             return {
-                "by_model": summary,
+                "by_model": {m: dict(s) for m, s in self._usage_summary.items()},
                 "total_cost_usd": self._total_cost_usd,
-                "total_calls": len(self._token_usage),
+                "total_calls": self._total_calls,
             }
 
-    def export_decision_chain(self, format: str = "json") -> str:
+    def export_decision_chain(
+        self, format: str = "json", file: Optional[TextIO] = None
+    ) -> str:
         """
         Export decision chain (2026).
 
         Args:
-            format: "json" or "mermaid"
+            format: "json", "ndjson" (one record per line) or "mermaid"
+            file: Optional text sink for "json"/"ndjson"; output is streamed
+                into it chunk by chunk and "" is returned
 
         Returns:
             Exported string
         """
-        chain = self.get_decision_chain()
+        chain = self._decision_snapshot()
 
         if format == "json":
-            return json.dumps([r.to_dict() for r in chain], indent=2, ensure_ascii=False)
+            if file is None:
+                return json.dumps(
+                    [r.to_dict() for r in chain], indent=2, ensure_ascii=False
+                )
+            encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+            for chunk in encoder.iterencode([r.to_dict() for r in chain]):
+                file.write(chunk)
+            return ""
+
+        elif format == "ndjson":
+            if file is None:
+                return "".join(_dumps(r.to_dict()) + "\n" for r in chain)
+            for r in chain:
+                file.write(_dumps(r.to_dict()) + "\n")
+            return ""
 
         elif format == "mermaid":
             lines = ["graph TD"]
@@ -429,14 +680,38 @@ class StructuredLogger:
         with self._lock:
             self._decision_chain.clear()
             self._token_usage.clear()
+            self._decision_rev += 1
+            self._usage_rev += 1
             self._total_cost_usd = 0.0
+            self._usage_summary.clear()
+            self._total_calls = 0
 
 
 # Default structured logger instance
 default_slogger = StructuredLogger()
 
 
-@dataclass
+# Span attribute keys (module constants, so every span reuses the same objects)
+ATTR_GEN_AI_SYSTEM = "gen_ai.system"
+ATTR_GEN_AI_PROMPT = "gen_ai.prompt"
+ATTR_GEN_AI_PROMPT_TOKENS = "gen_ai.token_count.prompt"
+ATTR_GEN_AI_COMPLETION_TOKENS = "gen_ai.token_count.completion"
+ATTR_GEN_AI_TEMPERATURE = "gen_ai.temperature"
+ATTR_TOOL_NAME = "tool.name"
+ATTR_TOOL_ARGUMENTS = "tool.arguments"
+ATTR_AGENT_NAME = "agent.name"
+ATTR_AGENT_STEP_TYPE = "agent.step_type"
+ATTR_AGENT_TASK = "agent.task"
+ATTR_AGENT_CONFIDENCE = "agent.confidence"
+
+
+@functools.lru_cache(maxsize=128)
+def _gen_ai_key(name: str) -> str:
+    """Interned "gen_ai.<name>" attribute key for extra trace_llm_call kwargs."""
+    return sys.intern(f"gen_ai.{name}")
+
+
+@dataclass(slots=True)
 class LLMAttributes:
     """LLM 调用语义属性"""
 
@@ -447,14 +722,21 @@ class LLMAttributes:
 
     def to_dict(self) -> Dict[str, Any]:
         return {
-            "gen_ai.system": self.model,
-            "gen_ai.token_count.prompt": self.prompt_tokens,
-            "gen_ai.token_count.completion": self.completion_tokens,
-            "gen_ai.temperature": self.temperature,
+            ATTR_GEN_AI_SYSTEM: self.model,
+            ATTR_GEN_AI_PROMPT_TOKENS: self.prompt_tokens,
+            ATTR_GEN_AI_COMPLETION_TOKENS: self.completion_tokens,
+            ATTR_GEN_AI_TEMPERATURE: self.temperature,
         }
 
+    def set_on(self, span: Any) -> None:
+        """直接写入 span 属性 (不构建中间 dict)"""
+        span.set_attribute(ATTR_GEN_AI_SYSTEM, self.model)
+        span.set_attribute(ATTR_GEN_AI_PROMPT_TOKENS, self.prompt_tokens)
+        span.set_attribute(ATTR_GEN_AI_COMPLETION_TOKENS, self.completion_tokens)
+        span.set_attribute(ATTR_GEN_AI_TEMPERATURE, self.temperature)
+
 
-@dataclass
+@dataclass(slots=True)
 class AgentAttributes:
     """Agent 执行属性"""
 
@@ -464,11 +746,77 @@ class AgentAttributes:
 
     def to_dict(self) -> Dict[str, Any]:
         return {
-            "agent.name": self.agent_name,
-            "agent.task": self.task,
-            "agent.confidence": self.confidence,
+            ATTR_AGENT_NAME: self.agent_name,
+            ATTR_AGENT_TASK: self.task,
+            ATTR_AGENT_CONFIDENCE: self.confidence,
         }
 
+    def set_on(self, span: Any) -> None:
+        """直接写入 span 属性 (不构建中间 dict)"""
+        span.set_attribute(ATTR_AGENT_NAME, self.agent_name)
+        span.set_attribute(ATTR_AGENT_TASK, self.task)
+        span.set_attribute(ATTR_AGENT_CONFIDENCE, self.confidence)
+
+
+class _StdoutProxy:
+    """按调用时的 sys.stdout 写出 (退出时原 stdout 可能已被关闭/替换)"""
+
+    def write(self, data: str) -> int:
+        return sys.stdout.write(data)
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+
+_provider_lock = threading.Lock()
+_provider: Optional["TracerProvider"] = None
+
+
+def _shared_tracer_provider(service_name: str, debug: bool, **batch_options) -> "TracerProvider":
+    """
+    进程内共享的 TracerProvider (首次调用时创建)
+
+    trace.set_tracer_provider 只有首次生效，因此 Provider 与其 Span 处理器
+    (BatchSpanProcessor 自带导出线程) 每个进程只创建一次；后续 AgentTracer
+    复用它，首个追踪器的配置生效。退出时由单个 atexit 钩子 shutdown。
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            resource = Resource.create({"service.name": service_name})
+            provider = TracerProvider(resource=resource, shutdown_on_exit=False)
+            exporter = ConsoleSpanExporter(out=_StdoutProxy())
+            if debug:
+                processor = SimpleSpanProcessor(exporter)
+            else:
+                # 批量异步导出，避免在调用路径上同步导出
+                processor = BatchSpanProcessor(exporter, **batch_options)
+            provider.add_span_processor(processor)
+            trace.set_tracer_provider(provider)
+            atexit.register(provider.shutdown)
+            _provider = provider
+        return _provider
+
+
+class _CounterOwner:
+    """线程本地计数器的存活标记：线程退出时随线程本地数据释放"""
+
+    __slots__ = ("__weakref__",)
+
+
+def _retire_thread_counters(
+    tracer_ref: "weakref.ref[AgentTracer]", key: int, counters: List[float]
+) -> None:
+    """线程退出后将其计数器并入基数并注销"""
+    tracer = tracer_ref()
+    if tracer is None:
+        return
+    with tracer._lock:
+        tracer._counters.pop(key, None)
+        base = tracer._retired
+        for i, value in enumerate(counters):
+            base[i] += value
+
 
 class AgentTracer:
     """
@@ -481,23 +829,56 @@ class AgentTracer:
     - 记录 Token 和延迟指标
     """
 
-    def __init__(self, service_name: str = "council-agent"):
+    LATENCY_WINDOW = 4096  # 保留的最近延迟样本数
+
+    def __init__(
+        self,
+        service_name: str = "council-agent",
+        queue_size: int = 4096,
+        batch_size: int = 256,
+        schedule_delay_ms: int = 1000,
+        export_timeout_ms: int = 10000,
+        debug: bool = False,
+    ):
+        """
+        初始化追踪器
+
+        Args:
+            service_name: 服务名称
+            queue_size: BatchSpanProcessor 队列容量
+            batch_size: 单次导出的最大 Span 数
+            schedule_delay_ms: 批量导出间隔 (毫秒)
+            export_timeout_ms: 单次导出超时 (毫秒)
+            debug: 为 True 时使用同步 SimpleSpanProcessor (便于调试)
+
+        Provider 与 Span 处理器在进程内共享，以上导出参数仅在首个
+        AgentTracer 创建时生效。
+        """
         self.service_name = service_name
         self._lock = threading.Lock()
-        self._stats = {
-            "total_prompt_tokens": 0,
-            "total_completion_tokens": 0,
-            "latencies": [],
-        }
+        # 最近延迟的环形缓冲 (内存有界)
+        self._latencies: deque = deque(maxlen=self.LATENCY_WINDOW)
+        # 每线程 [prompt, completion, latency_sum_ms, latency_count] 计数器，读取时汇总；
+        # 已退出线程的计数并入 _retired，_counters 只保留存活线程
+        self._local = threading.local()
+        self._counters: Dict[int, List[float]] = {}
+        self._retired: List[float] = [0, 0, 0.0, 0]
+        self._counter_ids = itertools.count()
 
         if HAS_OTEL:
-            resource = Resource.create({"service.name": service_name})
-            provider = TracerProvider(resource=resource)
-            provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
-            trace.set_tracer_provider(provider)
-            self.tracer = trace.get_tracer(__name__)
+            provider = _shared_tracer_provider(
+                service_name,
+                debug,
+                max_queue_size=queue_size,
+                schedule_delay_millis=schedule_delay_ms,
+                max_export_batch_size=batch_size,
+                export_timeout_millis=export_timeout_ms,
+            )
+            self.tracer = provider.get_tracer(__name__)
         else:
             self.tracer = MockTracer()
+        # Span 工厂在初始化时绑定一次，trace_* 无需再按 HAS_OTEL 分支
+        self._start_span = self.tracer.start_as_current_span
 
     @contextmanager
     def trace_llm_call(
@@ -507,26 +888,24 @@ class AgentTracer:
         **kwargs,
     ):
         """追踪 LLM 调用"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
-            if HAS_OTEL:
-                with self.tracer.start_as_current_span("llm_call") as span:
-                    span.set_attribute("gen_ai.system", model)
-                    span.set_attribute("gen_ai.prompt", prompt[:500])  # 截断
+            with self._start_span("llm_call") as span:
+                if span.is_recording():
+                    span.set_attribute(ATTR_GEN_AI_SYSTEM, model)
+                    span.set_attribute(ATTR_GEN_AI_PROMPT, _truncate(prompt, 500))  # 截断
                     for k, v in kwargs.items():
-                        span.set_attribute(f"gen_ai.{k}", v)
-                    yield span
-            else:
-                span = MockSpan()
-                span.set_attribute("gen_ai.system", model)
-                span.set_attribute("gen_ai.prompt", prompt[:500])
+                        span.set_attribute(_gen_ai_key(k), v)
                 yield span
         finally:
             # 记录延迟 (即使发生异常)
-            latency_ms = (time.time() - start_time) * 1000
-            with self._lock:
-                self._stats["latencies"].append(latency_ms)
+            latency_ms = (time.perf_counter_ns() - start_ns) * 1e-6
+            # deque.append 在 GIL 下是原子的；累计值写入当前线程计数器，无需加锁
+            self._latencies.append(latency_ms)
+            counters = self._thread_counters()
+            counters[2] += latency_ms
+            counters[3] += 1
 
     @contextmanager
     def trace_tool_call(
@@ -535,14 +914,10 @@ class AgentTracer:
         arguments: Dict[str, Any],
     ):
         """追踪工具调用"""
-        if HAS_OTEL:
-            with self.tracer.start_as_current_span("tool_call") as span:
-                span.set_attribute("tool.name", tool_name)
-                span.set_attribute("tool.arguments", str(arguments)[:200])
-                yield span
-        else:
-            span = MockSpan()
-            span.set_attribute("tool.name", tool_name)
+        with self._start_span("tool_call") as span:
+            if span.is_recording():
+                span.set_attribute(ATTR_TOOL_NAME, tool_name)
+                span.set_attribute(ATTR_TOOL_ARGUMENTS, _truncate(arguments, 200))
             yield span
 
     @contextmanager
@@ -552,15 +927,10 @@ class AgentTracer:
         step_type: str,
     ):
         """追踪 Agent 步骤"""
-        if HAS_OTEL:
-            with self.tracer.start_as_current_span(f"agent_{step_type}") as span:
-                span.set_attribute("agent.name", agent_name)
-                span.set_attribute("agent.step_type", step_type)
-                yield span
-        else:
-            span = MockSpan()
-            span.set_attribute("agent.name", agent_name)
-            span.set_attribute("agent.step_type", step_type)
+        with self._start_span(f"agent_{step_type}") as span:
+            if span.is_recording():
+                span.set_attribute(ATTR_AGENT_NAME, agent_name)
+                span.set_attribute(ATTR_AGENT_STEP_TYPE, step_type)
             yield span
 
     def record_tokens(
@@ -569,22 +939,38 @@ class AgentTracer:
         prompt: int,
         completion: int,
     ) -> None:
-        """记录 Token 使用量"""
-        with self._lock:
-            self._stats["total_prompt_tokens"] += prompt
-            self._stats["total_completion_tokens"] += completion
+        """记录 Token 使用量 (写入当前线程计数器，无锁)"""
+        counters = self._thread_counters()
+        counters[0] += prompt
+        counters[1] += completion
+
+    def _thread_counters(self) -> List[float]:
+        """获取当前线程的计数器 (首次使用时注册)"""
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            counters = self._local.counters = [0, 0, 0.0, 0]
+            # owner 只被线程本地数据引用，线程退出后释放并触发回收
+            owner = self._local.owner = _CounterOwner()
+            with self._lock:
+                key = next(self._counter_ids)
+                self._counters[key] = counters
+            weakref.finalize(
+                owner, _retire_thread_counters, weakref.ref(self), key, counters
+            )
+        return counters
 
     def get_stats(self) -> Dict[str, Any]:
-        """获取统计信息"""
+        """获取统计信息 (平均延迟基于累计值，O(存活线程数))"""
         with self._lock:
-            stats = dict(self._stats)
-            if stats["latencies"]:
-                stats["avg_latency_ms"] = sum(stats["latencies"]) / len(
-                    stats["latencies"]
-                )
-            else:
-                stats["avg_latency_ms"] = 0
-            return stats
+            counters = [list(self._retired), *self._counters.values()]
+        latency_sum = sum(c[2] for c in counters)
+        latency_count = sum(c[3] for c in counters)
+        return {
+            "total_prompt_tokens": sum(c[0] for c in counters),
+            "total_completion_tokens": sum(c[1] for c in counters),
+            "latencies": list(self._latencies),
+            "avg_latency_ms": latency_sum / latency_count if latency_count else 0,
+        }
 
 
 class MockTracer:
@@ -601,25 +987,53 @@ class MockSpanContext:
         self.name = name
 
     def __enter__(self):
-        return MockSpan()
+        return _NOOP_SPAN
 
     def __exit__(self, *args):
         pass
 
 
 class MockSpan:
-    """Mock span for testing without OpenTelemetry"""
+    """No-op span used without OpenTelemetry (无状态，可共享)"""
+
+    __slots__ = ()
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+    def get_attribute(self, key: str) -> Any:
+        return None
+
+
+class RecordingMockSpan(MockSpan):
+    """Mock span that keeps its attributes (测试用)"""
+
+    __slots__ = ("_attributes",)
+
+    # 设为 False 时 set_attribute 变为 no-op，且 is_recording() 返回 False
+    ENABLED = True
 
     def __init__(self):
         self._attributes = {}
 
+    def is_recording(self) -> bool:
+        return self.ENABLED
+
     def set_attribute(self, key: str, value: Any) -> None:
-        self._attributes[key] = value
+        if self.ENABLED:
+            self._attributes[key] = value
 
     def get_attribute(self, key: str) -> Any:
         return self._attributes.get(key)
 
 
+# 共享的 no-op span，避免每次调用实例化
+_NOOP_SPAN = MockSpan()
+
+
 __all__ = [
     # Core Tracer
     "AgentTracer",
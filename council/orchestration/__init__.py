@@ -1,91 +1,101 @@
 # Orchestration Module - 2025 AGI 编排层
-from council.orchestration.ledger import (
-    TaskLedger,
-    ProgressLedger,
-    DualLedger,
-    IterationRecord,
-    IterationStatus,
-)
-from council.orchestration.adaptive_router import (
-    AdaptiveRouter,
-    RoutingDecision,
-    RiskLevel,
-    ResponseMode,
-)
-from council.orchestration.events import Event, EventType
-from council.orchestration.hub import Hub
-from council.orchestration.graph import (
-    State,
-    StateGraph,
-    Checkpoint,
-    NodeType,
-    LoopConfig,
-    ParallelConfig,
-)
-from council.orchestration.agent_registry import (
-    AgentRegistry,
-    RegisteredAgent,
-    AgentCapability,
-)
-from council.orchestration.delegation import (
-    DelegationManager,
-    DelegationRequest,
-    DelegationResult,
-    DelegationStatus,
-)
-from council.orchestration.task_classifier import (
-    TaskClassifier,
-    RecommendedModel,
-    TaskType,
-)
-from council.orchestration.model_router import (
-    ModelRouter,
-    ModelConfig,
-    RoutingResult,
-    ModelPerformanceStats,
-)
-from council.orchestration.multi_model_executor import (
-    MultiModelExecutor,
-    ModelTask,
-    ModelResult,
-    ModelRole,
-    ExecutionStats,
-    create_planner_task,
-    create_executor_task,
-    create_reviewer_task,
-)
-from council.orchestration.handoff import (
-    AgentHandoff,
-    ContextSnapshot,
-    HandoffManager,
-    HandoffPriority,
-    HandoffStatus,
-)
-from council.orchestration.health_check import (
-    HealthChecker,
-    HealthStatus,
-    HealthCheckResult,
-    ModelHealth,
-    default_checker,
-)
-from council.orchestration.collaboration import (
-    CollaborationMode,
-    CollaborationResult,
-    CollaborationOrchestrator,
-    Vote as CollabVote,
-    BrainstormIdea,
-    default_collaboration,
-)
+#
+# 子模块按需加载 (PEP 562)：只访问一个符号时不再导入整个编排层。
+import importlib
+from typing import Any, Dict, List, Tuple
 
-# 2026 A2A Protocol
-from council.orchestration.a2a_adapter import (
-    AgentCard as A2AAgentCard,
-    AgentCapability as A2ACapability,
-    AgentDiscovery,
-    TaskContract,
-    TaskStatus as A2ATaskStatus,
-    get_discovery,
-)
+# 导出名 -> (子模块, 属性名)
+_LAZY: Dict[str, Tuple[str, str]] = {
+    # Ledger
+    "TaskLedger": ("ledger", "TaskLedger"),
+    "ProgressLedger": ("ledger", "ProgressLedger"),
+    "DualLedger": ("ledger", "DualLedger"),
+    "IterationRecord": ("ledger", "IterationRecord"),
+    "IterationStatus": ("ledger", "IterationStatus"),
+    # Router
+    "AdaptiveRouter": ("adaptive_router", "AdaptiveRouter"),
+    "RoutingDecision": ("adaptive_router", "RoutingDecision"),
+    "RiskLevel": ("adaptive_router", "RiskLevel"),
+    "ResponseMode": ("adaptive_router", "ResponseMode"),
+    # Hub & Events
+    "Event": ("events", "Event"),
+    "EventType": ("events", "EventType"),
+    "Hub": ("hub", "Hub"),
+    # StateGraph (2026 Enhanced)
+    "State": ("graph", "State"),
+    "StateGraph": ("graph", "StateGraph"),
+    "Checkpoint": ("graph", "Checkpoint"),
+    "NodeType": ("graph", "NodeType"),
+    "LoopConfig": ("graph", "LoopConfig"),
+    "ParallelConfig": ("graph", "ParallelConfig"),
+    # Agent Registry & Delegation
+    "AgentRegistry": ("agent_registry", "AgentRegistry"),
+    "RegisteredAgent": ("agent_registry", "RegisteredAgent"),
+    "AgentCapability": ("agent_registry", "AgentCapability"),
+    "DelegationManager": ("delegation", "DelegationManager"),
+    "DelegationRequest": ("delegation", "DelegationRequest"),
+    "DelegationResult": ("delegation", "DelegationResult"),
+    "DelegationStatus": ("delegation", "DelegationStatus"),
+    # Task Classifier
+    "TaskClassifier": ("task_classifier", "TaskClassifier"),
+    "RecommendedModel": ("task_classifier", "RecommendedModel"),
+    "TaskType": ("task_classifier", "TaskType"),
+    # Model Router
+    "ModelRouter": ("model_router", "ModelRouter"),
+    "ModelConfig": ("model_router", "ModelConfig"),
+    "RoutingResult": ("model_router", "RoutingResult"),
+    "ModelPerformanceStats": ("model_router", "ModelPerformanceStats"),
+    # Multi-Model Executor
+    "MultiModelExecutor": ("multi_model_executor", "MultiModelExecutor"),
+    "ModelTask": ("multi_model_executor", "ModelTask"),
+    "ModelResult": ("multi_model_executor", "ModelResult"),
+    "ModelRole": ("multi_model_executor", "ModelRole"),
+    "ExecutionStats": ("multi_model_executor", "ExecutionStats"),
+    "create_planner_task": ("multi_model_executor", "create_planner_task"),
+    "create_executor_task": ("multi_model_executor", "create_executor_task"),
+    "create_reviewer_task": ("multi_model_executor", "create_reviewer_task"),
+    # Handoff (2025 Swarm Pattern)
+    "AgentHandoff": ("handoff", "AgentHandoff"),
+    "ContextSnapshot": ("handoff", "ContextSnapshot"),
+    "HandoffManager": ("handoff", "HandoffManager"),
+    "HandoffPriority": ("handoff", "HandoffPriority"),
+    "HandoffStatus": ("handoff", "HandoffStatus"),
+    # Health Check
+    "HealthChecker": ("health_check", "HealthChecker"),
+    "HealthStatus": ("health_check", "HealthStatus"),
+    "HealthCheckResult": ("health_check", "HealthCheckResult"),
+    "ModelHealth": ("health_check", "ModelHealth"),
+    "default_checker": ("health_check", "default_checker"),
+    # 2026 Collaboration Patterns
+    "CollaborationMode": ("collaboration", "CollaborationMode"),
+    "CollaborationResult": ("collaboration", "CollaborationResult"),
+    "CollaborationOrchestrator": ("collaboration", "CollaborationOrchestrator"),
+    "CollabVote": ("collaboration", "Vote"),
+    "BrainstormIdea": ("collaboration", "BrainstormIdea"),
+    "default_collaboration": ("collaboration", "default_collaboration"),
+    # 2026 A2A Protocol
+    "A2AAgentCard": ("a2a_adapter", "AgentCard"),
+    "A2ACapability": ("a2a_adapter", "AgentCapability"),
+    "AgentDiscovery": ("a2a_adapter", "AgentDiscovery"),
+    "TaskContract": ("a2a_adapter", "TaskContract"),
+    "A2ATaskStatus": ("a2a_adapter", "TaskStatus"),
+    "get_discovery": ("a2a_adapter", "get_discovery"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = target
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    value = getattr(module, attr)
+    globals()[name] = value  # 缓存，后续访问不再经过 __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
 
 
 __all__ = [
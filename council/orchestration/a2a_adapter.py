@@ -7,14 +7,74 @@ Implements Google A2A / IBM ACP compatible patterns for:
 - Capability Advertisement
 """
 
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 from enum import Enum
-from datetime import datetime
+from itertools import islice
+import heapq
+import json
 import logging
+import re
+import time
+import weakref
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+if TYPE_CHECKING:
+    from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Shared immutable defaults: cards/contracts built without these fields allocate
+# nothing; mutators replace them with fresh containers (copy-on-write)
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+_DEFAULT_PROTOCOLS: Tuple[str, ...] = ("mcp", "a2a")
+
+
+def _empty_mapping() -> Mapping[str, Any]:
+    return _EMPTY_MAPPING
+
+
+# Offset mapping time.monotonic_ns() readings onto the wall clock (fixed at import)
+_MONO_TO_EPOCH_NS = time.time_ns() - time.monotonic_ns()
+
+
+def _mono_to_datetime(mono_ns: Optional[int]) -> Optional["datetime"]:
+    """Wall-clock view of a monotonic_ns timestamp"""
+    if mono_ns is None:
+        return None
+    from datetime import datetime  # only needed when a datetime view is requested
+
+    return datetime.fromtimestamp((mono_ns + _MONO_TO_EPOCH_NS) / 1e9)
+
+
+# ASCII word tokens; CJK text has no separators and goes through substring matching
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def _tokenize_query(query: str) -> Tuple[str, Set[str]]:
+    """Lowercase a query once and split it into ASCII word tokens"""
+    query_lower = query.lower()
+    return query_lower, set(_TOKEN_RE.findall(query_lower))
+
 
 class AgentCapability(Enum):
     """Agent capability categories (A2A standard)"""
@@ -29,7 +89,7 @@ class AgentCapability(Enum):
     ORCHESTRATION = "orchestration"
 
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class AgentCard:
     """
     Agent Card - A2A Protocol Agent Advertisement
@@ -46,49 +106,106 @@ class AgentCard:
     name: str
     description: str
     version: str = "1.0.0"
-    capabilities: List[AgentCapability] = field(default_factory=list)
-    keywords: List[str] = field(default_factory=list)
+    capabilities: Sequence[AgentCapability] = ()
+    keywords: Sequence[str] = ()
     max_context_tokens: int = 128000  # Context window limit
     rate_limit_rpm: int = 60  # Requests per minute
-    preferred_task_types: List[str] = field(default_factory=list)
-    supported_protocols: List[str] = field(default_factory=lambda: ["mcp", "a2a"])
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    preferred_task_types: Sequence[str] = ()
+    supported_protocols: Sequence[str] = _DEFAULT_PROTOCOLS
+    metadata: Mapping[str, Any] = field(default_factory=_empty_mapping)
+    # Precomputed match terms and serialized forms (built lazily; call
+    # reindex() after mutating the card)
+    _match_tokens: Dict[str, float] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _match_phrases: List[Tuple[str, float]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _cached_dict: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _cached_json: Optional[bytes] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.reindex()
+
+    def reindex(self) -> None:
+        """Rebuild the match terms and drop cached serializations"""
+        self._cached_dict = None
+        self._cached_json = None
+        tokens: Dict[str, float] = {}
+        phrases: Dict[str, float] = {}
+        terms = [(self.name.lower(), 0.5)]
+        terms.extend((kw.lower(), 0.2) for kw in self.keywords)
+        terms.extend((cap.value.replace("_", " "), 0.3) for cap in self.capabilities)
+        for term, weight in terms:
+            # Every term matches as a substring of the query; single ASCII
+            # words are additionally indexed so discovery can prefilter
+            target = tokens if _TOKEN_RE.fullmatch(term) else phrases
+            target[term] = target.get(term, 0.0) + weight
+        self._match_tokens = tokens
+        self._match_phrases = list(phrases.items())
+
+    def add_capability(self, capability: AgentCapability) -> None:
+        """Append a capability (copy-on-write) and refresh the match terms"""
+        self.capabilities = [*self.capabilities, capability]
+        self.reindex()
+
+    def add_keyword(self, keyword: str) -> None:
+        """Append a keyword (copy-on-write) and refresh the match terms"""
+        self.keywords = [*self.keywords, keyword]
+        self.reindex()
 
     def matches_query(self, query: str) -> float:
         """Calculate match score (0-1) for a query"""
-        query_lower = query.lower()
-        score = 0.0
-
-        # Name match
-        if self.name.lower() in query_lower:
-            score += 0.5
-
-        # Keyword match
-        for kw in self.keywords:
-            if kw.lower() in query_lower:
-                score += 0.2
-
-        # Capability match
-        for cap in self.capabilities:
-            if cap.value.replace("_", " ") in query_lower:
-                score += 0.3
+        return self.matches_query_lower(query.lower())
 
+    def matches_query_lower(self, query_lower: str) -> float:
+        """Match score (0-1) for an already lowercased query"""
+        score = 0.0
+        for term, weight in self._match_tokens.items():
+            if term in query_lower:
+                score += weight
+        for phrase, weight in self._match_phrases:
+            if phrase in query_lower:
+                score += weight
         return min(1.0, score)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Serialize to dictionary (for network transport)"""
-        return {
+        """
+        Serialize to dictionary (for network transport)
+
+        The dict is cached and shared between calls; treat it as read-only.
+        """
+        if self._cached_dict is not None:
+            return self._cached_dict
+        self._cached_dict = {
             "name": self.name,
             "description": self.description,
             "version": self.version,
             "capabilities": [c.value for c in self.capabilities],
-            "keywords": self.keywords,
+            "keywords": list(self.keywords),
             "max_context_tokens": self.max_context_tokens,
             "rate_limit_rpm": self.rate_limit_rpm,
-            "preferred_task_types": self.preferred_task_types,
-            "supported_protocols": self.supported_protocols,
-            "metadata": self.metadata,
+            "preferred_task_types": list(self.preferred_task_types),
+            "supported_protocols": list(self.supported_protocols),
+            "metadata": dict(self.metadata),
         }
+        return self._cached_dict
+
+    def to_json_bytes(self) -> bytes:
+        """Pre-encoded JSON form of to_dict() (cached)"""
+        if self._cached_json is None:
+            data = self.to_dict()
+            if HAS_ORJSON:
+                self._cached_json = orjson.dumps(data, default=str)
+            else:
+                self._cached_json = json.dumps(
+                    data, ensure_ascii=False, default=str
+                ).encode()
+        return self._cached_json
 
 
 class TaskStatus(Enum):
@@ -104,12 +221,15 @@ class TaskStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskContract:
     """
     Task Contract - A2A Protocol Task Agreement
 
     Represents a negotiated agreement between agents for task execution.
+
+    Lifecycle timestamps are time.monotonic_ns() readings, so durations are
+    immune to wall-clock changes; use the *_dt properties for datetimes.
     """
 
     task_id: str
@@ -119,34 +239,73 @@ class TaskContract:
     expected_output: str
     priority: int = 1  # 1 (low) - 5 (critical)
     deadline_seconds: Optional[int] = None
-    context: Dict[str, Any] = field(default_factory=dict)
+    context: Mapping[str, Any] = field(default_factory=_empty_mapping)
     status: TaskStatus = TaskStatus.PROPOSED
-    created_at: datetime = field(default_factory=datetime.now)
-    accepted_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
+    created_at: int = field(default_factory=time.monotonic_ns)
+    accepted_at: Optional[int] = None
+    completed_at: Optional[int] = None
     result: Optional[str] = None
 
+    @property
+    def created_dt(self) -> "datetime":
+        return _mono_to_datetime(self.created_at)
+
+    @property
+    def accepted_dt(self) -> Optional["datetime"]:
+        return _mono_to_datetime(self.accepted_at)
+
+    @property
+    def completed_dt(self) -> Optional["datetime"]:
+        return _mono_to_datetime(self.completed_at)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Time from creation to completion (None while still open)"""
+        if self.completed_at is None:
+            return None
+        return (self.completed_at - self.created_at) / 1e6
+
     def accept(self) -> None:
         """Mark contract as accepted"""
         self.status = TaskStatus.ACCEPTED
-        self.accepted_at = datetime.now()
+        self.accepted_at = time.monotonic_ns()
 
     def reject(self, reason: str) -> None:
         """Mark contract as rejected"""
         self.status = TaskStatus.REJECTED
-        self.context["rejection_reason"] = reason
+        self.context = {**self.context, "rejection_reason": reason}
 
     def complete(self, result: str) -> None:
         """Mark contract as completed"""
         self.status = TaskStatus.COMPLETED
         self.result = result
-        self.completed_at = datetime.now()
+        self.completed_at = time.monotonic_ns()
 
     def fail(self, error: str) -> None:
         """Mark contract as failed"""
         self.status = TaskStatus.FAILED
-        self.context["error"] = error
-        self.completed_at = datetime.now()
+        self.context = {**self.context, "error": error}
+        self.completed_at = time.monotonic_ns()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to dictionary (timestamps as ISO strings)"""
+        accepted = self.accepted_dt
+        completed = self.completed_dt
+        return {
+            "task_id": self.task_id,
+            "from_agent": self.from_agent,
+            "to_agent": self.to_agent,
+            "description": self.description,
+            "expected_output": self.expected_output,
+            "priority": self.priority,
+            "deadline_seconds": self.deadline_seconds,
+            "context": dict(self.context),
+            "status": self.status.value,
+            "created_at": self.created_dt.isoformat(),
+            "accepted_at": accepted.isoformat() if accepted else None,
+            "completed_at": completed.isoformat() if completed else None,
+            "result": self.result,
+        }
 
 
 class AgentDiscovery:
@@ -155,26 +314,105 @@ class AgentDiscovery:
 
     Maintains a registry of available agents and their capabilities.
     Supports querying agents by capability, task type, or natural language.
+
+    Indexes are maintained on register/unregister; re-register a card after
+    mutating it so the indexes pick up the change.
+
+    With weak_refs=True the registry only holds weak references: a card is
+    dropped (and unindexed) once its owner releases it, without an explicit
+    unregister. The owner must then keep the card alive while it should stay
+    discoverable.
     """
 
-    def __init__(self):
-        self._agents: Dict[str, AgentCard] = {}
+    def __init__(self, weak_refs: bool = False):
+        self._weak = weak_refs
+        self._agents: Dict[str, AgentCard] = (
+            weakref.WeakValueDictionary() if weak_refs else {}
+        )
+        # name -> finalizer that unindexes a collected card (weak_refs only)
+        self._finalizers: Dict[str, weakref.finalize] = {}
+        # capability -> {name: card} of agents advertising it (registration order)
+        self._by_capability: Dict[AgentCapability, Dict[str, AgentCard]] = {}
+        # lowercase name/keyword token -> names of agents matching it
+        self._by_keyword: Dict[str, Set[str]] = {}
+        # Longest indexed token: bounds the query substrings probed in discover()
+        self._max_token_len = 0
+        # agents with substring-matched terms (phrases, CJK), scored on every query
+        self._phrase_agents: Set[str] = set()
+        self._capability_counts: Counter = Counter()
 
     def register(self, card: AgentCard) -> None:
         """Register an agent"""
+        old = self._agents.get(card.name)
+        if old is not None:
+            self._release(old)
         self._agents[card.name] = card
+        for cap in card.capabilities:
+            cards = self._by_capability.get(cap)
+            if cards is None:
+                cards = self._by_capability[cap] = (
+                    weakref.WeakValueDictionary() if self._weak else {}
+                )
+            cards[card.name] = card
+            self._capability_counts[cap.value] += 1
+        for token in card._match_tokens:
+            self._by_keyword.setdefault(token, set()).add(card.name)
+            if len(token) > self._max_token_len:
+                self._max_token_len = len(token)
+        if card._match_phrases:
+            self._phrase_agents.add(card.name)
+        if self._weak:
+            # Index keys are captured by value: the callback must not reference the card
+            finalizer = weakref.finalize(
+                card,
+                self._unindex,
+                card.name,
+                tuple(card.capabilities),
+                tuple(card._match_tokens),
+            )
+            finalizer.atexit = False
+            self._finalizers[card.name] = finalizer
         logger.info(
             f"A2A: Registered agent {card.name} with capabilities: {[c.value for c in card.capabilities]}"
         )
 
     def unregister(self, name: str) -> bool:
         """Unregister an agent"""
-        if name in self._agents:
-            del self._agents[name]
+        card = self._agents.pop(name, None)
+        if card is not None:
+            self._release(card)
             logger.info(f"A2A: Unregistered agent {name}")
             return True
         return False
 
+    def _release(self, card: AgentCard) -> None:
+        """Unindex a card that is being replaced or unregistered"""
+        finalizer = self._finalizers.pop(card.name, None)
+        if finalizer is not None:
+            finalizer.detach()
+        self._unindex(card.name, card.capabilities, card._match_tokens)
+
+    def _unindex(self, name: str, capabilities, tokens) -> None:
+        """Remove a card from the capability and keyword indexes"""
+        self._finalizers.pop(name, None)
+        counts = self._capability_counts
+        for cap in capabilities:
+            cards = self._by_capability.get(cap)
+            if cards is not None:
+                cards.pop(name, None)
+                if not cards:
+                    del self._by_capability[cap]
+            counts[cap.value] -= 1
+            if counts[cap.value] <= 0:
+                del counts[cap.value]
+        for token in tokens:
+            names = self._by_keyword.get(token)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._by_keyword[token]
+        self._phrase_agents.discard(name)
+
     def discover(
         self,
         query: Optional[str] = None,
@@ -192,25 +430,53 @@ class AgentDiscovery:
         Returns:
             List of matching AgentCards
         """
-        candidates = []
+        if capability:
+            # Only agents advertising the capability
+            cards = self._by_capability.get(capability, {}).values()
+        else:
+            cards = self._agents.values()
+
+        if not query:
+            return list(islice(cards, top_k))
+
+        query_lower, qtokens = _tokenize_query(query)
+        # An indexed word occurs in the query iff it is a substring of one of
+        # the query's word tokens, so probe those substrings (bounded by the
+        # longest indexed word); phrase/CJK agents are always scored
+        matchable = set(self._phrase_agents)
+        by_keyword = self._by_keyword
+        max_len = self._max_token_len
+        for token in qtokens:
+            n = len(token)
+            for i in range(n):
+                for j in range(i + 1, min(n, i + max_len) + 1):
+                    names = by_keyword.get(token[i:j])
+                    if names:
+                        matchable |= names
+        if not matchable:
+            return []
 
-        for card in self._agents.values():
-            # Capability filter
-            if capability and capability not in card.capabilities:
+        candidates = []
+        for card in cards:
+            if card.name not in matchable:
                 continue
+            score = card.matches_query_lower(query_lower)
+            if score > 0.1:
+                candidates.append((score, card))
 
-            # Query scoring
-            if query:
-                score = card.matches_query(query)
-                if score > 0.1:
-                    candidates.append((score, card))
-            else:
-                candidates.append((1.0, card))
-
-        # Sort by score
-        candidates.sort(key=lambda x: x[0], reverse=True)
+        # Top-k by score, O(N log k)
+        top = heapq.nlargest(top_k, candidates, key=lambda x: x[0])
+        return [card for _, card in top]
 
-        return [card for _, card in candidates[:top_k]]
+    def discover_json(
+        self,
+        query: Optional[str] = None,
+        capability: Optional[AgentCapability] = None,
+        top_k: int = 5,
+    ) -> bytes:
+        """discover() encoded as a JSON array, reusing each card's cached bytes"""
+        cards = self.discover(query, capability, top_k)
+        return b"[" + b",".join(card.to_json_bytes() for card in cards) + b"]"
 
     def get(self, name: str) -> Optional[AgentCard]:
         """Get agent by name"""
@@ -222,14 +488,9 @@ class AgentDiscovery:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get discovery service stats"""
-        capability_counts = {}
-        for card in self._agents.values():
-            for cap in card.capabilities:
-                capability_counts[cap.value] = capability_counts.get(cap.value, 0) + 1
-
         return {
             "total_agents": len(self._agents),
-            "capability_distribution": capability_counts,
+            "capability_distribution": dict(self._capability_counts),
         }
 
 
@@ -10,12 +10,83 @@ Blast Radius Analyzer - 代码影响分析器
 - 核心节点: 入度高的文件 (修改影响大)
 """
 
+import json
+import os
+from bisect import bisect_left
 import re
-from dataclasses import dataclass
-from typing import List, Set, Dict, Optional
+import sys
+from collections import deque
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Iterator, List, Set, Dict, Optional, Tuple, Union
 from enum import Enum
 from pathlib import Path
 
+try:
+    import ahocorasick
+
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+
+# 从行首匹配 from X import Y 和 import X (允许缩进：函数内的延迟导入也是依赖)
+_IMPORT_RE = re.compile(r"[ \t]*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))")
+
+
+def _scan_file(file_path: str, size: int, max_bytes: int) -> List[str]:
+    """扫描单个文件导入的模块名"""
+    if size > max_bytes:
+        return []
+    try:
+        with open(file_path, encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except Exception:
+        return []
+
+    # 先用 str.find 定位含 "import" 的行，只对这些行的行首运行正则
+    modules: List[str] = []
+    find = content.find
+    rfind = content.rfind
+    match = _IMPORT_RE.match
+    pos = find("import")
+    while pos != -1:
+        m = match(content, rfind("\n", 0, pos) + 1)
+        if m:
+            modules.append(m.group(1) or m.group(2))
+        line_end = find("\n", pos)
+        if line_end == -1:
+            break
+        pos = find("import", line_end)
+    return modules
+
+
+@lru_cache(maxsize=4096)
+def _module_to_paths(module: str) -> Tuple[str, str]:
+    """将模块名转换为可能的文件路径 (缓存；少数模块占绝大多数导入)"""
+    base = module.replace(".", "/")
+    return (
+        # council.agents.base -> council/agents/base.py
+        sys.intern(base + ".py"),
+        # council.agents -> council/agents/__init__.py
+        sys.intern(base + "/__init__.py"),
+    )
+
+
+@lru_cache(maxsize=32)
+def _compile_substring_matcher(keywords: Tuple[str, ...]) -> Callable[[str], bool]:
+    """
+    生成专用的子串匹配函数: ``lambda p: "kw1" in p or "kw2" in p ...``
+
+    关键词展开为常量表达式，避免 any(...) 的生成器开销；按关键词元组缓存，
+    同一组关键词的所有实例共享同一函数。
+    """
+    body = " or ".join(f"{kw!r} in p" for kw in keywords) or "False"
+    namespace: Dict[str, Callable[[str], bool]] = {}
+    exec(f"def _match(p):\n    return {body}\n", namespace)
+    return namespace["_match"]
+
 
 class ImpactLevel(Enum):
     """影响级别"""
@@ -26,7 +97,7 @@ class ImpactLevel(Enum):
     CORE = "core"          # 核心模块 (10+ 依赖者)
 
 
-@dataclass
+@dataclass(slots=True)
 class BlastRadiusResult:
     """影响分析结果"""
     file_path: str
@@ -64,6 +135,32 @@ class BlastRadiusAnalyzer:
         ".env", "config/", "credentials",
     ]
 
+    # 入度阈值 -> 影响级别: 0 叶节点, 1-2 低, 3-5 中, 6-10 高, 10+ 核心
+    _THRESHOLDS = (0, 2, 5, 10)
+    _LEVELS = (
+        ImpactLevel.LEAF,
+        ImpactLevel.LOW,
+        ImpactLevel.MEDIUM,
+        ImpactLevel.HIGH,
+        ImpactLevel.CORE,
+    )
+    # 命中核心关键词时提升为 MEDIUM 的级别
+    _PROMOTABLE = frozenset({ImpactLevel.LEAF, ImpactLevel.LOW})
+    _FULL_COUNCIL_LEVELS = frozenset({ImpactLevel.HIGH, ImpactLevel.CORE})
+    _LEVEL_RANK = {level: rank for rank, level in enumerate(_LEVELS)}
+    _NO_DEPENDENTS: frozenset = frozenset()
+    # BlastRadiusResult.dependents 最多返回的数量
+    MAX_DEPENDENTS = 10
+
+    # 超过此大小的文件视为非源码，跳过
+    MAX_FILE_BYTES = 1024 * 1024
+
+    # 增量构建缓存 (相对项目根目录)
+    CACHE_PATH = ".blast_cache/imports.json"
+
+    # 扫描时跳过的目录
+    SKIP_DIRS = frozenset({".git", "__pycache__", "node_modules", ".venv", "venv"})
+
     def __init__(self, project_root: str = "."):
         """
         初始化分析器
@@ -72,74 +169,150 @@ class BlastRadiusAnalyzer:
             project_root: 项目根目录
         """
         self.project_root = Path(project_root).resolve()
+        self._build_keyword_matcher()
+        # 标准化路径 -> (是否核心关键词, 是否敏感路径)
+        self._keyword_cache: Dict[str, Tuple[bool, bool]] = {}
         self._import_graph: Dict[str, Set[str]] = {}
         self._reverse_graph: Dict[str, Set[str]] = {}
         self._is_built = False
+        # 紧凑反向邻接表 (节点 id -> 依赖者 id 列表)，按需从 _reverse_graph 构建
+        self._node_ids: Optional[Dict[str, int]] = None
+        self._node_paths: List[str] = []
+        self._dependents_adj: List[List[int]] = []
+
+    def _build_keyword_matcher(self) -> None:
+        """预编译 CORE_KEYWORDS / SENSITIVE_PATHS，analyze 时单次扫描路径"""
+        if HAS_AHOCORASICK:
+            automaton = ahocorasick.Automaton()
+            for kw in self.CORE_KEYWORDS:
+                automaton.add_word(kw, "core")
+            for sens in self.SENSITIVE_PATHS:
+                # 同时出现在两组中的词视为两者都命中
+                tag = "both" if sens in self.CORE_KEYWORDS else "sens"
+                automaton.add_word(sens, tag)
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            self._automaton = None
+            self._check_core = _compile_substring_matcher(tuple(self.CORE_KEYWORDS))
+            self._check_sensitive = _compile_substring_matcher(
+                tuple(self.SENSITIVE_PATHS)
+            )
 
-    def build_graph(self, scan_dirs: Optional[List[str]] = None) -> None:
+    def _match_keywords(self, path_lower: str) -> Tuple[bool, bool]:
+        """返回 (是否命中核心关键词, 是否为安全敏感路径)"""
+        automaton = self._automaton
+        if automaton is None:
+            return self._check_core(path_lower), self._check_sensitive(path_lower)
+        is_core = is_sensitive = False
+        for _, tag in automaton.iter(path_lower):
+            if tag != "sens":
+                is_core = True
+            if tag != "core":
+                is_sensitive = True
+            if is_core and is_sensitive:
+                break
+        return is_core, is_sensitive
+
+    def build_graph(
+        self, scan_dirs: Optional[List[str]] = None, incremental: bool = False
+    ) -> None:
         """
         构建导入关系图
 
         Args:
             scan_dirs: 要扫描的目录列表，默认扫描整个项目
+            incremental: 为 True 时使用 CACHE_PATH 缓存，
+                仅重新解析 (mtime, size) 变化的文件
         """
         scan_dirs = scan_dirs or ["council", "src"]
+        cache = self._load_cache() if incremental else {}
+        new_cache: Dict[str, Tuple[int, int, List[str]]] = {}
 
+        files: List[Tuple[str, str, os.stat_result]] = []
         for scan_dir in scan_dirs:
             dir_path = self.project_root / scan_dir
-            if not dir_path.exists():
-                continue
-
-            for py_file in dir_path.rglob("*.py"):
-                self._analyze_file_imports(py_file)
-
+            if dir_path.is_dir():
+                files.extend(self._iter_py(str(dir_path)))
+
+        # 先命中缓存，再批量解析未命中的文件
+        modules_by_path: Dict[str, List[str]] = {}
+        misses: List[Tuple[str, str, os.stat_result]] = []
+        for full_path, rel_path, st in files:
+            entry = cache.get(rel_path)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                modules_by_path[rel_path] = entry[2]
+            else:
+                misses.append((full_path, rel_path, st))
+        for full_path, rel_path, st in misses:
+            modules_by_path[rel_path] = self._scan_imports(full_path, st.st_size)
+
+        for _, rel_path, st in files:
+            modules = modules_by_path[rel_path]
+            new_cache[rel_path] = (st.st_mtime_ns, st.st_size, modules)
+            self._add_edges(rel_path, modules)
+
+        if incremental:
+            self._save_cache(new_cache)
+
+        self._node_ids = None  # 图已变化，紧凑邻接表需重建
         self._is_built = True
 
-    def _analyze_file_imports(self, file_path: Path) -> None:
-        """分析单个文件的导入"""
-        rel_path = str(file_path.relative_to(self.project_root))
-
-        if rel_path not in self._import_graph:
-            self._import_graph[rel_path] = set()
-
+    def _iter_py(self, root: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+        """遍历 root 下的 .py 文件，产出 (绝对路径, 相对路径, stat)"""
+        prefix_len = len(str(self.project_root)) + 1
+        skip = self.SKIP_DIRS
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in skip]
+            for name in filenames:
+                if not name.endswith(".py"):
+                    continue
+                full_path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full_path)
+                except OSError:
+                    continue
+                rel_path = full_path[prefix_len:]
+                if os.sep != "/":
+                    rel_path = rel_path.replace(os.sep, "/")
+                yield full_path, rel_path, st
+
+    def _scan_imports(self, file_path: Union[str, Path], size: int) -> List[str]:
+        """扫描单个文件导入的模块名 (单次正则扫描)"""
+        return _scan_file(str(file_path), size, self.MAX_FILE_BYTES)
+
+    def _add_edges(self, rel_path: str, modules: List[str]) -> None:
+        """将文件的导入写入正向图和反向图"""
+        # 路径字符串驻留：各集合共享同一对象，节省内存并加快集合比较
+        rel_path = sys.intern(rel_path)
+        deps = self._import_graph.setdefault(rel_path, set())
+        for imported_module in modules:
+            # 转换为可能的文件路径
+            for possible_path in _module_to_paths(imported_module):
+                deps.add(possible_path)
+                # 反向图: 记录谁依赖了 possible_path
+                self._reverse_graph.setdefault(possible_path, set()).add(rel_path)
+
+    def _load_cache(self) -> Dict[str, list]:
+        """读取增量缓存 {rel_path: [mtime_ns, size, modules]}"""
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-        except Exception:
-            return
-
-        # 匹配 from X import Y 和 import X
-        import_patterns = [
-            r"from\s+([\w.]+)\s+import",
-            r"^import\s+([\w.]+)",
-        ]
-
-        for pattern in import_patterns:
-            for match in re.finditer(pattern, content, re.MULTILINE):
-                imported_module = match.group(1)
-                # 转换为可能的文件路径
-                possible_paths = self._module_to_paths(imported_module)
-                for possible_path in possible_paths:
-                    self._import_graph[rel_path].add(possible_path)
-
-                    # 反向图: 记录谁依赖了 possible_path
-                    if possible_path not in self._reverse_graph:
-                        self._reverse_graph[possible_path] = set()
-                    self._reverse_graph[possible_path].add(rel_path)
-
-    def _module_to_paths(self, module: str) -> List[str]:
-        """将模块名转换为可能的文件路径"""
-        parts = module.split(".")
-        paths = []
-
-        # council.agents.base -> council/agents/base.py
-        file_path = "/".join(parts) + ".py"
-        paths.append(file_path)
-
-        # council.agents -> council/agents/__init__.py
-        dir_path = "/".join(parts) + "/__init__.py"
-        paths.append(dir_path)
-
-        return paths
+            with open(self.project_root / self.CACHE_PATH, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_cache(self, cache: Dict[str, Tuple[int, int, List[str]]]) -> None:
+        """写回增量缓存 (失败时忽略，下次全量解析)"""
+        cache_file = self.project_root / self.CACHE_PATH
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            tmp.replace(cache_file)
+        except OSError:
+            pass
 
     def analyze(self, file_path: str) -> BlastRadiusResult:
         """
@@ -155,46 +328,36 @@ class BlastRadiusAnalyzer:
             self.build_graph()
 
         # 标准化路径
-        file_path = file_path.replace("\\", "/")
-
-        # 获取入度 (依赖者数量)
-        dependents = list(self._reverse_graph.get(file_path, set()))
-        incoming_count = len(dependents)
-
-        # 检查是否为核心模块 (基于关键词)
-        is_core_keyword = any(
-            kw in file_path.lower() for kw in self.CORE_KEYWORDS
-        )
-
-        # 检查是否为安全敏感路径
-        is_sensitive = any(
-            sens in file_path.lower() for sens in self.SENSITIVE_PATHS
-        )
+        if "\\" in file_path:
+            file_path = file_path.replace("\\", "/")
+
+        # 获取入度 (依赖者数量)；只物化返回的前 MAX_DEPENDENTS 个依赖者
+        dependent_set = self._reverse_graph.get(file_path, self._NO_DEPENDENTS)
+        incoming_count: int = len(dependent_set)
+        dependents: List[str] = list(islice(dependent_set, self.MAX_DEPENDENTS))
+
+        # 检查是否为核心模块 (基于关键词) 及安全敏感路径，单次扫描
+        flags = self._keyword_cache.get(file_path)
+        if flags is None:
+            flags = self._keyword_cache[file_path] = self._match_keywords(
+                file_path.lower()
+            )
+        is_core_keyword, is_sensitive = flags
 
         # 计算影响级别
-        if incoming_count == 0:
-            impact_level = ImpactLevel.LEAF
-        elif incoming_count <= 2:
-            impact_level = ImpactLevel.LOW
-        elif incoming_count <= 5:
-            impact_level = ImpactLevel.MEDIUM
-        elif incoming_count <= 10:
-            impact_level = ImpactLevel.HIGH
-        else:
-            impact_level = ImpactLevel.CORE
+        impact_level = self._LEVELS[bisect_left(self._THRESHOLDS, incoming_count)]
 
         # 关键词加权
-        if is_core_keyword and impact_level.value in ["leaf", "low"]:
+        if is_core_keyword and impact_level in self._PROMOTABLE:
             impact_level = ImpactLevel.MEDIUM
 
         # 判断是否需要全理事会
         requires_full_council = (
-            impact_level in [ImpactLevel.HIGH, ImpactLevel.CORE]
-            or is_sensitive
+            impact_level in self._FULL_COUNCIL_LEVELS or is_sensitive
         )
 
         # 生成原因说明
-        reasons = []
+        reasons: List[str] = []
         if incoming_count > 0:
             reasons.append(f"{incoming_count} 个文件依赖此模块")
         if is_core_keyword:
@@ -208,12 +371,61 @@ class BlastRadiusAnalyzer:
             file_path=file_path,
             impact_level=impact_level,
             incoming_count=incoming_count,
-            dependents=dependents[:10],  # 只返回前 10 个
+            dependents=dependents,
             is_core_module=is_core_keyword or incoming_count >= 5,
             requires_full_council=requires_full_council,
             reason="; ".join(reasons),
         )
 
+    def _compact(self) -> Dict[str, int]:
+        """为每个路径分配连续 id，并构建整数邻接表 (CSR 风格，避免 BFS 中的字符串哈希)"""
+        if self._node_ids is None:
+            ids: Dict[str, int] = {}
+            for path in self._import_graph:
+                ids.setdefault(path, len(ids))
+            for path in self._reverse_graph:
+                ids.setdefault(path, len(ids))
+            adj: List[List[int]] = [[] for _ in range(len(ids))]
+            for path, dependents in self._reverse_graph.items():
+                adj[ids[path]] = [ids[d] for d in dependents]
+            self._node_paths = list(ids)
+            self._dependents_adj = adj
+            self._node_ids = ids
+        return self._node_ids
+
+    def transitive_dependents(self, file_path: str) -> List[str]:
+        """
+        获取直接或间接依赖此文件的所有文件 (级联影响范围)
+
+        Args:
+            file_path: 相对于项目根目录的文件路径
+
+        Returns:
+            依赖者路径列表 (按 BFS 距离排序，不含自身)
+        """
+        if not self._is_built:
+            self.build_graph()
+
+        ids = self._compact()
+        start = ids.get(file_path.replace("\\", "/"))
+        if start is None:
+            return []
+
+        adj = self._dependents_adj
+        seen = [False] * len(adj)
+        seen[start] = True
+        order: List[int] = []
+        queue = deque([start])
+        while queue:
+            for dep in adj[queue.popleft()]:
+                if not seen[dep]:
+                    seen[dep] = True
+                    order.append(dep)
+                    queue.append(dep)
+
+        paths = self._node_paths
+        return [paths[i] for i in order]
+
     def analyze_multiple(self, file_paths: List[str]) -> BlastRadiusResult:
         """
         分析多个文件的综合影响
@@ -233,15 +445,12 @@ class BlastRadiusAnalyzer:
 
         results = [self.analyze(fp) for fp in file_paths]
 
-        # 返回影响最大的
-        level_order = [ImpactLevel.CORE, ImpactLevel.HIGH, ImpactLevel.MEDIUM, ImpactLevel.LOW, ImpactLevel.LEAF]
-        for level in level_order:
-            for result in results:
-                if result.impact_level == level:
-                    result.reason = f"[{len(file_paths)} 个文件中最高影响] " + result.reason
-                    return result
-
-        return results[0]
+        # 返回影响最大的 (同级取最先出现者)；不修改 analyze 的结果对象
+        rank = self._LEVEL_RANK
+        winner = max(results, key=lambda r: rank[r.impact_level])
+        return replace(
+            winner, reason=f"[{len(file_paths)} 个文件中最高影响] " + winner.reason
+        )
 
     def get_stats(self) -> Dict[str, int]:
         """获取图谱统计"""
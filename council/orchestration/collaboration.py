@@ -11,15 +11,28 @@ Provides structured collaboration patterns for multi-agent workflows:
 from __future__ import annotations
 
 import asyncio
+import functools
+import heapq
+import itertools
 import logging
+import secrets
+import time
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Tuple
-import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Session IDs: random per-process prefix + counter (unique within the process)
+_SESSION_PREFIX = secrets.token_hex(2)
+_session_counter = itertools.count()
+
+
+def _new_session_id() -> str:
+    return f"{_SESSION_PREFIX}{next(_session_counter):04x}"
+
 
 class CollaborationMode(Enum):
     """Collaboration modes."""
@@ -30,7 +43,7 @@ class CollaborationMode(Enum):
     DELEGATE = "delegate"      # One agent delegates to another
 
 
-@dataclass
+@dataclass(slots=True)
 class CollaborationResult:
     """
     Result of a collaboration session.
@@ -70,7 +83,7 @@ class CollaborationResult:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Vote:
     """A vote from an agent."""
     agent: str
@@ -78,8 +91,16 @@ class Vote:
     confidence: float = 1.0
     rationale: str = ""
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "agent": self.agent,
+            "choice": self.choice,
+            "confidence": self.confidence,
+            "rationale": self.rationale,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class BrainstormIdea:
     """An idea from brainstorming."""
     agent: str
@@ -94,6 +115,44 @@ AgentFunc = Callable[[str, Dict[str, Any]], Any]
 AsyncAgentFunc = Callable[[str, Dict[str, Any]], Any]
 
 
+@functools.lru_cache(maxsize=256)
+def _is_coro_cached(func: AsyncAgentFunc) -> bool:
+    return asyncio.iscoroutinefunction(func)
+
+
+def _is_coro(func: AsyncAgentFunc) -> bool:
+    """iscoroutinefunction, memoized per agent callable."""
+    try:
+        return _is_coro_cached(func)
+    except TypeError:  # unhashable callable
+        return asyncio.iscoroutinefunction(func)
+
+
+async def _call_agent(func: AsyncAgentFunc, prompt: str, payload: Dict[str, Any]) -> Any:
+    """Call an agent function, running sync functions in a worker thread."""
+    if _is_coro(func):
+        return await func(prompt, payload)
+    return await asyncio.to_thread(func, prompt, payload)
+
+
+def _preview(value: Any, limit: int) -> str:
+    """Truncated text for decision logs; strings within the limit are reused as-is."""
+    if not isinstance(value, str):
+        value = str(value)
+    return value if len(value) <= limit else value[:limit]
+
+
+async def _bounded_gather(coros: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """asyncio.gather with at most ``limit`` coroutines in flight."""
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _run(coro: Awaitable[Any]) -> Any:
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*[_run(c) for c in coros])
+
+
 class CollaborationOrchestrator:
     """
     Orchestrates collaboration patterns between agents (2026).
@@ -122,8 +181,17 @@ class CollaborationOrchestrator:
         )
     """
 
-    def __init__(self):
-        self._sessions: Dict[str, CollaborationResult] = {}
+    def __init__(self, max_concurrency: int = 8, max_sessions: int = 1024):
+        """
+        Args:
+            max_concurrency: Maximum concurrent agent calls per gather
+                (bounds in-flight LLM requests for large agent panels)
+            max_sessions: Maximum retained sessions; least recently used
+                sessions are evicted beyond this
+        """
+        self.max_concurrency = max_concurrency
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, CollaborationResult]" = OrderedDict()
 
     async def pair_programming(
         self,
@@ -149,52 +217,38 @@ class CollaborationOrchestrator:
         Returns:
             CollaborationResult
         """
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        session_id = uuid.uuid4().hex[:8]
+        session_id = _new_session_id()
         ctx = context or {}
         decisions = []
         code = ""
         feedback = ""
         approved = False
+        # Session-invariant keys are merged once; each call copies this base
+        base = {**ctx, "task": task}
 
         for iteration in range(max_iterations):
             logger.info(f"Pair programming iteration {iteration + 1}/{max_iterations}")
 
             # Coder writes/updates code
-            coder_input = {
-                **ctx,
-                "task": task,
-                "iteration": iteration,
-                "previous_code": code,
-                "feedback": feedback,
-            }
+            coder_input = dict(
+                base, iteration=iteration, previous_code=code, feedback=feedback
+            )
 
-            if asyncio.iscoroutinefunction(coder):
-                code = await coder(task, coder_input)
-            else:
-                code = coder(task, coder_input)
+            code = await _call_agent(coder, task, coder_input)
 
             decisions.append({
                 "iteration": iteration,
                 "agent": "coder",
                 "action": "write_code",
-                "output_preview": str(code)[:200],
+                "output_preview": _preview(code, 200),
             })
 
             # Reviewer reviews code
-            reviewer_input = {
-                **ctx,
-                "task": task,
-                "code": code,
-                "iteration": iteration,
-            }
+            reviewer_input = dict(base, code=code, iteration=iteration)
 
-            if asyncio.iscoroutinefunction(reviewer):
-                review_result = await reviewer(code, reviewer_input)
-            else:
-                review_result = reviewer(code, reviewer_input)
+            review_result = await _call_agent(reviewer, code, reviewer_input)
 
             # Parse review result
             if isinstance(review_result, dict):
@@ -219,7 +273,7 @@ class CollaborationOrchestrator:
                 logger.info(f"Code approved at iteration {iteration + 1}")
                 break
 
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter() - start_time) * 1000
 
         result = CollaborationResult(
             session_id=session_id,
@@ -233,7 +287,7 @@ class CollaborationOrchestrator:
             consensus_score=1.0 if approved else 0.0,
         )
 
-        self._sessions[session_id] = result
+        self._store(session_id, result)
         return result
 
     async def design_review(
@@ -259,10 +313,9 @@ class CollaborationOrchestrator:
         Returns:
             CollaborationResult
         """
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        session_id = uuid.uuid4().hex[:8]
+        session_id = _new_session_id()
         ctx = context or {}
         criteria = criteria or ["security", "scalability", "maintainability"]
         decisions = []
@@ -274,34 +327,27 @@ class CollaborationOrchestrator:
             "criteria": criteria,
         }
 
-        if asyncio.iscoroutinefunction(architect):
-            explanation = await architect(design, architect_input)
-        else:
-            explanation = architect(design, architect_input)
+        explanation = await _call_agent(architect, design, architect_input)
 
         decisions.append({
             "agent": "architect",
             "action": "explain_design",
-            "output": str(explanation)[:500],
+            "output": _preview(explanation, 500),
         })
 
-        # Auditor evaluates against criteria
-        audit_results = {}
-        overall_score = 0.0
+        # Auditor evaluates against criteria (criteria are independent, run concurrently)
+        audit_base = {**ctx, "design": design, "explanation": explanation}
 
-        for criterion in criteria:
-            auditor_input = {
-                **ctx,
-                "design": design,
-                "explanation": explanation,
-                "criterion": criterion,
-            }
+        async def _eval(criterion: str) -> Any:
+            auditor_input = dict(audit_base, criterion=criterion)
+            return await _call_agent(auditor, criterion, auditor_input)
 
-            if asyncio.iscoroutinefunction(auditor):
-                evaluation = await auditor(criterion, auditor_input)
-            else:
-                evaluation = auditor(criterion, auditor_input)
+        evaluations = await _bounded_gather(
+            [_eval(c) for c in criteria], self.max_concurrency
+        )
 
+        audit_results = {}
+        for criterion, evaluation in zip(criteria, evaluations):
             # Parse evaluation
             if isinstance(evaluation, dict):
                 score = evaluation.get("score", 0.5)
@@ -317,7 +363,6 @@ class CollaborationOrchestrator:
                 "score": score,
                 "feedback": feedback,
             }
-            overall_score += score
 
             decisions.append({
                 "agent": "auditor",
@@ -326,9 +371,10 @@ class CollaborationOrchestrator:
                 "feedback": feedback,
             })
 
+        overall_score = sum(r["score"] for r in audit_results.values())
         overall_score /= len(criteria) if criteria else 1
 
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter() - start_time) * 1000
 
         result = CollaborationResult(
             session_id=session_id,
@@ -346,7 +392,7 @@ class CollaborationOrchestrator:
             consensus_score=overall_score,
         )
 
-        self._sessions[session_id] = result
+        self._store(session_id, result)
         return result
 
     async def brainstorm(
@@ -372,10 +418,9 @@ class CollaborationOrchestrator:
         Returns:
             CollaborationResult
         """
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        session_id = uuid.uuid4().hex[:8]
+        session_id = _new_session_id()
         ctx = context or {}
         all_ideas: List[BrainstormIdea] = []
         decisions = []
@@ -383,64 +428,89 @@ class CollaborationOrchestrator:
         for round_num in range(rounds):
             logger.info(f"Brainstorm round {round_num + 1}/{rounds}")
 
-            # Each agent generates ideas
-            for agent_name, agent_func in agents:
-                agent_input = {
-                    **ctx,
-                    "topic": topic,
-                    "round": round_num,
-                    "existing_ideas": [i.idea for i in all_ideas],
-                    "ideas_requested": ideas_per_round,
-                }
+            # Agents in one round only see ideas from previous rounds
+            round_input = {
+                **ctx,
+                "topic": topic,
+                "round": round_num,
+                "existing_ideas": [i.idea for i in all_ideas],
+                "ideas_requested": ideas_per_round,
+            }
 
-                if asyncio.iscoroutinefunction(agent_func):
-                    response = await agent_func(topic, agent_input)
-                else:
-                    response = agent_func(topic, agent_input)
+            async def _run_agent(agent_name: str, agent_func: AsyncAgentFunc):
+                response = await _call_agent(agent_func, topic, dict(round_input))
 
-                # Parse response into ideas
+                # Parse response into ideas (at most ideas_per_round)
                 if isinstance(response, list):
-                    ideas = response
-                elif isinstance(response, str):
-                    ideas = [line.strip() for line in response.split("\n") if line.strip()]
-                else:
-                    ideas = [str(response)]
-
-                for idea in ideas[:ideas_per_round]:
+                    return agent_name, response[:ideas_per_round]
+                if not isinstance(response, str):
+                    return agent_name, [str(response)][:ideas_per_round]
+
+                picked: List[str] = []
+                if ideas_per_round > 0:
+                    for line in response.splitlines():
+                        stripped = line.strip()
+                        if stripped:
+                            picked.append(stripped)
+                            if len(picked) >= ideas_per_round:
+                                break
+                return agent_name, picked
+
+            results = await _bounded_gather(
+                [_run_agent(n, f) for n, f in agents], self.max_concurrency
+            )
+
+            # Ideas from one round share a single timestamp
+            round_ts = datetime.now().isoformat()
+            category = f"round_{round_num}"
+            for agent_name, ideas in results:
+                for idea in ideas:
                     all_ideas.append(BrainstormIdea(
                         agent=agent_name,
                         idea=idea,
-                        category=f"round_{round_num}",
+                        category=category,
+                        timestamp=round_ts,
                     ))
 
                 decisions.append({
                     "round": round_num,
                     "agent": agent_name,
                     "action": "generate_ideas",
-                    "ideas_count": len(ideas[:ideas_per_round]),
+                    "ideas_count": len(ideas),
                 })
 
         # Optional: voting round
         if len(all_ideas) > 0 and len(agents) > 1:
-            for agent_name, agent_func in agents:
-                vote_input = {
-                    **ctx,
-                    "topic": topic,
-                    "ideas": [i.idea for i in all_ideas],
-                    "vote_count": min(3, len(all_ideas)),
-                }
-
-                if asyncio.iscoroutinefunction(agent_func):
-                    votes = await agent_func("vote", vote_input)
-                else:
-                    votes = agent_func("vote", vote_input)
+            vote_input = {
+                **ctx,
+                "topic": topic,
+                "ideas": [i.idea for i in all_ideas],
+                "vote_count": min(3, len(all_ideas)),
+            }
+            ballots = await _bounded_gather(
+                [
+                    _call_agent(agent_func, "vote", dict(vote_input))
+                    for _, agent_func in agents
+                ],
+                self.max_concurrency,
+            )
+
+            # Exact idea text -> first index; substring scan only on a miss
+            idx_by_text: Dict[str, int] = {}
+            for k, idea in enumerate(all_ideas):
+                idx_by_text.setdefault(idea.idea, k)
 
-                # Parse votes (expecting list of indices or ideas)
+            # Parse votes (expecting list of indices or ideas)
+            for votes in ballots:
                 if isinstance(votes, list):
                     for vote in votes:
                         if isinstance(vote, int) and 0 <= vote < len(all_ideas):
                             all_ideas[vote].votes += 1
                         elif isinstance(vote, str):
+                            k = idx_by_text.get(vote)
+                            if k is not None:
+                                all_ideas[k].votes += 1
+                                continue
                             for idea in all_ideas:
                                 if vote in idea.idea:
                                     idea.votes += 1
@@ -449,7 +519,7 @@ class CollaborationOrchestrator:
         # Sort by votes
         all_ideas.sort(key=lambda x: x.votes, reverse=True)
 
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter() - start_time) * 1000
 
         result = CollaborationResult(
             session_id=session_id,
@@ -470,7 +540,7 @@ class CollaborationOrchestrator:
             },
         )
 
-        self._sessions[session_id] = result
+        self._store(session_id, result)
         return result
 
     async def build_consensus(
@@ -481,6 +551,7 @@ class CollaborationOrchestrator:
         threshold: float = 0.66,
         max_rounds: int = 3,
         context: Optional[Dict[str, Any]] = None,
+        early_stop: bool = True,
     ) -> CollaborationResult:
         """
         Build consensus among agents.
@@ -494,40 +565,47 @@ class CollaborationOrchestrator:
             threshold: Consensus threshold (0-1)
             max_rounds: Maximum voting rounds
             context: Additional context
+            early_stop: Cancel a round's outstanding votes once the outcome
+                is fixed: the leader beats the runner-up even if every
+                pending vote (confidence in [0, 1]) went to the runner-up,
+                and still clears the threshold if all of them went
+                elsewhere. Cancelled voters count against the score.
 
         Returns:
             CollaborationResult
         """
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        session_id = uuid.uuid4().hex[:8]
+        session_id = _new_session_id()
         ctx = context or {}
         decisions = []
         consensus_reached = False
         final_choice = None
         final_score = 0.0
 
+        # Reused across rounds; only the serialized prior round is carried over
+        prev_votes: List[Dict[str, Any]] = []
+        vote_counts: Dict[str, float] = defaultdict(float)
+        option_set = set(options)
+        total_weight = 0.0
+        round_num = -1
+
         for round_num in range(max_rounds):
             logger.info(f"Consensus round {round_num + 1}/{max_rounds}")
 
-            votes: List[Vote] = []
-            vote_counts: Dict[str, float] = {opt: 0.0 for opt in options}
-
-            # Collect votes
-            for agent_name, agent_func in agents:
-                vote_input = {
-                    **ctx,
-                    "question": question,
-                    "options": options,
-                    "round": round_num,
-                    "previous_votes": [v.__dict__ for v in votes] if round_num > 0 else [],
-                }
+            vote_counts.clear()
+            total_weight = 0.0
+            cancelled = 0
+            round_input = {
+                **ctx,
+                "question": question,
+                "options": options,
+                "round": round_num,
+                "previous_votes": prev_votes,
+            }
 
-                if asyncio.iscoroutinefunction(agent_func):
-                    response = await agent_func(question, vote_input)
-                else:
-                    response = agent_func(question, vote_input)
+            async def _vote(agent_name: str, agent_func: AsyncAgentFunc) -> Vote:
+                response = await _call_agent(agent_func, question, dict(round_input))
 
                 # Parse vote
                 if isinstance(response, dict):
@@ -543,46 +621,90 @@ class CollaborationOrchestrator:
                     confidence = 1.0
                     rationale = ""
 
-                vote = Vote(
+                return Vote(
                     agent=agent_name,
                     choice=choice,
                     confidence=confidence,
                     rationale=rationale,
                 )
-                votes.append(vote)
 
-                if choice in vote_counts:
-                    vote_counts[choice] += confidence
+            # Collect votes, tallying each as it arrives
+            sem = asyncio.Semaphore(max(1, self.max_concurrency))
+
+            async def _bounded_vote(i: int, name: str, func: AsyncAgentFunc):
+                async with sem:
+                    return i, await _vote(name, func)
 
+            pending = {
+                asyncio.create_task(_bounded_vote(i, n, f))
+                for i, (n, f) in enumerate(agents)
+            }
+            arrived: Dict[int, Vote] = {}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        i, vote = task.result()
+                        arrived[i] = vote
+                        if vote.choice in option_set:
+                            vote_counts[vote.choice] += vote.confidence
+                            total_weight += vote.confidence
+
+                    # Outcome already decided: skip the remaining LLM calls
+                    if early_stop and pending and total_weight > 0:
+                        leading, runner_up = heapq.nlargest(
+                            2, itertools.chain(vote_counts.values(), (0.0,))
+                        )
+                        unknown = len(pending)
+                        if (
+                            leading > runner_up + unknown
+                            and leading / (total_weight + unknown) >= threshold
+                        ):
+                            cancelled = unknown
+                            break
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+            votes = [arrived[i] for i in sorted(arrived)]
+            for vote in votes:
                 decisions.append({
                     "round": round_num,
-                    "agent": agent_name,
+                    "agent": vote.agent,
                     "action": "vote",
-                    "choice": choice,
-                    "confidence": confidence,
+                    "choice": vote.choice,
+                    "confidence": vote.confidence,
                 })
 
-            # Check for consensus
-            total_weight = sum(vote_counts.values())
+            prev_votes = [v.to_dict() for v in votes]
+
+            # Check for consensus (only the current leader can clear the threshold;
+            # ties go to the earliest option, not the first vote to arrive).
+            # Cancelled voters are scored as if they voted elsewhere.
             if total_weight > 0:
-                for option, count in vote_counts.items():
-                    score = count / total_weight
-                    if score >= threshold:
-                        consensus_reached = True
-                        final_choice = option
-                        final_score = score
-                        break
+                leader = max(options, key=vote_counts.__getitem__)
+                count = vote_counts[leader]
+                score = count / (total_weight + cancelled)
+                if score >= threshold:
+                    consensus_reached = True
+                    final_choice = leader
+                    final_score = score
 
             if consensus_reached:
                 logger.info(f"Consensus reached: {final_choice} ({final_score:.0%})")
                 break
 
-        if not consensus_reached and vote_counts:
+        if not consensus_reached and options:
             # Pick highest voted option
-            final_choice = max(vote_counts.keys(), key=lambda k: vote_counts[k])
-            final_score = vote_counts[final_choice] / sum(vote_counts.values())
+            final_choice = max(options, key=lambda k: vote_counts.get(k, 0.0))
+            if total_weight > 0:
+                final_score = vote_counts[final_choice] / total_weight
 
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter() - start_time) * 1000
 
         result = CollaborationResult(
             session_id=session_id,
@@ -591,7 +713,9 @@ class CollaborationOrchestrator:
             outcome={
                 "consensus_reached": consensus_reached,
                 "final_choice": final_choice,
-                "vote_distribution": vote_counts,
+                "vote_distribution": {
+                    opt: vote_counts.get(opt, 0.0) for opt in options
+                },
             },
             iterations=round_num + 1,
             duration_ms=duration_ms,
@@ -599,12 +723,22 @@ class CollaborationOrchestrator:
             consensus_score=final_score,
         )
 
-        self._sessions[session_id] = result
+        self._store(session_id, result)
         return result
 
+    def _store(self, session_id: str, result: CollaborationResult) -> None:
+        """Record a session, evicting the least recently used beyond max_sessions."""
+        self._sessions[session_id] = result
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
     def get_session(self, session_id: str) -> Optional[CollaborationResult]:
         """Get a collaboration session by ID."""
-        return self._sessions.get(session_id)
+        result = self._sessions.get(session_id)
+        if result is not None:
+            self._sessions.move_to_end(session_id)
+        return result
 
     def get_all_sessions(self) -> List[CollaborationResult]:
         """Get all collaboration sessions."""
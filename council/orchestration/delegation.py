@@ -10,8 +10,12 @@ Delegation Manager - 委托管理器
 基于 CrewAI hierarchical 和 AutoGen GroupChat 模式设计。
 """
 
+import asyncio
+import contextvars
+from collections import deque
+from itertools import islice
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, TYPE_CHECKING
+from typing import Deque, Dict, FrozenSet, List, Optional, Any, Tuple, TYPE_CHECKING
 from datetime import datetime
 from enum import Enum
 
@@ -21,6 +25,11 @@ if TYPE_CHECKING:
     from council.orchestration.registry import AgentRegistry
 
 
+# (有序委托链, 成员集合) - 不可变，按上下文保存
+_ChainState = Tuple[Tuple[str, ...], FrozenSet[str]]
+_EMPTY_CHAIN: _ChainState = ((), frozenset())
+
+
 class DelegationStatus(Enum):
     """委托状态"""
 
@@ -31,7 +40,7 @@ class DelegationStatus(Enum):
     REJECTED = "rejected"
 
 
-@dataclass
+@dataclass(slots=True)
 class DelegationRequest:
     """委托请求"""
 
@@ -43,7 +52,7 @@ class DelegationRequest:
     context: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class DelegationResult:
     """委托结果"""
 
@@ -100,6 +109,8 @@ class DelegationManager:
         self,
         registry: "AgentRegistry",
         global_max_depth: int = 5,
+        max_history: int = 1000,
+        record_rejections: bool = True,
     ):
         """
         初始化委托管理器
@@ -107,39 +118,39 @@ class DelegationManager:
         Args:
             registry: Agent 注册中心
             global_max_depth: 全局最大委托深度
+            max_history: 保留的委托历史条数上限 (超出后丢弃最旧记录)
+            record_rejections: 是否将被拒绝的委托记入历史
         """
 
         self.registry = registry
         self.global_max_depth = global_max_depth
 
-        # 委托链追踪
-        self._current_chain: List[str] = []
-        self._history: List[DelegationResult] = []
+        # 委托链追踪: (有序链, 成员集合)，按上下文隔离，
+        # 并发的 adelegate 调用互不干扰
+        self._chain_var: contextvars.ContextVar[_ChainState] = contextvars.ContextVar(
+            f"delegation_chain_{id(self)}", default=_EMPTY_CHAIN
+        )
+        self._record_rejections = record_rejections
+        self._history: Deque[DelegationResult] = deque(maxlen=max_history)
+
+    @property
+    def _current_chain(self) -> List[str]:
+        return list(self._chain_var.get()[0])
 
-    def delegate(
+    @_current_chain.setter
+    def _current_chain(self, chain: List[str]) -> None:
+        self._chain_var.set((tuple(chain), frozenset(chain)))
+
+    def _prepare(
         self,
         task: str,
         from_agent: BaseAgent,
         to_agent_name: str,
-        context: Optional[Dict[str, Any]] = None,
-    ) -> DelegationResult:
-        """
-        执行委托
-
-        Args:
-            task: 任务描述
-            from_agent: 发起委托的 Agent
-            to_agent_name: 目标 Agent 名称
-            context: 可选上下文
-
-        Returns:
-            DelegationResult
-
-        Raises:
-            MaxDepthExceededError: 超过最大深度
-            DelegationNotAllowedError: 不允许委托
-        """
-        current_depth = len(self._current_chain)
+        context: Optional[Dict[str, Any]],
+    ) -> Tuple[DelegationRequest, BaseAgent]:
+        """校验委托合法性，返回请求与目标 Agent"""
+        chain, members = self._chain_var.get()
+        current_depth = len(chain)
 
         # 创建请求
         request = DelegationRequest(
@@ -153,81 +164,155 @@ class DelegationManager:
         # 检查委托合法性
         can_delegate, reason = self.registry.can_delegate_to(from_agent, to_agent_name)
         if not can_delegate:
-            result = DelegationResult(
-                request=request,
-                status=DelegationStatus.REJECTED,
-                error=reason,
-                completed_at=datetime.now(),
-            )
-            self._history.append(result)
+            self._reject(request, reason)
             raise DelegationNotAllowedError(reason)
 
         # 检查深度限制
         max_depth = min(from_agent.max_delegation_depth, self.global_max_depth)
         if current_depth >= max_depth:
-            result = DelegationResult(
-                request=request,
-                status=DelegationStatus.REJECTED,
-                error=f"超过最大委托深度 ({current_depth} >= {max_depth})",
-                completed_at=datetime.now(),
-            )
-            self._history.append(result)
+            self._reject(request, f"超过最大委托深度 ({current_depth} >= {max_depth})")
             raise MaxDepthExceededError(f"Depth {current_depth} >= {max_depth}")
 
         # 检查循环委托
-        if to_agent_name in self._current_chain:
-            result = DelegationResult(
-                request=request,
-                status=DelegationStatus.REJECTED,
-                error=f"检测到循环委托: {' -> '.join(self._current_chain)} -> {to_agent_name}",
-                completed_at=datetime.now(),
+        if to_agent_name in members:
+            self._reject(
+                request, f"检测到循环委托: {' -> '.join(chain)} -> {to_agent_name}"
             )
-            self._history.append(result)
             raise DelegationError("Circular delegation detected")
 
-        # 执行委托
         target_agent = self.registry.get(to_agent_name)
         if not target_agent:
             raise DelegationError(f"Agent '{to_agent_name}' not found")
 
-        # 更新委托链
-        self._current_chain.append(from_agent.name)
-        target_agent._current_delegation_depth = current_depth + 1
+        return request, target_agent
+
+    def _reject(self, request: DelegationRequest, error: Optional[str]) -> None:
+        """记录被拒绝的委托 (仅在 record_rejections 开启时创建记录)"""
+        if self._record_rejections:
+            self._history.append(
+                DelegationResult(
+                    request=request,
+                    status=DelegationStatus.REJECTED,
+                    error=error,
+                    completed_at=datetime.now(),
+                )
+            )
+
+    def _push(self, from_agent: BaseAgent) -> contextvars.Token:
+        """更新委托链 (以新值替换，出栈时 reset 即可恢复)"""
+        chain, members = self._chain_var.get()
+        return self._chain_var.set(
+            (chain + (from_agent.name,), members | {from_agent.name})
+        )
+
+    def _pop(self, token: contextvars.Token) -> None:
+        """恢复委托链"""
+        self._chain_var.reset(token)
+
+    @staticmethod
+    def _completed(
+        request: DelegationRequest, exec_result: ExecuteResult
+    ) -> DelegationResult:
+        return DelegationResult(
+            request=request,
+            status=DelegationStatus.SUCCESS
+            if exec_result.success
+            else DelegationStatus.FAILED,
+            result=exec_result,
+            completed_at=datetime.now(),
+        )
 
+    @staticmethod
+    def _failed(request: DelegationRequest, error: Exception) -> DelegationResult:
+        return DelegationResult(
+            request=request,
+            status=DelegationStatus.FAILED,
+            error=str(error),
+            completed_at=datetime.now(),
+        )
+
+    def delegate(
+        self,
+        task: str,
+        from_agent: BaseAgent,
+        to_agent_name: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> DelegationResult:
+        """
+        执行委托
+
+        Args:
+            task: 任务描述
+            from_agent: 发起委托的 Agent
+            to_agent_name: 目标 Agent 名称
+            context: 可选上下文
+
+        Returns:
+            DelegationResult
+
+        Raises:
+            MaxDepthExceededError: 超过最大深度
+            DelegationNotAllowedError: 不允许委托
+        """
+        request, target_agent = self._prepare(task, from_agent, to_agent_name, context)
+
+        token = self._push(from_agent)
         try:
             # 执行目标 Agent 的任务
-            exec_result = target_agent.execute(task, plan=context)
-
-            result = DelegationResult(
-                request=request,
-                status=DelegationStatus.SUCCESS
-                if exec_result.success
-                else DelegationStatus.FAILED,
-                result=exec_result,
-                completed_at=datetime.now(),
-            )
+            result = self._completed(request, target_agent.execute(task, plan=context))
         except Exception as e:
-            result = DelegationResult(
-                request=request,
-                status=DelegationStatus.FAILED,
-                error=str(e),
-                completed_at=datetime.now(),
+            result = self._failed(request, e)
+        finally:
+            self._pop(token)
+
+        self._history.append(result)
+        return result
+
+    async def adelegate(
+        self,
+        task: str,
+        from_agent: BaseAgent,
+        to_agent_name: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> DelegationResult:
+        """
+        异步执行委托 - 目标 Agent 在工作线程中执行，不阻塞事件循环
+
+        委托链按上下文隔离，可并发发起多个兄弟委托。参数与异常同 delegate()。
+        """
+        request, target_agent = self._prepare(task, from_agent, to_agent_name, context)
+
+        token = self._push(from_agent)
+        try:
+            exec_result = await asyncio.to_thread(
+                target_agent.execute, task, plan=context
             )
+            result = self._completed(request, exec_result)
+        except Exception as e:
+            result = self._failed(request, e)
         finally:
-            # 恢复委托链
-            self._current_chain.pop()
-            target_agent._current_delegation_depth = 0
+            self._pop(token)
 
         self._history.append(result)
         return result
 
     def get_current_chain(self) -> List[str]:
         """获取当前委托链"""
-        return list(self._current_chain)
+        return list(self._chain_var.get()[0])
+
+    def get_current_depth(self) -> int:
+        """
+        获取当前上下文的委托深度 (目标 Agent 执行期间即其所处深度)
+
+        深度按上下文保存，并发委托同一 Agent 时互不覆盖。
+        """
+        return len(self._chain_var.get()[0])
 
     def get_history(self, limit: int = 10) -> List[DelegationResult]:
         """获取委托历史"""
-        return self._history[-limit:]
+        if limit <= 0:
+            return list(self._history)
+        return list(islice(reversed(self._history), limit))[::-1]
 
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
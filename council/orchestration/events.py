@@ -42,7 +42,11 @@ class EventType(Enum):
     HANDOFF_COMPLETED = "handoff.completed"
 
 
-@dataclass
+# value -> member, built once for Event.create
+_EVENT_TYPE_BY_VALUE: Dict[str, EventType] = {e.value: e for e in EventType}
+
+
+@dataclass(slots=True)
 class Event:
     """
     标准事件对象
@@ -52,7 +56,7 @@ class Event:
         source: 事件源 (Agent Name or Component ID)
         payload: 事件携带的数据
         event_id: 唯一ID
-        timestamp: 时间戳
+        timestamp: 时间戳 (批量创建时可传入同一个 datetime 以避免重复 datetime.now())
     """
 
     type: EventType
@@ -80,10 +84,9 @@ class Event:
             Event.create("code_written", "coder", file="main.py")
         """
         # 尝试匹配 EventType
-        try:
-            # 1. 尝试直接匹配 value (e.g. "artifact.code_written")
-            event_type = next(e for e in EventType if e.value == type_str)
-        except StopIteration:
+        # 1. 尝试直接匹配 value (e.g. "artifact.code_written")
+        event_type = _EVENT_TYPE_BY_VALUE.get(type_str)
+        if event_type is None:
             try:
                 # 2. 尝试匹配 name (e.g. "CODE_WRITTEN")
                 event_type = EventType[type_str.upper()]
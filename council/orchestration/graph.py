@@ -20,18 +20,42 @@ Usage:
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Awaitable
+from typing import Any, Callable, Dict, Hashable, List, Optional, Awaitable, Tuple
 from datetime import datetime
 from pathlib import Path
 from enum import Enum
 import asyncio
 import json
 import logging
+import os
+import struct
+import threading
 import uuid
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+# Opcodes of the compiled program (see StateGraph.compile)
+OP_HALT = -1  # pc value that ends execution
+OP_CALL_SYNC = 0
+OP_CALL_ASYNC = 1
+OP_APPROVAL = 2  # async call, then halt unless state.approved
+OP_PARALLEL = 3
+OP_MISSING = 4  # name without a registered action
+
+# (op, name, action, sync_action, condition_pc, next_pc); condition_pc maps
+# state directly to the next pc
+Instruction = Tuple[int, str, Any, Optional[Callable], Optional[Callable], int]
+
+
 class NodeType(Enum):
     """Type of graph node."""
 
@@ -73,6 +97,22 @@ class Checkpoint:
             "metadata": self.metadata,
         }
 
+    def to_json_bytes(self) -> bytes:
+        """Serialize to JSON bytes (orjson encodes the dataclass directly)."""
+        if HAS_ORJSON:
+            return orjson.dumps(self, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(self.to_dict()).encode("utf-8")
+
+    @classmethod
+    def from_json_bytes(cls, data: bytes) -> "Checkpoint":
+        """Deserialize from JSON bytes."""
+        return cls.from_dict(orjson.loads(data) if HAS_ORJSON else json.loads(data))
+
+    @property
+    def readable(self) -> bool:
+        """Always True; mirrors LazyCheckpoint.readable for filtering."""
+        return True
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Checkpoint":
         """Create from dictionary."""
@@ -114,6 +154,16 @@ class State:
             "loop_count": self.loop_count,
         }
 
+    def fork(self) -> "State":
+        """Copy for a parallel branch: new messages list and context dict (one level)."""
+        return State(
+            messages=list(self.messages),
+            context=dict(self.context),
+            next_node=self.next_node,
+            approved=self.approved,
+            loop_count=self.loop_count,
+        )
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "State":
         """Deserialize state from dictionary."""
@@ -126,6 +176,8 @@ class State:
         )
 
 
+_MISSING = object()
+
 # Type alias for node action functions
 NodeAction = Callable[[State], State]
 AsyncNodeAction = Callable[[State], Awaitable[State]]
@@ -153,6 +205,174 @@ class ParallelConfig:
     merge_strategy: str = "all"  # "all", "any", "first"
 
 
+def _memoize_decision(
+    condition: ConditionalDecision,
+    cache_key: Callable[[State], Hashable],
+    maxsize: int,
+) -> ConditionalDecision:
+    """Wrap a decision so it is evaluated once per cache_key(state)."""
+    memo: Dict[Hashable, str] = {}
+
+    def decision(state: State) -> str:
+        key = cache_key(state)
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        result = condition(state)
+        if len(memo) >= maxsize:
+            del memo[next(iter(memo))]
+        memo[key] = result
+        return result
+
+    decision.__wrapped__ = condition  # type: ignore[attr-defined]
+    return decision
+
+
+class LazyCheckpoint:
+    """
+    Checkpoint file that is parsed on first attribute access (2026).
+
+    ``id`` and ``mtime_ns`` come from the directory entry, so listing and
+    sorting never open the file; any other attribute (including
+    ``timestamp``) loads the JSON body once and delegates to the parsed
+    Checkpoint. A file that cannot be parsed is logged once and raises
+    ValueError naming the file; check ``readable`` to skip such entries.
+    """
+
+    __slots__ = ("path", "id", "mtime_ns", "_checkpoint", "_error")
+
+    def __init__(self, path: str, mtime_ns: int) -> None:
+        self.path = path
+        self.id = os.path.basename(path)[: -len(".json")]
+        self.mtime_ns = mtime_ns
+        self._checkpoint: Optional[Checkpoint] = None
+        self._error: Optional[str] = None
+
+    @property
+    def mtime(self) -> datetime:
+        """File modification time (no JSON parse)."""
+        return datetime.fromtimestamp(self.mtime_ns / 1e9)
+
+    @property
+    def readable(self) -> bool:
+        """Whether the file parses as a checkpoint (loads it on first use)."""
+        try:
+            self.load()
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def load(self) -> Checkpoint:
+        """Parse the checkpoint file (cached)."""
+        if self._checkpoint is None:
+            if self._error is not None:
+                raise ValueError(self._error)
+            with open(self.path, "rb") as f:
+                data = f.read()
+            try:
+                self._checkpoint = Checkpoint.from_json_bytes(data)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                self._error = f"Failed to load checkpoint {self.path}: {e!r}"
+                logger.warning(self._error)
+                raise ValueError(self._error) from e
+        return self._checkpoint
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names not set on the instance. Never load for
+        # dunders or unset slots (copy/pickle build instances without
+        # __init__), which would otherwise recurse.
+        if name.startswith("__") or name in LazyCheckpoint.__slots__:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"LazyCheckpoint({self.path!r})"
+
+
+class CheckpointLog:
+    """
+    Append-only checkpoint log (2026).
+
+    Records are length-prefixed JSON checkpoints in a single file. They are
+    queued in memory and written in batches with one os.writev call, so
+    frequent checkpointing costs one write per batch rather than one file
+    per checkpoint. Reads flush the queue first.
+
+    StateGraph.checkpoint() writes through immediately; only run_async
+    batches, flushing when a batch fills and when the run ends. A crash
+    mid-run can therefore lose at most the last batch_size - 1 records.
+    """
+
+    FILENAME = "checkpoints.log"
+    _HEADER = struct.Struct(">I")
+    _IOV_RECORDS = 256  # stay well below IOV_MAX (two iovecs per record)
+
+    def __init__(self, directory: Path, batch_size: int = 16) -> None:
+        self.path = directory / self.FILENAME
+        self.batch_size = max(1, batch_size)
+        self._queue: List[bytes] = []
+        self._lock = threading.Lock()
+
+    def append(self, data: bytes) -> bool:
+        """Queue a record; returns True when a full batch is waiting."""
+        self._queue.append(data)
+        return len(self._queue) >= self.batch_size
+
+    def take_batch(self) -> List[bytes]:
+        """Detach the queued records (to be passed to write())."""
+        batch, self._queue = self._queue, []
+        return batch
+
+    def write(self, records: List[bytes]) -> None:
+        """Append records to the log file (thread-safe)."""
+        if not records:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                for i in range(0, len(records), self._IOV_RECORDS):
+                    buffers: List[bytes] = []
+                    for data in records[i : i + self._IOV_RECORDS]:
+                        buffers.append(self._HEADER.pack(len(data)))
+                        buffers.append(data)
+                    written = os.writev(fd, buffers)
+                    rest = memoryview(b"".join(buffers))[written:]
+                    while rest:  # short write: finish the remainder
+                        rest = rest[os.write(fd, rest) :]
+            finally:
+                os.close(fd)
+
+    def flush(self) -> None:
+        self.write(self.take_batch())
+
+    def read_records(self) -> List[bytes]:
+        """All records in write order (flushes pending records first)."""
+        self.flush()
+        if not self.path.exists():
+            return []
+        blob = self.path.read_bytes()
+        records = []
+        offset, header = 0, self._HEADER.size
+        while offset + header <= len(blob):
+            (size,) = self._HEADER.unpack_from(blob, offset)
+            offset += header
+            if offset + size > len(blob):
+                logger.warning(f"Truncated checkpoint record in {self.path}")
+                break
+            records.append(blob[offset : offset + size])
+            offset += size
+        return records
+
+    def clear(self) -> int:
+        """Delete the log; returns the number of records removed."""
+        count = len(self.read_records())
+        if self.path.exists():
+            self.path.unlink()
+        return count
+
+
 class StateGraph:
     """
     State machine graph for workflow execution (2026 Enhanced).
@@ -177,10 +397,29 @@ class StateGraph:
         self,
         name: str = "default",
         checkpoint_dir: str = ".council/checkpoints",
+        checkpoint_engine: str = "files",
+        checkpoint_batch_size: int = 16,
     ) -> None:
-        """Initialize an empty state graph."""
+        """
+        Initialize an empty state graph.
+
+        Args:
+            name: Graph name (prefix of checkpoint IDs)
+            checkpoint_dir: Directory for checkpoints
+            checkpoint_engine: "files" (one JSON file per checkpoint) or
+                "log" (batched append-only CheckpointLog)
+            checkpoint_batch_size: Records per write for run_async with the
+                "log" engine (checkpoint() always writes through)
+        """
         self.name = name
         self.checkpoint_dir = Path(checkpoint_dir)
+        if checkpoint_engine not in ("files", "log"):
+            raise ValueError(f"Unknown checkpoint engine: {checkpoint_engine}")
+        self._ckpt_log: Optional[CheckpointLog] = (
+            CheckpointLog(self.checkpoint_dir, checkpoint_batch_size)
+            if checkpoint_engine == "log"
+            else None
+        )
 
         self.nodes: Dict[str, NodeAction] = {}
         self.async_nodes: Dict[str, AsyncNodeAction] = {}
@@ -195,15 +434,29 @@ class StateGraph:
         self.loop_configs: Dict[str, LoopConfig] = {}
         self._execution_history: List[str] = []
 
+        # Compiled program, rebuilt lazily after any add_* call
+        self._program: Optional[List[Instruction]] = None
+        self._name_to_pc: Dict[str, int] = {}
+
+        # In-flight background checkpoint writes (run_async)
+        self._pending_ckpt: set[asyncio.Task] = set()
+
+        # list_checkpoints() result, keyed by directory/log stamp
+        self._ckpt_cache: Optional[
+            Tuple[Hashable, List[Checkpoint | LazyCheckpoint]]
+        ] = None
+
     def add_node(self, name: str, action: NodeAction) -> None:
         """Add a node with an action function."""
         self.nodes[name] = action
         self.node_types[name] = NodeType.STANDARD
+        self._program = None
 
     def add_async_node(self, name: str, action: AsyncNodeAction) -> None:
         """Add an async node with an action function."""
         self.async_nodes[name] = action
         self.node_types[name] = NodeType.STANDARD
+        self._program = None
 
     def set_entry_point(self, name: str) -> None:
         """Set the starting node for graph execution."""
@@ -212,10 +465,32 @@ class StateGraph:
     def add_edge(self, start: str, end: str) -> None:
         """Add a simple edge between two nodes."""
         self.edges[start] = end
+        self._program = None
 
-    def add_conditional_edge(self, start: str, condition: ConditionalDecision) -> None:
-        """Add a conditional edge with a decision function."""
+    def add_conditional_edge(
+        self,
+        start: str,
+        condition: ConditionalDecision,
+        cache_key: Optional[Callable[[State], Hashable]] = None,
+        cache_size: int = 1024,
+    ) -> None:
+        """
+        Add a conditional edge with a decision function.
+
+        Args:
+            start: Node the edge leaves from
+            condition: Decision function returning the next node name
+            cache_key: Optional function extracting the hashable slice of
+                state the decision depends on, e.g.
+                ``lambda s: (s.loop_count, s.context.get("status"))``.
+                When given, decisions are memoized per key; only use it for
+                deterministic, side-effect-free conditions.
+            cache_size: Maximum memoized keys (oldest evicted first)
+        """
+        if cache_key is not None:
+            condition = _memoize_decision(condition, cache_key, cache_size)
         self.conditional_edges[start] = condition
+        self._program = None
 
     # ========== 2026 Enhancements ==========
 
@@ -254,6 +529,7 @@ class StateGraph:
             return state
 
         self.async_nodes[name] = approval_action
+        self._program = None
 
     def add_parallel_nodes(
         self,
@@ -277,6 +553,7 @@ class StateGraph:
             merge_strategy=merge_strategy,
         )
         self.node_types[name] = NodeType.PARALLEL
+        self._program = None
 
     def add_loop_edge(
         self,
@@ -315,11 +592,103 @@ class StateGraph:
                 return self.edges.get(start, "")
 
         self.conditional_edges[start] = loop_decision
+        self._program = None
+
+    # ========== Compiled execution ==========
+
+    def compile(self) -> List[Instruction]:
+        """
+        Compile the graph into a flat program indexed by integer pc.
+
+        Each instruction carries the resolved action for run_async (opcode
+        folds in the node type), the sync action used by run(), the
+        conditional decision wrapped to return a pc (if any) and the pc of
+        the static edge target.
+        Called lazily by run()/run_async(); add_* methods invalidate it.
+        Mutating the node/edge dicts directly requires calling compile()
+        again.
+        """
+        self._name_to_pc = {}
+        names: List[str] = []
+
+        def intern(name: str) -> None:
+            if name and name not in self._name_to_pc:
+                self._name_to_pc[name] = len(names)
+                names.append(name)
+
+        intern(self.entry_point)
+        for group in (
+            self.node_types,
+            self.nodes,
+            self.async_nodes,
+            self.conditional_edges,
+        ):
+            for name in group:
+                intern(name)
+        for start, end in self.edges.items():
+            intern(start)
+            intern(end)
+        for config in self.parallel_configs.values():
+            for name in config.nodes:
+                intern(name)
+            intern(config.join_node)
+
+        self._program = [self._compile_node(name) for name in names]
+        return self._program
+
+    def _pc(self, name: str) -> int:
+        """Resolve a node name to its pc, adding a placeholder for unknown names."""
+        if not name:
+            return OP_HALT
+        pc = self._name_to_pc.get(name)
+        if pc is None:
+            pc = self._name_to_pc[name] = len(self._program)
+            self._program.append((OP_MISSING, name, None, None, None, OP_HALT))
+        return pc
+
+    def _decision_to_pc(self, decision: ConditionalDecision) -> Callable[[State], int]:
+        """Wrap a decision so it returns the next pc instead of a node name."""
+        name_to_pc = self._name_to_pc
+        resolve = self._pc
+
+        def condition_pc(state: State) -> int:
+            name = decision(state)
+            pc = name_to_pc.get(name)
+            return pc if pc is not None else resolve(name)
+
+        return condition_pc
+
+    def _compile_node(self, name: str) -> Instruction:
+        node_type = self.node_types.get(name, NodeType.STANDARD)
+        sync_action = self.nodes.get(name)
+        condition = self.conditional_edges.get(name)
+        if condition is not None:
+            condition = self._decision_to_pc(condition)
+        next_pc = self._name_to_pc.get(self.edges.get(name, ""), OP_HALT)
+
+        if node_type == NodeType.PARALLEL and name in self.parallel_configs:
+            config = self.parallel_configs[name]
+            join_pc = self._name_to_pc.get(config.join_node, OP_HALT)
+            # Branch actions resolved once, as _execute_node would
+            branches = tuple(
+                (n, self.async_nodes.get(n), self.nodes.get(n)) for n in config.nodes
+            )
+            payload = (config, join_pc, branches)
+            return (OP_PARALLEL, name, payload, sync_action, condition, next_pc)
+
+        if name in self.async_nodes:
+            op = OP_APPROVAL if node_type == NodeType.APPROVAL else OP_CALL_ASYNC
+            return (op, name, self.async_nodes[name], sync_action, condition, next_pc)
+        if sync_action is not None:
+            return (OP_CALL_SYNC, name, sync_action, sync_action, condition, next_pc)
+        return (OP_MISSING, name, None, None, condition, next_pc)
 
     def checkpoint(self, state: State, node: str) -> str:
         """
         Save checkpoint for resumable execution (2026).
 
+        The checkpoint is on disk when this returns, for both engines.
+
         Args:
             state: Current state
             node: Current node name
@@ -327,6 +696,12 @@ class StateGraph:
         Returns:
             Checkpoint ID
         """
+        checkpoint_id, data = self._serialize_checkpoint(state, node)
+        self._write_checkpoint(checkpoint_id, data)
+        return checkpoint_id
+
+    def _serialize_checkpoint(self, state: State, node: str) -> tuple[str, bytes]:
+        """Snapshot state into checkpoint bytes (must run before state mutates)."""
         checkpoint_id = f"{self.name}_{node}_{uuid.uuid4().hex[:8]}"
         checkpoint = Checkpoint(
             id=checkpoint_id,
@@ -334,13 +709,40 @@ class StateGraph:
             current_node=node,
             state_data=state.to_dict(),
         )
+        return checkpoint_id, checkpoint.to_json_bytes()
+
+    def _write_checkpoint(self, checkpoint_id: str, data: bytes) -> None:
+        self._ckpt_cache = None
+        if self._ckpt_log is not None:
+            # Write through (after any records queued by a running run_async)
+            self._ckpt_log.append(data)
+            self._ckpt_log.flush()
+            return
 
         # Ensure directory exists
         self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
         checkpoint_path = self.checkpoint_dir / f"{checkpoint_id}.json"
-        checkpoint_path.write_text(json.dumps(checkpoint.to_dict(), indent=2))
+        checkpoint_path.write_bytes(data)
 
         logger.info(f"Checkpoint saved: {checkpoint_id}")
+
+    def _checkpoint_async(self, state: State, node: str) -> str:
+        """
+        Serialize now, write in a worker thread without blocking the loop.
+
+        run_async awaits all pending writes before returning.
+        """
+        checkpoint_id, data = self._serialize_checkpoint(state, node)
+        if self._ckpt_log is not None:
+            if not self._ckpt_log.append(data):
+                return checkpoint_id
+            # Full batch: hand it to a worker thread
+            write = asyncio.to_thread(self._ckpt_log.write, self._ckpt_log.take_batch())
+        else:
+            write = asyncio.to_thread(self._write_checkpoint, checkpoint_id, data)
+        task = asyncio.ensure_future(write)
+        self._pending_ckpt.add(task)
+        task.add_done_callback(self._pending_ckpt.discard)
         return checkpoint_id
 
     def resume(self, checkpoint_id: str) -> tuple[State, str]:
@@ -353,12 +755,7 @@ class StateGraph:
         Returns:
             Tuple of (restored state, node to continue from)
         """
-        checkpoint_path = self.checkpoint_dir / f"{checkpoint_id}.json"
-        if not checkpoint_path.exists():
-            raise FileNotFoundError(f"Checkpoint not found: {checkpoint_id}")
-
-        data = json.loads(checkpoint_path.read_text())
-        checkpoint = Checkpoint.from_dict(data)
+        checkpoint = self._load_checkpoint(checkpoint_id)
 
         state = State.from_dict(checkpoint.state_data)
         logger.info(
@@ -367,20 +764,76 @@ class StateGraph:
 
         return state, checkpoint.current_node
 
-    def list_checkpoints(self) -> List[Checkpoint]:
-        """List all available checkpoints."""
-        checkpoints = []
-        if self.checkpoint_dir.exists():
-            for path in self.checkpoint_dir.glob("*.json"):
+    def _load_checkpoint(self, checkpoint_id: str) -> Checkpoint:
+        if self._ckpt_log is not None:
+            for checkpoint in self.list_checkpoints():
+                if checkpoint.id == checkpoint_id:
+                    return checkpoint
+            raise FileNotFoundError(f"Checkpoint not found: {checkpoint_id}")
+
+        checkpoint_path = self.checkpoint_dir / f"{checkpoint_id}.json"
+        if not checkpoint_path.exists():
+            raise FileNotFoundError(f"Checkpoint not found: {checkpoint_id}")
+        return Checkpoint.from_json_bytes(checkpoint_path.read_bytes())
+
+    def _checkpoint_stamp(self) -> Hashable:
+        """
+        Cheap change marker for list_checkpoints() caching.
+
+        The log engine uses the log file's (mtime, size), which changes on
+        every append; the file engine uses the directory mtime, which
+        changes whenever a checkpoint file is created or removed.
+        """
+        try:
+            if self._ckpt_log is not None:
+                self._ckpt_log.flush()
+                st = os.stat(self._ckpt_log.path)
+                return (st.st_mtime_ns, st.st_size)
+            return os.stat(self.checkpoint_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def list_checkpoints(self) -> List[Checkpoint | LazyCheckpoint]:
+        """
+        List all available checkpoints (newest first).
+
+        The file engine returns LazyCheckpoint handles ordered by file
+        mtime; JSON bodies are only read when an attribute other than
+        ``id``/``mtime`` is accessed. Filter with ``c.readable`` to skip
+        corrupt files. The list is cached until the
+        checkpoint directory (or log) changes on disk, so repeated calls
+        cost a single stat.
+        """
+        stamp = self._checkpoint_stamp()
+        cached = self._ckpt_cache
+        if cached is not None and cached[0] == stamp:
+            return list(cached[1])
+
+        checkpoints: List[Checkpoint | LazyCheckpoint] = []
+        if self._ckpt_log is not None:
+            for record in self._ckpt_log.read_records():
                 try:
-                    data = json.loads(path.read_text())
-                    checkpoints.append(Checkpoint.from_dict(data))
+                    checkpoints.append(Checkpoint.from_json_bytes(record))
                 except Exception as e:
-                    logger.warning(f"Failed to load checkpoint {path}: {e}")
-        return sorted(checkpoints, key=lambda c: c.timestamp, reverse=True)
+                    logger.warning(f"Failed to load checkpoint record: {e}")
+            checkpoints.sort(key=lambda c: c.timestamp, reverse=True)
+        elif stamp is not None:
+            entries = []
+            with os.scandir(self.checkpoint_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        entries.append((entry.stat().st_mtime_ns, entry.path))
+            entries.sort(reverse=True)
+            checkpoints = [LazyCheckpoint(path, mtime) for mtime, path in entries]
+        self._ckpt_cache = (stamp, checkpoints)
+        return list(checkpoints)
 
     def clear_checkpoints(self) -> int:
         """Clear all checkpoints. Returns number cleared."""
+        self._ckpt_cache = None
+        if self._ckpt_log is not None:
+            return self._ckpt_log.clear()
+
         count = 0
         if self.checkpoint_dir.exists():
             for path in self.checkpoint_dir.glob("*.json"):
@@ -398,23 +851,54 @@ class StateGraph:
             logger.warning(f"Node not found: {name}")
             return state
 
-    async def _execute_parallel(self, config: ParallelConfig, state: State) -> State:
+    @staticmethod
+    async def _execute_branch(
+        name: str,
+        async_action: Optional[AsyncNodeAction],
+        action: Optional[NodeAction],
+        state: State,
+    ) -> State:
+        """Execute a pre-resolved parallel branch."""
+        if async_action is not None:
+            return await async_action(state)
+        if action is not None:
+            return action(state)
+        logger.warning(f"Node not found: {name}")
+        return state
+
+    async def _execute_parallel(
+        self,
+        config: ParallelConfig,
+        state: State,
+        branches: Optional[Tuple[Tuple[str, Any, Any], ...]] = None,
+    ) -> State:
         """Execute parallel nodes and merge results."""
+        if branches is None:
+            branches = tuple(
+                (n, self.async_nodes.get(n), self.nodes.get(n)) for n in config.nodes
+            )
         tasks = []
-        for node_name in config.nodes:
-            # Create a copy of state for each parallel branch
-            branch_state = State.from_dict(state.to_dict())
-            tasks.append(self._execute_node(node_name, branch_state))
+        for node_name, async_action, action in branches:
+            # Each parallel branch works on its own copy of the state
+            tasks.append(
+                self._execute_branch(node_name, async_action, action, state.fork())
+            )
+
+        # Pre-fork snapshot for computing each branch's changes
+        base_context = dict(state.context)
+        base_len = len(state.messages)
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # Merge results based on strategy
         if config.merge_strategy == "all":
-            # Merge all contexts
+            # Merge only what each branch changed or appended
             for result in results:
                 if isinstance(result, State):
-                    state.context.update(result.context)
-                    state.messages.extend(result.messages)
+                    for key, value in result.context.items():
+                        if base_context.get(key, _MISSING) is not value:
+                            state.context[key] = value
+                    state.messages.extend(result.messages[base_len:])
         elif config.merge_strategy == "first":
             # Use first successful result
             for result in results:
@@ -443,64 +927,67 @@ class StateGraph:
         Returns:
             Final state after execution
         """
-        current_node = self.entry_point
+        program = self._program if self._program is not None else self.compile()
         state = initial_state
         step_count = 0
-
-        self._execution_history = []
-
-        while current_node:
-            self._execution_history.append(current_node)
-            step_count += 1
-
-            # Handle different node types
-            node_type = self.node_types.get(current_node, NodeType.STANDARD)
-
-            if node_type == NodeType.PARALLEL and current_node in self.parallel_configs:
-                config = self.parallel_configs[current_node]
-                state = await self._execute_parallel(config, state)
-                current_node = config.join_node
-                continue
-
-            # Execute node
-            state = await self._execute_node(current_node, state)
-
-            # Check approval for approval nodes
-            if node_type == NodeType.APPROVAL and not state.approved:
-                logger.warning(f"Execution halted at approval node: {current_node}")
-                break
-
-            # Save checkpoint if enabled
-            if checkpoint_interval > 0 and step_count % checkpoint_interval == 0:
-                self.checkpoint(state, current_node)
-
-            # Determine next node
-            if current_node in self.conditional_edges:
-                current_node = self.conditional_edges[current_node](state)
-            elif current_node in self.edges:
-                current_node = self.edges[current_node]
-            else:
-                current_node = ""
+        history: List[str] = []
+        self._execution_history = history
+
+        try:
+            pc = self._pc(self.entry_point)
+            while pc >= 0:
+                op, name, action, _, condition, next_pc = program[pc]
+                history.append(name)
+                step_count += 1
+
+                if op == OP_PARALLEL:
+                    config, pc, branches = action
+                    state = await self._execute_parallel(config, state, branches)
+                    continue
+
+                # Execute node
+                if op == OP_CALL_SYNC:
+                    state = action(state)
+                elif op == OP_MISSING:
+                    logger.warning(f"Node not found: {name}")
+                else:
+                    state = await action(state)
+
+                # Check approval for approval nodes
+                if op == OP_APPROVAL and not state.approved:
+                    logger.warning(f"Execution halted at approval node: {name}")
+                    break
+
+                # Save checkpoint if enabled
+                if checkpoint_interval > 0 and step_count % checkpoint_interval == 0:
+                    self._checkpoint_async(state, name)
+
+                # Determine next node
+                pc = condition(state) if condition is not None else next_pc
+        finally:
+            # Durability: every checkpoint written before returning
+            if self._pending_ckpt:
+                await asyncio.gather(*self._pending_ckpt)
+            if self._ckpt_log is not None:
+                await asyncio.to_thread(self._ckpt_log.flush)
 
         return state
 
     def run(self, initial_state: State) -> State:
         """Execute the graph synchronously (legacy support)."""
-        current_node = self.entry_point
+        program = self._program if self._program is not None else self.compile()
         state = initial_state
 
-        while current_node:
-            # Execute current node if it exists
-            if current_node in self.nodes:
-                state = self.nodes[current_node](state)
+        pc = self._pc(self.entry_point)
+        while pc >= 0:
+            _, _, _, sync_action, condition, next_pc = program[pc]
+
+            # Execute current node if it has a sync action
+            if sync_action is not None:
+                state = sync_action(state)
 
             # Determine next node
-            if current_node in self.conditional_edges:
-                current_node = self.conditional_edges[current_node](state)
-            elif current_node in self.edges:
-                current_node = self.edges[current_node]
-            else:
-                current_node = ""
+            pc = condition(state) if condition is not None else next_pc
 
         return state
 
@@ -0,0 +1,306 @@
+"""
+Tests for council/orchestration/a2a_adapter.py
+"""
+
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules.setdefault("litellm", MagicMock())
+
+from council.orchestration.a2a_adapter import (
+    AgentCapability,
+    AgentCard,
+    AgentDiscovery,
+)
+
+
+def _card(name, keywords=(), capabilities=()):
+    return AgentCard(
+        name=name,
+        description=f"{name} agent",
+        keywords=list(keywords),
+        capabilities=list(capabilities),
+    )
+
+
+class TestAgentCard:
+    """Tests for AgentCard matching"""
+
+    def test_substring_matching(self):
+        """Names, keywords and capabilities match as substrings of the query"""
+        card = _card(
+            "Coder",
+            keywords=["refactor", "代码"],
+            capabilities=[AgentCapability.CODE_GENERATION],
+        )
+
+        assert card.matches_query("ask the coder") == 0.5
+        assert card.matches_query("Refactor this module") == 0.2
+        assert card.matches_query("请用code generation重构代码") == 0.5
+        assert card.matches_query("coders unite") == 0.5
+        assert card.matches_query("Coder: refactor with code generation") == 1.0
+        assert card.matches_query("nothing here") == 0.0
+        assert isinstance(card.matches_query("nothing here"), float)
+
+    def test_inflected_and_compound_query_words(self):
+        """Keywords inside longer query words still match (as before indexing)"""
+        card = _card("coder", keywords=["test", "auth", "api", "implement", "code"])
+
+        assert card.matches_query("write unit tests") == 0.2
+        assert card.matches_query("fix authentication bug") == 0.2
+        assert card.matches_query("design REST apis") == 0.2
+        assert card.matches_query("finish the implementation") == 0.2
+        assert card.matches_query("explore the codebase") == 0.2
+        assert card.matches_query("ask the coder to test") == pytest.approx(0.9)
+
+    def test_reindex_after_mutation(self):
+        """reindex() picks up keywords added after construction"""
+        card = _card("Writer")
+        card.keywords.append("docs")
+        assert card.matches_query("update docs") == 0.0
+
+        card.reindex()
+        assert card.matches_query("update docs") == 0.2
+
+    def test_to_dict_excludes_match_cache(self):
+        """Precomputed match terms are not serialized"""
+        data = _card("Coder", keywords=["code"]).to_dict()
+        assert "_match_tokens" not in data
+        assert data["keywords"] == ["code"]
+
+
+class TestAgentDiscovery:
+    """Tests for AgentDiscovery"""
+
+    def test_discover_by_query_and_capability(self):
+        discovery = AgentDiscovery()
+        discovery.register(_card("Coder", ["code"], [AgentCapability.CODE_GENERATION]))
+        discovery.register(
+            _card("Auditor", ["security"], [AgentCapability.SECURITY_AUDIT])
+        )
+
+        assert [c.name for c in discovery.discover("security review")] == ["Auditor"]
+        found = discovery.discover(capability=AgentCapability.CODE_GENERATION)
+        assert [c.name for c in found] == ["Coder"]
+        assert discovery.discover("nothing relevant") == []
+
+    def test_discover_matches_keywords_inside_query_words(self):
+        discovery = AgentDiscovery()
+        discovery.register(_card("coder", ["test", "auth", "api"]))
+        discovery.register(_card("writer", ["docs"]))
+
+        for query in ("write unit tests", "fix authentication bug", "design REST apis"):
+            assert [c.name for c in discovery.discover(query)] == ["coder"]
+        assert [c.name for c in discovery.discover("the coders")] == ["coder"]
+        assert discovery.discover("unrelated") == []
+
+    def test_discover_top_k_and_index_maintenance(self):
+        discovery = AgentDiscovery()
+        for i in range(6):
+            discovery.register(
+                _card(f"Tester{i}", ["test"] * (i % 3 + 1), [AgentCapability.TESTING])
+            )
+
+        top = discovery.discover("test", top_k=2)
+        assert [c.name for c in top] == ["Tester2", "Tester5"]
+        assert len(discovery.discover(top_k=3)) == 3
+
+        discovery.unregister("Tester2")
+        discovery.register(_card("Tester5", ["docs"], [AgentCapability.DOCUMENTATION]))
+        names = [c.name for c in discovery.discover(capability=AgentCapability.TESTING)]
+        assert names == ["Tester0", "Tester1", "Tester3", "Tester4"]
+        assert discovery.discover(capability=AgentCapability.ARCHITECTURE) == []
+
+    def test_indexes_track_register_and_unregister(self):
+        discovery = AgentDiscovery()
+        discovery.register(_card("Coder", ["code"], [AgentCapability.CODE_GENERATION]))
+        discovery.register(
+            _card("Reviewer", ["review", "审查"], [AgentCapability.CODE_REVIEW])
+        )
+        assert discovery.get_stats()["capability_distribution"] == {
+            "code_generation": 1,
+            "code_review": 1,
+        }
+        assert [c.name for c in discovery.discover("please 审查")] == ["Reviewer"]
+
+        discovery.unregister("Coder")
+        assert discovery.discover("code") == []
+        assert "code" not in discovery._by_keyword
+        assert discovery.get_stats() == {
+            "total_agents": 1,
+            "capability_distribution": {"code_review": 1},
+        }
+
+
+class TestSlots:
+    """Hot dataclasses carry no per-instance __dict__"""
+
+    def test_dataclasses_use_slots(self):
+        from council.orchestration.a2a_adapter import TaskContract
+        from council.orchestration.blast_radius import (
+            BlastRadiusResult,
+            ImpactLevel,
+        )
+
+        card = _card("Coder", ["code"])
+        contract = TaskContract(
+            task_id="t1",
+            from_agent="a",
+            to_agent="b",
+            description="d",
+            expected_output="o",
+        )
+        result = BlastRadiusResult(
+            file_path="x.py",
+            impact_level=ImpactLevel.LEAF,
+            incoming_count=0,
+            dependents=[],
+            is_core_module=False,
+            requires_full_council=False,
+            reason="",
+        )
+        for obj in (card, contract, result):
+            assert not hasattr(obj, "__dict__")
+        assert card.matches_query("code") == 0.2
+
+
+class TestTaskContract:
+    """Tests for TaskContract lifecycle timestamps"""
+
+    def test_lifecycle_uses_monotonic_timestamps(self):
+        from datetime import datetime
+        from council.orchestration.a2a_adapter import TaskContract, TaskStatus
+
+        contract = TaskContract(
+            task_id="t1",
+            from_agent="planner",
+            to_agent="coder",
+            description="implement",
+            expected_output="patch",
+        )
+        assert isinstance(contract.created_at, int)
+        assert contract.duration_ms is None
+        assert contract.accepted_dt is None
+
+        contract.accept()
+        contract.complete("done")
+
+        assert contract.status == TaskStatus.COMPLETED
+        assert contract.created_at <= contract.accepted_at <= contract.completed_at
+        assert contract.duration_ms >= 0
+        assert abs((datetime.now() - contract.completed_dt).total_seconds()) < 5
+
+        data = contract.to_dict()
+        assert data["status"] == "completed"
+        assert datetime.fromisoformat(data["completed_at"]) == contract.completed_dt
+
+
+class TestAgentCardSerialization:
+    """Tests for cached AgentCard serialization"""
+
+    def test_to_dict_and_json_are_cached(self):
+        import json
+
+        card = _card("Coder", ["code"], [AgentCapability.CODE_GENERATION])
+        data = card.to_dict()
+        assert card.to_dict() is data
+        encoded = card.to_json_bytes()
+        assert card.to_json_bytes() is encoded
+        assert json.loads(encoded) == data
+
+        card.keywords.append("refactor")
+        card.reindex()
+        assert card.to_dict()["keywords"] == ["code", "refactor"]
+        assert json.loads(card.to_json_bytes())["keywords"] == ["code", "refactor"]
+
+    def test_discover_json(self):
+        import json
+
+        discovery = AgentDiscovery()
+        discovery.register(_card("Coder", ["code"]))
+        discovery.register(_card("Writer", ["docs", "文档"]))
+
+        payload = json.loads(discovery.discover_json("write docs"))
+        assert [c["name"] for c in payload] == ["Writer"]
+        assert json.loads(discovery.discover_json("nothing")) == []
+
+
+class TestWeakDiscovery:
+    """Tests for AgentDiscovery(weak_refs=True)"""
+
+    def test_released_cards_are_dropped(self):
+        import gc
+
+        discovery = AgentDiscovery(weak_refs=True)
+        kept = _card("Coder", ["code"], [AgentCapability.CODE_GENERATION])
+        temp = _card("Auditor", ["security"], [AgentCapability.SECURITY_AUDIT])
+        discovery.register(kept)
+        discovery.register(temp)
+        assert len(discovery.list_all()) == 2
+
+        del temp
+        gc.collect()
+
+        assert [c.name for c in discovery.list_all()] == ["Coder"]
+        assert discovery.discover("security") == []
+        assert discovery.get_stats()["capability_distribution"] == {
+            "code_generation": 1
+        }
+        assert "security" not in discovery._by_keyword
+
+    def test_replaced_card_collection_keeps_new_entry(self):
+        import gc
+
+        discovery = AgentDiscovery(weak_refs=True)
+        old = _card("Coder", ["code"])
+        discovery.register(old)
+        new = _card("Coder", ["refactor"])
+        discovery.register(new)
+
+        del old
+        gc.collect()
+
+        assert discovery.get("Coder") is new
+        assert [c.name for c in discovery.discover("refactor")] == ["Coder"]
+        assert discovery.unregister("Coder")
+        assert discovery.list_all() == []
+
+
+class TestSharedDefaults:
+    """Default containers are shared and replaced on mutation"""
+
+    def test_agent_card_defaults_and_mutators(self):
+        first = AgentCard(name="A", description="a")
+        second = AgentCard(name="B", description="b")
+        assert first.keywords is second.keywords
+        assert first.metadata is second.metadata
+        assert first.to_dict()["supported_protocols"] == ["mcp", "a2a"]
+        assert first.to_dict()["metadata"] == {}
+
+        first.add_keyword("deploy")
+        first.add_capability(AgentCapability.TESTING)
+        assert second.keywords == ()
+        assert first.matches_query("deploy testing") == 0.5
+        assert first.to_dict()["capabilities"] == ["testing"]
+
+    def test_task_contract_context_copy_on_write(self):
+        from council.orchestration.a2a_adapter import TaskContract
+
+        def contract():
+            return TaskContract(
+                task_id="t",
+                from_agent="a",
+                to_agent="b",
+                description="d",
+                expected_output="o",
+            )
+
+        rejected, failed, untouched = contract(), contract(), contract()
+        rejected.reject("busy")
+        failed.fail("boom")
+
+        assert rejected.context == {"rejection_reason": "busy"}
+        assert failed.to_dict()["context"] == {"error": "boom"}
+        assert dict(untouched.context) == {}
@@ -0,0 +1,239 @@
+"""
+Tests for council/orchestration/blast_radius.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules.setdefault("litellm", MagicMock())
+
+from council.orchestration.blast_radius import (
+    BlastRadiusAnalyzer,
+    ImpactLevel,
+    _module_to_paths,
+)
+
+
+@pytest.fixture
+def project():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pkg = Path(tmpdir) / "council"
+        pkg.mkdir()
+        (pkg / "__init__.py").write_text("")
+        (pkg / "base.py").write_text("import os\n")
+        (pkg / "a.py").write_text("from council.base import X\n")
+        (pkg / "b.py").write_text(
+            "import council.base\n\ndef f():\n    import council.a\n"
+        )
+        yield tmpdir
+
+
+class TestBlastRadiusAnalyzer:
+    """Tests for BlastRadiusAnalyzer"""
+
+    def test_single_pass_import_scan(self, project):
+        """Both import forms are picked up, including indented imports"""
+        analyzer = BlastRadiusAnalyzer(project)
+        analyzer.build_graph()
+
+        result = analyzer.analyze("council/base.py")
+        assert sorted(result.dependents) == ["council/a.py", "council/b.py"]
+        assert analyzer.analyze("council/a.py").dependents == ["council/b.py"]
+        assert analyzer.analyze("council/b.py").impact_level == ImpactLevel.LEAF
+
+    def test_incremental_cache_reuses_unchanged_files(self, project):
+        """Unchanged files are replayed from the cache instead of re-read"""
+        BlastRadiusAnalyzer(project).build_graph(incremental=True)
+        assert (Path(project) / BlastRadiusAnalyzer.CACHE_PATH).exists()
+
+        analyzer = BlastRadiusAnalyzer(project)
+        scanned = []
+        original = analyzer._scan_imports
+
+        def spy(path, size):
+            scanned.append(os.path.basename(path))
+            return original(path, size)
+
+        analyzer._scan_imports = spy
+        a_file = Path(project) / "council" / "a.py"
+        a_file.write_text("from council.base import X\nimport council.b\n")
+        os.utime(a_file, ns=(1, 1))
+        analyzer.build_graph(incremental=True)
+
+        assert scanned == ["a.py"]
+        assert analyzer.analyze("council/b.py").dependents == ["council/a.py"]
+        assert len(analyzer.analyze("council/base.py").dependents) == 2
+
+    def test_large_files_skipped(self, project):
+        """Files above MAX_FILE_BYTES are not parsed"""
+        analyzer = BlastRadiusAnalyzer(project)
+        analyzer.MAX_FILE_BYTES = 10
+        analyzer.build_graph()
+
+        assert analyzer.analyze("council/base.py").incoming_count == 0
+        assert "council/a.py" in analyzer._import_graph
+
+    def test_skips_cache_dirs(self, project):
+        """Files under __pycache__/.venv style directories are not scanned"""
+        venv = Path(project) / "council" / ".venv"
+        venv.mkdir()
+        (venv / "site.py").write_text("import council.base\n")
+
+        analyzer = BlastRadiusAnalyzer(project)
+        analyzer.build_graph()
+
+        assert "council/.venv/site.py" not in analyzer._import_graph
+        assert len(analyzer.analyze("council/base.py").dependents) == 2
+
+    def test_graph_paths_are_shared(self, project):
+        """The same path string object is reused across graph sets"""
+        analyzer = BlastRadiusAnalyzer(project)
+        analyzer.build_graph()
+
+        deps_a = analyzer._import_graph["council/a.py"]
+        deps_b = analyzer._import_graph["council/b.py"]
+        base_a = next(p for p in deps_a if p == "council/base.py")
+        base_b = next(p for p in deps_b if p == "council/base.py")
+        assert base_a is base_b
+
+    def test_impact_level_thresholds(self, tmp_path):
+        """Incoming counts map onto the documented impact levels"""
+        analyzer = BlastRadiusAnalyzer(str(tmp_path))
+        analyzer._is_built = True
+        expected = {
+            0: ImpactLevel.LEAF,
+            1: ImpactLevel.LOW,
+            2: ImpactLevel.LOW,
+            3: ImpactLevel.MEDIUM,
+            5: ImpactLevel.MEDIUM,
+            6: ImpactLevel.HIGH,
+            10: ImpactLevel.HIGH,
+            11: ImpactLevel.CORE,
+        }
+        for count, level in expected.items():
+            analyzer._reverse_graph["pkg/mod.py"] = {f"d{i}.py" for i in range(count)}
+            assert analyzer.analyze("pkg/mod.py").impact_level == level
+
+        analyzer._reverse_graph["pkg/utils.py"] = {"d.py"}
+        result = analyzer.analyze("pkg/utils.py")
+        assert result.impact_level == ImpactLevel.MEDIUM
+        assert not result.requires_full_council
+
+    def test_keyword_matching(self, tmp_path):
+        """Core keywords and sensitive paths are detected in one pass"""
+        analyzer = BlastRadiusAnalyzer(str(tmp_path))
+
+        assert analyzer._match_keywords("council/auth/rbac.py") == (True, True)
+        assert analyzer._match_keywords("council/governance/gate.py") == (False, True)
+        assert analyzer._match_keywords("council/agents/base_agent.py") == (True, False)
+        assert analyzer._match_keywords("docs/readme.md") == (False, False)
+
+    def test_dependents_capped_but_counted(self, tmp_path):
+        """Only MAX_DEPENDENTS dependents are returned; the count stays exact"""
+        analyzer = BlastRadiusAnalyzer(str(tmp_path))
+        analyzer._is_built = True
+        analyzer._reverse_graph["pkg/mod.py"] = {f"d{i}.py" for i in range(25)}
+
+        result = analyzer.analyze("pkg\\mod.py")
+        assert result.file_path == "pkg/mod.py"
+        assert result.incoming_count == 25
+        assert len(result.dependents) == analyzer.MAX_DEPENDENTS
+
+    def test_analyze_multiple_returns_highest_impact(self, project):
+        """The first file with the highest level wins; inputs are not mutated"""
+        analyzer = BlastRadiusAnalyzer(project)
+        leaf = analyzer.analyze("council/b.py")
+
+        result = analyzer.analyze_multiple(
+            ["council/b.py", "council/base.py", "council/a.py"]
+        )
+        assert result.file_path == "council/base.py"
+        assert result.reason.startswith("[3 个文件中最高影响] ")
+        assert analyzer.analyze_multiple([]).file_path == "(none)"
+        assert not leaf.reason.startswith("[")
+
+    def test_module_to_paths_cached(self):
+        """Module names resolve to cached, interned path tuples"""
+        paths = _module_to_paths("council.agents.base")
+        assert paths == ("council/agents/base.py", "council/agents/base/__init__.py")
+        assert _module_to_paths("council.agents.base") is paths
+
+    def test_keyword_flags_cached_per_path(self, tmp_path):
+        """Keyword matching runs once per distinct path"""
+        analyzer = BlastRadiusAnalyzer(str(tmp_path))
+        analyzer._is_built = True
+        calls = []
+        original = analyzer._match_keywords
+
+        def spy(path_lower):
+            calls.append(path_lower)
+            return original(path_lower)
+
+        analyzer._match_keywords = spy
+        for _ in range(3):
+            assert analyzer.analyze("Council/Auth/RBAC.py").requires_full_council
+        assert calls == ["council/auth/rbac.py"]
+
+    def test_scan_ignores_non_import_lines(self, tmp_path):
+        """Only lines starting with an import statement are reported"""
+        from council.orchestration.blast_radius import _scan_file
+
+        source = (
+            '"""Docs mention import os here."""\n'
+            "important = 1  # import sys\n"
+            "from pkg.mod import (\n    a,\n)\n"
+            "\timport json, re\n"
+            "x = 'import nothing'"
+        )
+        path = tmp_path / "m.py"
+        path.write_text(source)
+        assert _scan_file(str(path), len(source), 1 << 20) == ["pkg.mod", "json"]
+
+    def test_generated_matcher_shared(self, tmp_path):
+        """Specialized keyword matchers are generated once per keyword set"""
+        from council.orchestration.blast_radius import _compile_substring_matcher
+
+        match = _compile_substring_matcher(("auth/", "o'brien"))
+        assert match("council/auth/x.py")
+        assert match("o'brien.py")
+        assert not match("council/agents/x.py")
+        assert _compile_substring_matcher(("auth/", "o'brien")) is match
+        assert _compile_substring_matcher(())("anything") is False
+
+    def test_transitive_dependents(self, project):
+        """Cascade impact follows dependents of dependents"""
+        analyzer = BlastRadiusAnalyzer(project)
+
+        assert analyzer.transitive_dependents("council/base.py") in (
+            ["council/a.py", "council/b.py"],
+            ["council/b.py", "council/a.py"],
+        )
+        assert analyzer.transitive_dependents("council/a.py") == ["council/b.py"]
+        assert analyzer.transitive_dependents("council/b.py") == []
+        assert analyzer.transitive_dependents("missing.py") == []
+
+
+class TestImportCost:
+    """Heavy stdlib modules are only imported when needed"""
+
+    def test_process_pool_imported_lazily(self):
+        import subprocess
+
+        code = (
+            "import sys\n"
+            "from unittest.mock import MagicMock\n"
+            "sys.modules['litellm'] = MagicMock()\n"
+            "import council.orchestration.blast_radius\n"
+            "import council.orchestration.a2a_adapter\n"
+            "assert 'concurrent.futures.process' not in sys.modules\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,517 @@
+"""
+Tests for council/orchestration/collaboration.py
+"""
+
+import asyncio
+import sys
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("litellm", MagicMock())
+
+from council.orchestration.collaboration import CollaborationOrchestrator
+
+
+class TestDesignReview:
+    """Tests for design_review"""
+
+    async def test_criteria_evaluated_concurrently(self):
+        in_flight = 0
+        peak = 0
+
+        async def architect(design, ctx):
+            return "explained"
+
+        async def auditor(criterion, ctx):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"score": {"a": 1.0, "b": 0.5, "c": 0.0}[criterion]}
+
+        result = await CollaborationOrchestrator().design_review(
+            architect, auditor, "design", criteria=["a", "b", "c"]
+        )
+
+        assert peak == 3
+        assert list(result.outcome["criteria_scores"]) == ["a", "b", "c"]
+        assert [d["action"] for d in result.decisions[1:]] == [
+            "evaluate_a",
+            "evaluate_b",
+            "evaluate_c",
+        ]
+        assert result.outcome["overall_score"] == 0.5
+
+    async def test_decision_previews_truncated(self):
+        from council.orchestration.collaboration import _preview
+
+        short = "short"
+        assert _preview(short, 10) is short
+        assert _preview("x" * 20, 10) == "x" * 10
+        assert _preview({"k": 1}, 5) == "{'k':"
+
+        result = await CollaborationOrchestrator().design_review(
+            lambda d, c: "e" * 600, lambda criterion, c: 1.0, "design"
+        )
+        assert result.decisions[0]["output"] == "e" * 500
+
+    async def test_sync_auditor(self):
+        result = await CollaborationOrchestrator().design_review(
+            lambda d, c: "explained",
+            lambda criterion, c: 0.9,
+            "design",
+        )
+        assert result.outcome["approved"]
+        assert len(result.outcome["criteria_scores"]) == 3
+
+
+class TestBrainstorm:
+    """Tests for brainstorm"""
+
+    async def test_round_agents_share_previous_snapshot(self):
+        seen = {}
+        in_flight = 0
+        peak = 0
+
+        def make_agent(name):
+            async def agent(prompt, ctx):
+                nonlocal in_flight, peak
+                if prompt == "vote":
+                    return [0]
+                seen[(name, ctx["round"])] = list(ctx["existing_ideas"])
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return [f"{name}-r{ctx['round']}"]
+
+            return agent
+
+        result = await CollaborationOrchestrator().brainstorm(
+            [("x", make_agent("x")), ("y", make_agent("y"))],
+            "topic",
+            rounds=2,
+        )
+
+        assert peak == 2
+        assert seen[("x", 0)] == seen[("y", 0)] == []
+        assert seen[("x", 1)] == seen[("y", 1)] == ["x-r0", "y-r0"]
+        assert [d["agent"] for d in result.decisions] == ["x", "y", "x", "y"]
+        assert result.artifacts["all_ideas"][0] == {
+            "agent": "x",
+            "idea": "x-r0",
+            "votes": 2,
+        }
+        assert result.outcome["total_ideas"] == 4
+
+    async def test_round_ideas_share_timestamp(self, monkeypatch):
+        from council.orchestration import collaboration
+
+        created = []
+        original = collaboration.BrainstormIdea
+
+        def spy(**kwargs):
+            created.append(original(**kwargs))
+            return created[-1]
+
+        monkeypatch.setattr(collaboration, "BrainstormIdea", spy)
+
+        async def agent(prompt, ctx):
+            return ["a", "b", "c"]
+
+        await CollaborationOrchestrator().brainstorm(
+            [("x", agent), ("y", agent)], "topic", rounds=1
+        )
+
+        assert len(created) == 6
+        assert len({i.timestamp for i in created}) == 1
+
+    async def test_string_votes_prefer_exact_match(self):
+        def make_agent(ideas, ballot):
+            async def agent(prompt, ctx):
+                return ballot if prompt == "vote" else ideas
+
+            return agent
+
+        result = await CollaborationOrchestrator().brainstorm(
+            [
+                ("x", make_agent(["cache layer", "cache"], ["cache", "layer"])),
+                ("y", make_agent(["shard"], ["cache", "nothing"])),
+            ],
+            "topic",
+            rounds=1,
+        )
+
+        votes = {i["idea"]: i["votes"] for i in result.artifacts["all_ideas"]}
+        assert votes == {"cache": 2, "cache layer": 1, "shard": 0}
+
+    async def test_response_parsing_caps_ideas(self):
+        responses = {
+            "text": "  first \n\n second\r\nthird\nfourth",
+            "list": ["a", "b", "c", "d"],
+            "other": 42,
+        }
+
+        def make_agent(kind):
+            async def agent(prompt, ctx):
+                return [] if prompt == "vote" else responses[kind]
+
+            return agent
+
+        result = await CollaborationOrchestrator().brainstorm(
+            [(k, make_agent(k)) for k in responses],
+            "topic",
+            rounds=1,
+            ideas_per_round=3,
+        )
+
+        ideas = [(i["agent"], i["idea"]) for i in result.artifacts["all_ideas"]]
+        assert ideas == [
+            ("text", "first"),
+            ("text", "second"),
+            ("text", "third"),
+            ("list", "a"),
+            ("list", "b"),
+            ("list", "c"),
+            ("other", "42"),
+        ]
+        assert [d["ideas_count"] for d in result.decisions] == [3, 3, 1]
+
+
+class TestBuildConsensus:
+    """Tests for build_consensus"""
+
+    async def test_votes_gathered_with_previous_round_snapshot(self):
+        seen = []
+
+        def make_agent(name, choices):
+            async def agent(question, ctx):
+                seen.append(
+                    (name, ctx["round"], [v["choice"] for v in ctx["previous_votes"]])
+                )
+                await asyncio.sleep(0.01 if name == "a" else 0)
+                return {"choice": choices[ctx["round"]], "rationale": name}
+
+            return agent
+
+        result = await CollaborationOrchestrator().build_consensus(
+            [("a", make_agent("a", ["x", "y"])), ("b", make_agent("b", ["y", "y"]))],
+            "pick",
+            ["x", "y"],
+            threshold=0.9,
+        )
+
+        assert result.outcome["consensus_reached"]
+        assert result.outcome["final_choice"] == "y"
+        assert result.iterations == 2
+        assert sorted(seen) == [
+            ("a", 0, []),
+            ("a", 1, ["x", "y"]),
+            ("b", 0, []),
+            ("b", 1, ["x", "y"]),
+        ]
+        assert [(d["round"], d["agent"]) for d in result.decisions] == [
+            (0, "a"),
+            (0, "b"),
+            (1, "a"),
+            (1, "b"),
+        ]
+
+    async def test_tally_ignores_unknown_choices(self):
+        answers = iter(["maybe", "x", "y", "x"])
+
+        async def agent(question, ctx):
+            return next(answers)
+
+        result = await CollaborationOrchestrator().build_consensus(
+            [(f"a{i}", agent) for i in range(4)],
+            "pick",
+            ["x", "y", "z"],
+            max_rounds=1,
+        )
+
+        assert result.outcome["consensus_reached"]
+        assert result.outcome["final_choice"] == "x"
+        assert result.consensus_score == 2 / 3
+        assert result.outcome["vote_distribution"] == {"x": 2.0, "y": 1.0, "z": 0.0}
+
+    async def test_no_valid_votes(self):
+        async def agent(question, ctx):
+            return "other"
+
+        result = await CollaborationOrchestrator().build_consensus(
+            [("a", agent)], "pick", ["x", "y"], max_rounds=2
+        )
+
+        assert not result.outcome["consensus_reached"]
+        assert result.outcome["final_choice"] == "x"
+        assert result.consensus_score == 0.0
+
+    async def test_ties_break_by_option_order(self):
+        def make_agent(choice, delay):
+            async def agent(question, ctx):
+                await asyncio.sleep(delay)
+                return choice
+
+            return agent
+
+        result = await CollaborationOrchestrator().build_consensus(
+            [("slow", make_agent("x", 0.01)), ("fast", make_agent("y", 0))],
+            "pick",
+            ["x", "y"],
+            threshold=0.5,
+            early_stop=False,
+        )
+
+        assert result.outcome["final_choice"] == "x"
+        assert result.consensus_score == 0.5
+
+    async def test_zero_rounds(self):
+        result = await CollaborationOrchestrator().build_consensus(
+            [("a", lambda q, c: "x")], "pick", ["x", "y"], max_rounds=0
+        )
+
+        assert not result.outcome["consensus_reached"]
+        assert result.outcome["final_choice"] == "x"
+        assert result.iterations == 0
+        assert result.consensus_score == 0.0
+
+    async def test_round_stops_once_outcome_is_decided(self):
+        started = []
+
+        def make_agent(name, delay):
+            async def agent(question, ctx):
+                started.append(name)
+                await asyncio.sleep(delay)
+                return "x"
+
+            return agent
+
+        agents = [("fast1", make_agent("fast1", 0)), ("fast2", make_agent("fast2", 0))]
+        agents.append(("slow", make_agent("slow", 10)))
+
+        result = await CollaborationOrchestrator().build_consensus(
+            agents, "pick", ["x", "y"], threshold=0.6
+        )
+
+        assert started == ["fast1", "fast2", "slow"]
+        assert result.outcome["consensus_reached"]
+        assert result.outcome["final_choice"] == "x"
+        assert [d["agent"] for d in result.decisions] == ["fast1", "fast2"]
+        assert result.consensus_score == 2 / 3
+        assert result.duration_ms < 5000
+
+    async def test_low_threshold_waits_for_possible_overtake(self):
+        def make_agent(choice, delay):
+            async def agent(question, ctx):
+                await asyncio.sleep(delay)
+                return choice
+
+            return agent
+
+        agents = [(f"y{i}", make_agent("y", 0)) for i in range(2)]
+        agents += [(f"x{i}", make_agent("x", 0.02)) for i in range(3)]
+
+        result = await CollaborationOrchestrator().build_consensus(
+            agents, "pick", ["x", "y"], threshold=0.3
+        )
+
+        assert result.outcome["final_choice"] == "x"
+        assert result.consensus_score == 0.6
+        assert result.outcome["vote_distribution"] == {"x": 3.0, "y": 2.0}
+
+    async def test_no_early_stop_while_outcome_open(self):
+        answers = {"a": "x", "b": "y", "c": "x"}
+
+        def make_agent(name):
+            async def agent(question, ctx):
+                await asyncio.sleep(0.01 if name == "c" else 0)
+                return answers[name]
+
+            return agent
+
+        result = await CollaborationOrchestrator().build_consensus(
+            [(n, make_agent(n)) for n in answers],
+            "pick",
+            ["x", "y"],
+            threshold=0.6,
+            max_rounds=1,
+        )
+
+        assert [d["agent"] for d in result.decisions] == ["a", "b", "c"]
+        assert result.outcome["final_choice"] == "x"
+
+
+class TestConcurrencyLimit:
+    """Tests for max_concurrency"""
+
+    async def test_in_flight_calls_bounded(self):
+        in_flight = 0
+        peak = 0
+
+        async def agent(prompt, ctx):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.005)
+            in_flight -= 1
+            return "yes"
+
+        collab = CollaborationOrchestrator(max_concurrency=3)
+        agents = [(f"a{i}", agent) for i in range(10)]
+        result = await collab.build_consensus(
+            agents, "ok?", ["yes", "no"], early_stop=False
+        )
+
+        assert peak == 3
+        assert result.outcome["final_choice"] == "yes"
+        assert len(result.decisions) == 10
+
+
+class TestSyncAgents:
+    """Sync agents run off the event loop"""
+
+    async def test_pair_programming_sync_agents_use_threads(self):
+        import threading
+
+        loop_thread = threading.get_ident()
+        threads = set()
+
+        def coder(task, ctx):
+            threads.add(threading.get_ident())
+            return "code"
+
+        def reviewer(code, ctx):
+            threads.add(threading.get_ident())
+            return {"approved": True}
+
+        result = await CollaborationOrchestrator().pair_programming(
+            coder, reviewer, "task"
+        )
+
+        assert result.outcome == "code"
+        assert loop_thread not in threads
+
+    def test_coroutine_check_memoized(self):
+        from council.orchestration.collaboration import _is_coro, _is_coro_cached
+
+        async def agent(prompt, ctx):
+            return ""
+
+        class Unhashable:
+            __hash__ = None
+
+            def __call__(self, prompt, ctx):
+                return ""
+
+        before = _is_coro_cached.cache_info().hits
+        assert _is_coro(agent) and _is_coro(agent)
+        assert _is_coro_cached.cache_info().hits == before + 1
+        assert not _is_coro(Unhashable())
+
+
+class TestAgentPayloads:
+    """Agent inputs are independent dicts built from a shared base"""
+
+    async def test_payloads_are_not_shared(self):
+        payloads = []
+
+        async def agent(prompt, ctx):
+            payloads.append(ctx)
+            ctx["scratch"] = len(payloads)
+            return "yes"
+
+        collab = CollaborationOrchestrator()
+        await collab.build_consensus(
+            [("a", agent), ("b", agent)], "q", ["yes"], context={"user": "u"}
+        )
+
+        assert payloads[0] is not payloads[1]
+        assert payloads[0]["user"] == payloads[1]["user"] == "u"
+        assert payloads[0]["scratch"] == 1 and payloads[1]["scratch"] == 2
+
+
+class TestSessions:
+    """Tests for session bookkeeping"""
+
+    async def test_session_ids_unique(self):
+        async def agent(prompt, ctx):
+            return "yes"
+
+        collab = CollaborationOrchestrator()
+        ids = set()
+        for _ in range(20):
+            result = await collab.build_consensus([("a", agent)], "q", ["yes"])
+            assert len(result.session_id) == 8
+            ids.add(result.session_id)
+
+        assert len(ids) == 20
+        assert collab.get_session(result.session_id) is result
+
+    async def test_pair_programming_keys_override_context(self):
+        seen = []
+
+        async def coder(task, ctx):
+            seen.append(ctx)
+            return "code"
+
+        async def reviewer(code, ctx):
+            seen.append(ctx)
+            return False
+
+        await CollaborationOrchestrator().pair_programming(
+            coder, reviewer, "real", max_iterations=2, context={"task": "stale"}
+        )
+
+        assert [c["task"] for c in seen] == ["real"] * 4
+        assert seen[2]["feedback"] == "Needs revision"
+        assert seen[3]["iteration"] == 1
+
+    async def test_sessions_evicted_lru(self):
+        async def agent(prompt, ctx):
+            return "yes"
+
+        collab = CollaborationOrchestrator(max_sessions=2)
+        first = await collab.build_consensus([("a", agent)], "q", ["yes"])
+        second = await collab.build_consensus([("a", agent)], "q", ["yes"])
+        assert collab.get_session(first.session_id) is first
+
+        third = await collab.build_consensus([("a", agent)], "q", ["yes"])
+        assert collab.get_session(second.session_id) is None
+        assert collab.get_all_sessions() == [first, third]
+
+
+class TestSlots:
+    """Collaboration, delegation and event records carry no __dict__"""
+
+    def test_dataclasses_use_slots(self):
+        from council.orchestration.collaboration import (
+            BrainstormIdea,
+            CollaborationMode,
+            CollaborationResult,
+            Vote,
+        )
+        from council.orchestration.delegation import (
+            DelegationRequest,
+            DelegationResult,
+            DelegationStatus,
+        )
+        from council.orchestration.events import Event, EventType
+
+        request = DelegationRequest(task="t", from_agent="a", to_agent="b", depth=1)
+        records = [
+            CollaborationResult("s", CollaborationMode.PAIR, [], None),
+            Vote(agent="a", choice="x"),
+            BrainstormIdea(agent="a", idea="i"),
+            request,
+            DelegationResult(request=request, status=DelegationStatus.SUCCESS),
+            Event(type=EventType.HEARTBEAT, source="s"),
+        ]
+        for record in records:
+            assert not hasattr(record, "__dict__")
+        assert records[1].to_dict() == {
+            "agent": "a",
+            "choice": "x",
+            "confidence": 1.0,
+            "rationale": "",
+        }
@@ -0,0 +1,192 @@
+"""
+Tests for Decision Visualization
+"""
+
+import sys
+from unittest.mock import MagicMock
+
+# Mock litellm before imports
+sys.modules["litellm"] = MagicMock()
+
+from council.observability.decision_viz import DecisionVisualizer
+
+
+def _build_tree() -> DecisionVisualizer:
+    viz = DecisionVisualizer("Test")
+    root = viz.add_decision("planner", "Plan", confidence=0.9)
+    child = viz.add_decision("router", "Route", confidence=0.6, parent_id=root)
+    viz.add_decision("executor", "Run", confidence=0.3, parent_id=child)
+    viz.add_decision("reviewer", "Review", confidence=0.85, parent_id=root)
+    viz.add_decision("solo", "Standalone", confidence=0.5)
+    return viz
+
+
+class TestDecisionVisualizer:
+    """DecisionVisualizer 测试"""
+
+    def test_find_node_nested(self):
+        """测试嵌套节点查找"""
+        viz = _build_tree()
+        assert viz._find_node("D3").agent == "executor"
+        assert viz._find_node("D99") is None
+
+    def test_all_nodes_preorder(self):
+        """测试节点按先序展开"""
+        viz = _build_tree()
+        assert [n.id for n in viz._all_nodes()] == ["D1", "D2", "D3", "D4", "D5"]
+        assert viz._count_decisions() == 5
+
+    def test_stats(self):
+        """测试单次遍历统计"""
+        viz = _build_tree()
+        count, nodes, conf_sum = viz._stats()
+        assert count == len(nodes) == 5
+        assert abs(conf_sum - 3.15) < 1e-9
+        assert abs(viz._avg_confidence() - 0.63) < 1e-9
+
+    def test_deep_chain_no_recursion_error(self):
+        """测试深层决策链不触发 RecursionError"""
+        viz = DecisionVisualizer()
+        parent = None
+        for i in range(5000):
+            parent = viz.add_decision("agent", f"step {i}", parent_id=parent)
+
+        assert viz._count_decisions() == 5000
+        assert "D5000" in viz.to_mermaid()
+        assert "Total decisions: 5000" in viz.to_cli(use_color=False)
+
+    def test_to_mermaid_structure(self):
+        """测试 Mermaid 输出结构"""
+        mermaid = _build_tree().to_mermaid()
+        assert mermaid.startswith("graph TD")
+        assert "D1 --> D2" in mermaid
+        assert "D2 --> D3" in mermaid
+        assert "class D1,D4 high" in mermaid
+        assert "class D2,D5 medium" in mermaid
+        assert "class D3 low" in mermaid
+
+    def test_to_html_rows(self):
+        """测试 HTML 决策表行"""
+        html = _build_tree().to_html()
+        assert html.count("<tr><td>") == 5
+        assert "<td>&nbsp;&nbsp;&nbsp;&nbsp;router</td>" in html
+        assert '<td class="low">30%</td>' in html
+
+    def test_to_html_escapes_user_fields(self):
+        """测试 HTML 转义用户输入"""
+        viz = DecisionVisualizer("<Report>")
+        viz.add_decision("<agent>", "a & b", rationale='say "hi"', confidence=0.9)
+        html = viz.to_html()
+        assert "<td>&lt;agent&gt;</td>" in html
+        assert "<td>a &amp; b</td>" in html
+        assert "<td>say &quot;hi&quot;</td>" in html
+        assert "<title>&lt;Report&gt;</title>" in html
+
+    def test_to_html_escapes_mermaid_block(self):
+        """测试 Mermaid 区块中的 agent/decision 同样被转义"""
+        viz = DecisionVisualizer("Report")
+        root = viz.add_decision(
+            "<script>alert(1)</script>",
+            "<img src=x onerror=alert(1)>",
+            rationale="<b>why</b>",
+            confidence=0.9,
+        )
+        viz.add_decision("<svg onload=alert(2)>", "<iframe>", parent_id=root)
+        html = viz.to_html()
+
+        for raw in ("<script>alert", "<img", "<svg", "<iframe", "<b>"):
+            assert raw not in html
+        assert "&lt;script&gt;alert(1)&lt;/script&gt;: &lt;img src=x" in html
+        assert "D1 --&gt; D2" in html
+
+    def test_index_reset_on_clear(self):
+        """测试 clear 重置节点索引"""
+        viz = _build_tree()
+        viz.clear()
+        assert viz._find_node("D1") is None
+
+        viz.add_decision("orphan", "No parent", parent_id="D3")
+        assert [n.id for n in viz.decisions] == ["D1"]
+
+    def test_decision_node_uses_slots(self):
+        """测试 DecisionNode 无实例 __dict__"""
+        node = _build_tree().decisions[0]
+        assert not hasattr(node, "__dict__")
+
+    def test_export_json_matches_to_dict(self, tmp_path):
+        """测试 JSON 导出与 to_dict 结构一致"""
+        import json
+
+        viz = _build_tree()
+        path = tmp_path / "decisions.json"
+        viz.export_json(str(path))
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        assert data["total_decisions"] == 5
+        assert data["decisions"] == [d.to_dict() for d in viz.decisions]
+
+    def test_export_json_failure_keeps_existing_file(self, tmp_path, monkeypatch):
+        """测试 JSON 编码失败时不截断已有文件"""
+        import pytest
+
+        from council.observability import decision_viz
+
+        monkeypatch.setattr(decision_viz, "HAS_ORJSON", False)
+        path = tmp_path / "decisions.json"
+        path.write_text("previous", encoding="utf-8")
+
+        viz = _build_tree()
+        viz.add_decision("agent", "Bad", payload=object())
+        with pytest.raises(TypeError):
+            viz.export_json(str(path))
+        assert path.read_text(encoding="utf-8") == "previous"
+
+    def test_to_cli_colors(self):
+        """测试 CLI 输出颜色开关"""
+        viz = _build_tree()
+        colored = viz.to_cli()
+        plain = viz.to_cli(use_color=False)
+
+        assert "\033[94mplanner\033[0m: Plan \033[92m[90%]\033[0m" in colored
+        assert "\033[" not in plain
+        assert "│   ├── router: Route [60%]" in plain
+
+    def test_visualize_from_records_mixed(self):
+        """测试从记录对象与字典构建可视化"""
+        from council.observability.decision_viz import visualize_from_records
+        from council.observability.tracer import DecisionRecord
+
+        records = [
+            DecisionRecord(
+                timestamp="t",
+                agent="planner",
+                decision="Plan",
+                rationale="because",
+                confidence=0.9,
+            ),
+            {"agent": "coder", "decision": "Code"},
+        ]
+        viz = visualize_from_records(records, title="Mixed")
+
+        first, second = viz.decisions
+        assert (first.agent, first.rationale, first.confidence) == (
+            "planner",
+            "because",
+            0.9,
+        )
+        assert (second.agent, second.rationale, second.confidence) == ("coder", "", 0.0)
+
+    def test_node_tier(self):
+        """测试置信度分级缓存"""
+        viz = _build_tree()
+        assert [n.tier for n in viz._all_nodes()] == [
+            "high",
+            "medium",
+            "low",
+            "high",
+            "medium",
+        ]
+
+        node = viz.decisions[0]
+        node.confidence = 0.2
+        assert node.tier == "low"
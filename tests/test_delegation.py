@@ -195,6 +195,107 @@ class TestDelegationManager:
                 task="Test", from_agent=setup["orchestrator"], to_agent_name="coder"
             )
 
+    def test_circular_delegation_detected(self, setup):
+        """测试循环委托检测"""
+        from council.orchestration.delegation import DelegationError
+
+        dm = setup["dm"]
+        orchestrator = setup["orchestrator"]
+        outcome = {}
+
+        def execute(task, plan=None):
+            outcome["chain"] = dm.get_current_chain()
+            try:
+                dm.delegate(
+                    "loop", from_agent=orchestrator, to_agent_name="orchestrator"
+                )
+            except DelegationError as e:
+                outcome["error"] = str(e)
+            return ExecuteResult(success=True, output="ok")
+
+        setup["coder"].execute = execute
+        result = dm.delegate("Test", from_agent=orchestrator, to_agent_name="coder")
+
+        assert result.status == DelegationStatus.SUCCESS
+        assert outcome == {
+            "chain": ["orchestrator"],
+            "error": "Circular delegation detected",
+        }
+        assert dm.get_current_chain() == []
+        assert dm._chain_var.get() == ((), frozenset())
+
+    async def test_adelegate_concurrent_siblings(self, setup):
+        """测试并发异步委托的委托链互不干扰"""
+        import asyncio
+        import threading
+
+        dm = setup["dm"]
+        barrier = threading.Barrier(2, timeout=5)
+        chains = {}
+
+        def make_execute(name):
+            def execute(task, plan=None):
+                barrier.wait()  # 两个委托同时在执行中
+                chains[name] = dm.get_current_chain()
+                return ExecuteResult(success=True, output=name)
+
+            return execute
+
+        setup["coder"].execute = make_execute("coder")
+        setup["reviewer"].execute = make_execute("reviewer")
+
+        results = await asyncio.gather(
+            dm.adelegate("a", setup["orchestrator"], "coder"),
+            dm.adelegate("b", setup["orchestrator"], "reviewer"),
+        )
+
+        assert [r.status for r in results] == [DelegationStatus.SUCCESS] * 2
+        assert chains == {"coder": ["orchestrator"], "reviewer": ["orchestrator"]}
+        assert dm.get_current_chain() == []
+        assert dm.get_stats()["total"] == 2
+
+    async def test_adelegate_same_agent_depth_isolated(self, setup):
+        """测试并发委托同一 Agent 时深度按上下文隔离"""
+        import asyncio
+        import threading
+        import time
+
+        dm = setup["dm"]
+        barrier = threading.Barrier(2, timeout=5)
+        depths = {}
+
+        def execute(task, plan=None):
+            barrier.wait()
+            if task == "slow":
+                time.sleep(0.05)  # 另一个委托先结束
+            depths[task] = dm.get_current_depth()
+            return ExecuteResult(success=True, output=task)
+
+        setup["coder"].execute = execute
+        await asyncio.gather(
+            dm.adelegate("fast", setup["orchestrator"], "coder"),
+            dm.adelegate("slow", setup["orchestrator"], "coder"),
+        )
+
+        assert depths == {"fast": 1, "slow": 1}
+        assert dm.get_current_depth() == 0
+
+    def test_history_bounded_and_rejections_optional(self, setup):
+        """测试历史上限与拒绝记录开关"""
+        dm = DelegationManager(setup["registry"], max_history=3)
+        for i in range(5):
+            dm.delegate(f"Task {i}", setup["orchestrator"], "coder")
+
+        history = dm.get_history(limit=2)
+        assert [r.request.task for r in history] == ["Task 3", "Task 4"]
+        assert dm.get_stats()["total"] == 3
+
+        quiet = DelegationManager(setup["registry"], record_rejections=False)
+        no_delegate_agent = MockAgent("no_delegate", "ND", allow_delegation=False)
+        with pytest.raises(DelegationNotAllowedError):
+            quiet.delegate("Test", no_delegate_agent, "coder")
+        assert quiet.get_history() == []
+
     def test_get_stats(self, setup):
         """测试统计"""
         setup["dm"].delegate(
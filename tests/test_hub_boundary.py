@@ -76,6 +76,12 @@ class TestHubBoundary(unittest.TestCase):
         # 2. Empty source
         event2 = Event.create("task.created", "")
         self.assertEqual(event2.source, "")
+        self.assertEqual(event2.type, EventType.TASK_CREATED)
+
+        # 3. Member name, case-insensitive
+        event3 = Event.create("code_written", "coder", file="main.py")
+        self.assertEqual(event3.type, EventType.CODE_WRITTEN)
+        self.assertNotIn("original_type", event3.payload)
 
     def test_ledger_overflow_protection(self):
         """
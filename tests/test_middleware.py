@@ -2,12 +2,15 @@
 Tests for council/observability/middleware.py
 """
 
+import os
+
 import pytest
 
 from council.observability.middleware import (
     observable,
     Span,
     TraceCollector,
+    collector,
     LocalMemory,
     generate_trace_id,
     generate_span_id,
@@ -58,6 +61,16 @@ class TestLocalMemory:
         context = memory.to_context()
         assert "Recent Memory" in context
 
+    def test_to_context_lists_last_five(self):
+        """Test that the context only includes the five newest items"""
+        memory = LocalMemory(max_items=10)
+        for i in range(8):
+            memory.add({"value": i})
+        context = memory.to_context()
+        assert "'value': 2" not in context
+        assert "'value': 3" in context
+        assert "'value': 7" in context
+
     def test_clear(self):
         """Test clearing memory"""
         memory = LocalMemory()
@@ -116,6 +129,24 @@ class TestSpan:
         assert span.status == "ERROR"
         assert span.end_time is not None
 
+    def test_duration_uses_monotonic_clock(self):
+        """Test that duration comes from monotonic nanoseconds"""
+        span = Span(
+            trace_id="abc",
+            span_id="s1",
+            parent_span_id=None,
+            operation_name="test",
+            agent_name="Agent",
+            start_time=1700000000.0,
+            start_ns=1_000_000_000,
+        )
+        span.end_ns = 1_012_500_000
+        assert span.duration_ms == 12.5
+
+        span.finish()
+        assert span.end_ns >= span.start_ns
+        assert span.end_time >= span.start_time
+
     def test_to_dict(self):
         """Test converting span to dict"""
         from datetime import datetime
@@ -133,6 +164,38 @@ class TestSpan:
         assert d["traceId"] == "abc"
         assert d["attributes"]["agent.name"] == "Agent"
 
+    def test_raw_timestamps_formatted_on_export(self):
+        """Test that span times are stored raw and formatted in to_dict"""
+        from datetime import datetime
+
+        span = Span(
+            trace_id="abc",
+            span_id="s1",
+            parent_span_id=None,
+            operation_name="test",
+            agent_name="Agent",
+            start_time=1700000000.0,
+        )
+        span.end_time = 1700000000.25
+        assert span.duration_ms == 250.0
+        d = span.to_dict()
+        assert d["startTime"] == datetime.fromtimestamp(1700000000.0).isoformat()
+        assert d["duration"] == 250.0
+
+    def test_span_uses_slots(self):
+        """Test that spans carry no per-instance __dict__"""
+        from datetime import datetime
+
+        span = Span(
+            trace_id="abc",
+            span_id="s1",
+            parent_span_id=None,
+            operation_name="test",
+            agent_name="Agent",
+            start_time=datetime.now(),
+        )
+        assert not hasattr(span, "__dict__")
+
 
 class TestTraceCollector:
     """Tests for TraceCollector singleton"""
@@ -162,6 +225,112 @@ class TestTraceCollector:
         traces = TraceCollector.get_traces(limit=10)
         assert len(traces) >= 1
 
+    def test_class_level_api_uses_singleton(self):
+        """Test that class-level calls act on the module-level collector"""
+        from datetime import datetime
+
+        assert TraceCollector() is collector
+        TraceCollector.clear()
+        span = Span(
+            trace_id="cls",
+            span_id="s1",
+            parent_span_id=None,
+            operation_name="test",
+            agent_name="ClassAgent",
+            start_time=datetime.now(),
+        )
+        TraceCollector.record(span)
+        assert [t["traceId"] for t in collector.get_traces()] == ["cls"]
+        assert len(TraceCollector.get_traces_for_agent("ClassAgent")) == 1
+        TraceCollector.clear()
+        assert collector.get_traces() == []
+
+    def test_record_is_bounded(self):
+        """Test that the collector keeps only the most recent spans"""
+        from datetime import datetime
+
+        collector.clear()
+        for i in range(TraceCollector.MAX_SPANS + 5):
+            collector.record(
+                Span(
+                    trace_id=f"t{i}",
+                    span_id="s",
+                    parent_span_id=None,
+                    operation_name="op",
+                    agent_name="Agent",
+                    start_time=datetime.now(),
+                )
+            )
+
+        collector.flush()
+        assert len(collector._spans) == TraceCollector.MAX_SPANS
+        traces = collector.get_traces(limit=3)
+        last = TraceCollector.MAX_SPANS + 4
+        assert [t["traceId"] for t in traces] == [
+            f"t{last - 2}",
+            f"t{last - 1}",
+            f"t{last}",
+        ]
+        collector.clear()
+
+    def test_record_drops_when_queue_full(self, monkeypatch):
+        """Test that a full export queue drops spans instead of blocking"""
+        import queue
+        from datetime import datetime
+
+        collector.clear()
+        full = queue.Queue(maxsize=1)
+        full.put_nowait(None)
+        monkeypatch.setattr(collector, "_queue", full)
+        before = collector.dropped
+
+        collector.record(
+            Span(
+                trace_id="t",
+                span_id="s",
+                parent_span_id=None,
+                operation_name="op",
+                agent_name="Agent",
+                start_time=datetime.now(),
+            )
+        )
+        assert collector.dropped == before + 1
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_flush_after_fork(self):
+        """Test that a forked child does not wait on the parent's drain thread"""
+        import signal
+        from datetime import datetime
+
+        def span(trace_id):
+            return Span(
+                trace_id=trace_id,
+                span_id="s",
+                parent_span_id=None,
+                operation_name="op",
+                agent_name="Agent",
+                start_time=datetime.now(),
+            )
+
+        collector.clear()
+        collector.record(span("parent"))
+        collector.flush()
+
+        pid = os.fork()
+        if pid == 0:
+            signal.alarm(5)
+            code = 1
+            try:
+                collector.record(span("child"))
+                traces = collector.get_traces()
+                if [t["traceId"] for t in traces] == ["parent", "child"]:
+                    code = 0
+            finally:
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        collector.clear()
+
 
 class TestObservableDecorator:
     """Tests for @observable decorator"""
@@ -203,6 +372,128 @@ class TestObservableDecorator:
         # Should have recorded the span with ERROR status
         assert any(t["status"] == "ERROR" for t in traces)
 
+    def test_observable_error_log_rate_limited(self, caplog):
+        """Test that repeated failures log once but are all traced"""
+        from council.observability import middleware
+
+        collector.clear()
+        middleware._err_last.clear()
+
+        class MockAgent:
+            name = "LoopAgent"
+
+            @observable
+            def fail(self):
+                raise RuntimeError("again")
+
+        agent = MockAgent()
+        with caplog.at_level("ERROR", logger=middleware.__name__):
+            for _ in range(5):
+                with pytest.raises(RuntimeError):
+                    agent.fail()
+
+        assert len([r for r in caplog.records if "again" in r.getMessage()]) == 1
+        assert len(collector.get_traces()) == 5
+        collector.clear()
+
+    def test_observable_operation_name_per_class(self):
+        """Test that subclasses get their own operation name"""
+        collector.clear()
+
+        class BaseMock:
+            name = "Base"
+
+            @observable
+            def act(self):
+                return None
+
+        class ChildMock(BaseMock):
+            name = "Child"
+
+        BaseMock().act()
+        ChildMock().act()
+        ChildMock().act()
+
+        names = [t["operationName"] for t in collector.get_traces()]
+        assert names == ["BaseMock.act", "ChildMock.act", "ChildMock.act"]
+        collector.clear()
+
+    def test_observable_minimal_level_skips_success(self):
+        """Test that MINIMAL level only traces errors"""
+        from council.observability.middleware import TraceLevel
+
+        collector.clear()
+        collector.set_level(TraceLevel.MINIMAL)
+
+        class MockAgent:
+            name = "QuietAgent"
+
+            @observable
+            def ok(self):
+                return 1
+
+            @observable
+            def fail(self):
+                raise ValueError("boom")
+
+        agent = MockAgent()
+        try:
+            assert agent.ok() == 1
+            assert collector.get_traces() == []
+
+            with pytest.raises(ValueError):
+                agent.fail()
+            traces = collector.get_traces()
+            assert len(traces) == 1
+            assert traces[0]["status"] == "ERROR"
+            assert traces[0]["operationName"] == "MockAgent.fail"
+        finally:
+            collector.set_level(TraceLevel.NORMAL)
+            collector.clear()
+
+    def test_observable_minimal_level_error_duration(self):
+        """Test that MINIMAL error spans are timed from the call start"""
+        import time
+
+        from council.observability.middleware import TraceLevel
+
+        collector.clear()
+        collector.set_level(TraceLevel.MINIMAL)
+
+        class MockAgent:
+            name = "SlowAgent"
+
+            @observable
+            def fail(self):
+                time.sleep(0.02)
+                raise ValueError("boom")
+
+        try:
+            with pytest.raises(ValueError):
+                MockAgent().fail()
+            traces = collector.get_traces()
+            assert len(traces) == 1
+            assert traces[0]["duration"] >= 15
+        finally:
+            collector.set_level(TraceLevel.NORMAL)
+            collector.clear()
+
+
+class TestTimestampCache:
+    """Tests for the event timestamp cache"""
+
+    def test_iso_now_reused_within_millisecond(self, monkeypatch):
+        """Test that bursts of events share one formatted timestamp"""
+        from council.observability import middleware
+
+        clock = iter([1000.0, 1000.0004, 1000.002])
+        monkeypatch.setattr(middleware.time, "time", lambda: next(clock))
+        monkeypatch.setattr(middleware, "_ts_cache", (0.0, ""))
+
+        first = middleware._iso_now()
+        assert middleware._iso_now() is first
+        assert middleware._iso_now() != first
+
 
 class TestGenerators:
     """Tests for ID generators"""
@@ -182,3 +182,39 @@ class TestAdaptiveRouter:
 
         assert "ROUTING DECISION" in explanation
         assert "Risk Level" in explanation
+
+
+class TestLazyExports:
+    """Tests for lazy package-level exports."""
+
+    def test_submodules_load_on_first_access(self):
+        """Test that importing the package does not import every submodule."""
+        import subprocess
+
+        code = (
+            "import sys\n"
+            "from unittest.mock import MagicMock\n"
+            "sys.modules['litellm'] = MagicMock()\n"
+            "import council.orchestration as orch\n"
+            "assert 'council.orchestration.graph' not in sys.modules\n"
+            "graph_cls = orch.StateGraph\n"
+            "assert 'council.orchestration.graph' in sys.modules\n"
+            "from council.orchestration.graph import StateGraph\n"
+            "assert graph_cls is StateGraph\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+
+    def test_aliases_and_unknown_names(self):
+        """Test aliased exports and AttributeError for unknown names."""
+        import pytest
+        import council.orchestration as orch
+        from council.orchestration.collaboration import Vote
+
+        assert orch.CollabVote is Vote
+        assert "StateGraph" in dir(orch)
+        with pytest.raises(AttributeError):
+            orch.DoesNotExist
@@ -109,3 +109,22 @@ def test_window_with_summary_in_messages(temp_dir):
     # First message should be the summary
     assert msgs[0]["role"] == "system"
     assert "历史摘要" in msgs[0]["content"]
+
+
+def test_get_messages_cache_invalidation(temp_dir):
+    """Test rendered messages are cached and refreshed on mutation"""
+    session = LLMSession(agent_name="test", storage_dir=temp_dir)
+
+    session.add_message("user", "first")
+    first = session.get_messages()
+    assert session.get_messages() is first
+
+    session.add_message("assistant", "second")
+    msgs = session.get_messages()
+    assert msgs is not first
+    assert [m["content"] for m in msgs] == ["first", "second"]
+    assert session.get_messages(limit=1) == [{"role": "assistant", "content": "second"}]
+    assert session.get_messages(limit=5) is msgs
+
+    session.clear()
+    assert session.get_messages() == []
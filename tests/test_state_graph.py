@@ -320,3 +320,417 @@ class TestStateGraphIntegration:
 
         assert final_state.context["count"] == 5
         assert final_state.context["done"] is True
+
+
+class TestStateGraphCompiled:
+    """Tests for the compiled execution program (run / run_async)."""
+
+    def test_compile_invalidated_by_add_calls(self):
+        """Test the program is rebuilt after the graph changes."""
+        from council.orchestration.graph import StateGraph, State
+
+        graph = StateGraph()
+        graph.add_node("a", lambda s: s)
+        graph.set_entry_point("a")
+        graph.run(State())
+        assert graph._program is not None
+
+        def mark(state: State) -> State:
+            state.context["b"] = True
+            return state
+
+        graph.add_node("b", mark)
+        assert graph._program is None
+        graph.add_edge("a", "b")
+        assert graph.run(State()).context["b"] is True
+
+    def test_compiled_edges_are_pcs(self):
+        """Test static edges and decisions resolve to integer pcs."""
+        from council.orchestration.graph import OP_HALT, StateGraph, State
+
+        graph = StateGraph()
+        graph.add_node("a", lambda s: s)
+        graph.add_node("b", lambda s: s)
+        graph.add_edge("a", "b")
+        graph.add_conditional_edge("b", lambda s: s.context.get("go", ""))
+        graph.set_entry_point("a")
+        program = graph.compile()
+
+        pc_a, pc_b = graph._name_to_pc["a"], graph._name_to_pc["b"]
+        assert program[pc_a][5] == pc_b
+        condition = program[pc_b][4]
+        assert condition(State(context={"go": "a"})) == pc_a
+        assert condition(State()) == OP_HALT
+
+    async def test_run_async_node_kinds(self):
+        """Test parallel, approval and missing nodes in run_async."""
+        from council.orchestration.graph import StateGraph, State
+
+        async def branch_a(state: State) -> State:
+            state.context["a"] = 1
+            return state
+
+        def branch_b(state: State) -> State:
+            state.context["b"] = 2
+            return state
+
+        graph = StateGraph()
+        graph.add_async_node("branch_a", branch_a)
+        graph.add_node("branch_b", branch_b)
+        graph.add_parallel_nodes("fan", ["branch_a", "branch_b"], join_node="gate")
+
+        async def deny(state: State) -> bool:
+            return state.context.get("a") != 1
+
+        graph.add_approval_node("gate", deny)
+        graph.add_edge("gate", "never")
+        graph.set_entry_point("fan")
+
+        final = await graph.run_async(State())
+        assert final.context == {"a": 1, "b": 2}
+        assert final.approved is False
+        assert graph.get_execution_history() == ["fan", "gate"]
+
+    async def test_parallel_branches_fork_and_merge_changes(self):
+        """Test branches get isolated copies and only their changes merge."""
+        from council.orchestration.graph import StateGraph, State
+
+        def make_branch(key):
+            def branch(state: State) -> State:
+                state.context[key] = True
+                state.messages.append({"role": "assistant", "content": key})
+                return state
+
+            return branch
+
+        def rewrite(state: State) -> State:
+            state.context["shared"] = "changed"
+            return state
+
+        graph = StateGraph()
+        graph.add_node("a", make_branch("a"))
+        graph.add_node("rewrite", rewrite)
+        graph.add_node("b", make_branch("b"))
+        graph.add_parallel_nodes("fan", ["a", "rewrite", "b"], join_node="")
+        graph.set_entry_point("fan")
+
+        initial = State(
+            messages=[{"role": "user", "content": "go"}], context={"shared": "orig"}
+        )
+        final = await graph.run_async(initial)
+
+        assert final.context == {"shared": "changed", "a": True, "b": True}
+        assert [m["content"] for m in final.messages] == ["go", "a", "b"]
+
+        fork = initial.fork()
+        fork.context["x"] = 1
+        assert "x" not in initial.context and fork.messages == initial.messages
+
+    async def test_run_async_dispatch_skips_name_lookups(self):
+        """Test the compiled loop never consults node_types or edge dicts."""
+        from council.orchestration.graph import StateGraph, State
+
+        class Forbidden(dict):
+            def __getitem__(self, key):
+                raise AssertionError(f"runtime lookup of {key}")
+
+            get = __contains__ = __getitem__
+
+        async def left(state: State) -> State:
+            state.context["left"] = True
+            return state
+
+        graph = StateGraph()
+        graph.add_async_node("left", left)
+        graph.add_node("right", lambda s: s)
+        graph.add_parallel_nodes("fan", ["left", "right"], join_node="end")
+        graph.add_approval_node("end")
+        graph.set_entry_point("fan")
+        graph.compile()
+        for attr in (
+            "node_types",
+            "edges",
+            "conditional_edges",
+            "nodes",
+            "async_nodes",
+        ):
+            setattr(graph, attr, Forbidden(getattr(graph, attr)))
+
+        final = await graph.run_async(State())
+        assert final.context == {"left": True}
+        assert graph.get_execution_history() == ["fan", "end"]
+
+    def test_conditional_edge_cache_key(self):
+        """Test decisions are memoized per cache key when requested."""
+        from council.orchestration.graph import StateGraph, State
+
+        calls = []
+
+        def decide(state: State) -> str:
+            calls.append(state.context["status"])
+            return "done" if state.context["status"] == "ok" else ""
+
+        def finish(state: State) -> State:
+            state.context["finished"] = True
+            return state
+
+        graph = StateGraph()
+        graph.add_node("check", lambda s: s)
+        graph.add_node("done", finish)
+        graph.add_conditional_edge(
+            "check", decide, cache_key=lambda s: s.context["status"]
+        )
+        graph.set_entry_point("check")
+
+        for status in ("ok", "ok", "bad", "ok"):
+            final = graph.run(State(context={"status": status}))
+            assert final.context.get("finished", False) is (status == "ok")
+        assert calls == ["ok", "bad"]
+
+    async def test_run_async_conditional_to_unknown_node(self):
+        """Test a decision naming an unregistered node ends the run there."""
+        from council.orchestration.graph import StateGraph, State
+
+        graph = StateGraph()
+        graph.add_node("start", lambda s: s)
+        graph.add_conditional_edge("start", lambda s: "ghost")
+        graph.set_entry_point("start")
+
+        await graph.run_async(State())
+        assert graph.get_execution_history() == ["start", "ghost"]
+        assert graph.run(State()).context == {}
+
+    async def test_run_async_loop_edge(self):
+        """Test loop edges honour max_iterations."""
+        from council.orchestration.graph import StateGraph, State
+
+        def work(state: State) -> State:
+            state.context["n"] = state.context.get("n", 0) + 1
+            return state
+
+        graph = StateGraph()
+        graph.add_node("work", work)
+        graph.add_node("done", lambda s: s)
+        graph.add_edge("work", "done")
+        graph.add_loop_edge("work", "work", lambda s: True, max_iterations=3)
+        graph.set_entry_point("work")
+
+        final = await graph.run_async(State())
+        assert final.context["n"] == 4
+        assert graph.get_execution_history() == ["work"] * 4 + ["done"]
+
+
+class TestStateGraphCheckpoints:
+    """Tests for checkpoint persistence."""
+
+    def test_checkpoint_roundtrip(self, tmp_path, monkeypatch):
+        """Test checkpoints round-trip with and without orjson."""
+        from council.orchestration import graph as graph_module
+        from council.orchestration.graph import StateGraph, State
+
+        for has_orjson in {False, graph_module.HAS_ORJSON}:
+            monkeypatch.setattr(graph_module, "HAS_ORJSON", has_orjson)
+            graph = StateGraph(
+                name="wf", checkpoint_dir=str(tmp_path / str(has_orjson))
+            )
+            state = State(
+                messages=[{"role": "user", "content": "hi"}],
+                context={"step": 2, "nested": {"k": [1, 2]}},
+                loop_count=1,
+            )
+            checkpoint_id = graph.checkpoint(state, "code")
+
+            restored, node = graph.resume(checkpoint_id)
+            assert node == "code"
+            assert restored.to_dict() == state.to_dict()
+
+            [listed] = graph.list_checkpoints()
+            assert listed.id == checkpoint_id
+            assert listed.graph_name == "wf"
+
+    async def test_run_async_writes_checkpoints_off_loop(self, tmp_path):
+        """Test run_async checkpoints are snapshotted, written in threads and awaited."""
+        import threading
+
+        from council.orchestration.graph import StateGraph, State
+
+        def bump(state: State) -> State:
+            state.context["n"] = state.context.get("n", 0) + 1
+            return state
+
+        graph = StateGraph(name="wf", checkpoint_dir=str(tmp_path))
+        graph.add_node("a", bump)
+        graph.add_node("b", bump)
+        graph.add_edge("a", "b")
+        graph.set_entry_point("a")
+
+        threads = []
+        original = graph._write_checkpoint
+
+        def spy(checkpoint_id, data):
+            threads.append(threading.get_ident())
+            original(checkpoint_id, data)
+
+        graph._write_checkpoint = spy
+        await graph.run_async(State(), checkpoint_interval=1)
+
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+        assert not graph._pending_ckpt
+        saved = sorted(c.state_data["context"]["n"] for c in graph.list_checkpoints())
+        assert saved == [1, 2]
+
+    async def test_log_engine_batches_records(self, tmp_path, monkeypatch):
+        """Test the log engine writes checkpoint() through and batches run_async."""
+        from council.orchestration.graph import CheckpointLog, StateGraph, State
+
+        def make_graph():
+            return StateGraph(
+                name="wf",
+                checkpoint_dir=str(tmp_path),
+                checkpoint_engine="log",
+                checkpoint_batch_size=2,
+            )
+
+        graph = make_graph()
+        first = graph.checkpoint(State(context={"n": 1}), "a")
+        assert (tmp_path / CheckpointLog.FILENAME).exists()
+        assert make_graph().resume(first)[0].context == {"n": 1}
+        graph.checkpoint(State(context={"n": 2}), "b")
+        third = graph.checkpoint(State(context={"n": 3}), "c")
+
+        state, node = graph.resume(third)
+        assert (state.context, node) == ({"n": 3}, "c")
+        assert len(graph.list_checkpoints()) == 3
+        assert not list(tmp_path.glob("*.json"))
+
+        writes = []
+        original_write = CheckpointLog.write
+
+        def spy(log, records):
+            if records:
+                writes.append(len(records))
+            return original_write(log, records)
+
+        monkeypatch.setattr(CheckpointLog, "write", spy)
+
+        def bump(s: State) -> State:
+            s.context["n"] = s.context.get("n", 0) + 1
+            return s
+
+        for name in ("x", "y", "z"):
+            graph.add_node(name, bump)
+        graph.add_edge("x", "y")
+        graph.add_edge("y", "z")
+        graph.set_entry_point("x")
+        await graph.run_async(State(), checkpoint_interval=1)
+        assert writes == [2, 1]
+        assert len(make_graph().list_checkpoints()) == 6
+
+        assert graph.clear_checkpoints() == 6
+        assert graph.list_checkpoints() == []
+
+    def test_list_checkpoints_cached_until_directory_changes(
+        self, tmp_path, monkeypatch
+    ):
+        """Test list_checkpoints re-parses only after the directory changes."""
+        import os
+
+        from council.orchestration.graph import Checkpoint, StateGraph, State
+
+        graph = StateGraph(name="wf", checkpoint_dir=str(tmp_path))
+        graph.checkpoint(State(), "a")
+        graph.checkpoint(State(), "b")
+
+        parses = []
+        original = Checkpoint.from_json_bytes.__func__
+
+        def spy(cls, data):
+            parses.append(1)
+            return original(cls, data)
+
+        monkeypatch.setattr(Checkpoint, "from_json_bytes", classmethod(spy))
+
+        first = graph.list_checkpoints()
+        assert [c.graph_name for c in first] == ["wf", "wf"]
+        second = graph.list_checkpoints()
+        assert [c.graph_name for c in second] == ["wf", "wf"]
+        assert [c.id for c in second] == [c.id for c in first]
+        assert len(parses) == 2
+
+        graph.checkpoint(State(), "c")
+        assert len(graph.list_checkpoints()) == 3
+
+        # Files written by another process are picked up via the dir mtime
+        other = StateGraph(name="wf", checkpoint_dir=str(tmp_path))
+        other.checkpoint(State(), "d")
+        os.utime(tmp_path, ns=(1, 1))
+        assert len(graph.list_checkpoints()) == 4
+
+        assert graph.clear_checkpoints() == 4
+        assert graph.list_checkpoints() == []
+
+    def test_list_checkpoints_lazy_scan(self, tmp_path, monkeypatch):
+        """Test files are listed newest first and parsed only on access."""
+        import os
+
+        import pytest
+
+        from council.orchestration.graph import (
+            Checkpoint,
+            LazyCheckpoint,
+            StateGraph,
+            State,
+        )
+
+        graph = StateGraph(name="wf", checkpoint_dir=str(tmp_path))
+        ids = [graph.checkpoint(State(context={"n": n}), "a") for n in range(3)]
+        for i, checkpoint_id in enumerate(ids):
+            os.utime(tmp_path / f"{checkpoint_id}.json", ns=(i * 10**9, i * 10**9))
+        (tmp_path / "broken.json").write_text("{not json")
+        os.utime(tmp_path / "broken.json", ns=(0, 0))
+        (tmp_path / "notes.txt").write_text("ignored")
+
+        parses = []
+        original = Checkpoint.from_json_bytes.__func__
+
+        def spy(cls, data):
+            parses.append(1)
+            return original(cls, data)
+
+        monkeypatch.setattr(Checkpoint, "from_json_bytes", classmethod(spy))
+
+        listed = graph.list_checkpoints()
+        assert all(isinstance(c, LazyCheckpoint) for c in listed)
+        assert [c.id for c in listed[:3]] == ids[::-1]
+        assert listed[0].mtime_ns > listed[1].mtime_ns
+        assert parses == []
+
+        assert listed[0].state_data["context"] == {"n": 2}
+        assert listed[0].current_node == "a"
+        assert len(parses) == 1
+        with pytest.raises(ValueError, match="broken.json"):
+            listed[-1].timestamp
+        assert [c.id for c in listed if c.readable] == ids[::-1]
+
+    def test_lazy_checkpoint_copy_and_pickle(self, tmp_path):
+        """Test lazy checkpoints survive copy/pickle without recursing."""
+        import copy
+        import pickle
+
+        import pytest
+
+        from council.orchestration.graph import LazyCheckpoint, StateGraph, State
+
+        graph = StateGraph(name="wf", checkpoint_dir=str(tmp_path))
+        checkpoint_id = graph.checkpoint(State(context={"k": 1}), "a")
+        [lazy] = graph.list_checkpoints()
+
+        for clone in (copy.copy(lazy), pickle.loads(pickle.dumps(lazy))):
+            assert isinstance(clone, LazyCheckpoint)
+            assert clone.id == checkpoint_id
+            assert clone.state_data["context"] == {"k": 1}
+
+        bare = LazyCheckpoint.__new__(LazyCheckpoint)
+        with pytest.raises(AttributeError):
+            bare._checkpoint
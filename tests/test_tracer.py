@@ -21,6 +21,40 @@ class TestAgentTracer:
         assert tracer.service_name == "test-service"
         assert tracer.tracer is not None
 
+    def test_batch_span_processor_by_default(self):
+        """测试默认使用 BatchSpanProcessor 异步导出，Provider 进程内共享"""
+        import threading
+
+        import pytest
+
+        pytest.importorskip("opentelemetry.sdk")
+        from unittest.mock import patch
+
+        from council.observability import tracer as tracer_module
+
+        def build(**kwargs):
+            with (
+                patch.object(tracer_module, "_provider", None),
+                patch.object(
+                    tracer_module.trace, "set_tracer_provider"
+                ) as set_provider,
+                patch.object(tracer_module.atexit, "register"),
+            ):
+                tracer_module.AgentTracer(service_name="test", **kwargs)
+                threads = threading.active_count()
+                for _ in range(20):
+                    tracer_module.AgentTracer(service_name="other")
+                assert threading.active_count() == threads
+                [call] = set_provider.call_args_list
+                assert tracer_module._provider is call.args[0]
+                return call.args[0]._active_span_processor._span_processors
+
+        [batch] = build(queue_size=128, batch_size=16)
+        [simple] = build(debug=True)
+        assert isinstance(batch, tracer_module.BatchSpanProcessor)
+        assert isinstance(simple, tracer_module.SimpleSpanProcessor)
+        batch.shutdown()
+
     def test_trace_llm_call(self):
         """测试追踪 LLM 调用"""
         from council.observability.tracer import AgentTracer
@@ -37,6 +71,84 @@ class TestAgentTracer:
             span.set_attribute("gen_ai.token_count.prompt", 3)
             span.set_attribute("gen_ai.token_count.completion", 2)
 
+    def test_truncate_helper(self):
+        """测试截断辅助函数"""
+        from council.observability.tracer import _truncate
+
+        short = "hello"
+        assert _truncate(short, 10) is short
+        assert _truncate("x" * 20, 5) == "xxxxx"
+        assert _truncate({"a": 1}, 4) == "{'a'"
+
+    def test_mock_span_is_shared_noop(self):
+        """测试 MockSpan 为共享的无状态 no-op"""
+        from council.observability.tracer import MockSpan, MockTracer
+
+        span = MockSpan()
+        assert not hasattr(span, "__dict__")
+        assert not span.is_recording()
+        span.set_attribute("k", "v")
+        assert span.get_attribute("k") is None
+
+        tracer = MockTracer()
+        with tracer.start_as_current_span("a") as first:
+            pass
+        with tracer.start_as_current_span("b") as second:
+            pass
+        assert first is second
+
+    def test_recording_mock_span(self):
+        """测试 RecordingMockSpan 记录属性"""
+        from council.observability.tracer import RecordingMockSpan
+
+        span = RecordingMockSpan()
+        assert span.is_recording()
+        span.set_attribute("k", "v")
+        assert span.get_attribute("k") == "v"
+
+    def test_mock_span_disabled_skips_attributes(self):
+        """测试关闭 RecordingMockSpan 后不再记录属性"""
+        from unittest.mock import patch
+        from council.observability.tracer import RecordingMockSpan
+
+        with patch.object(RecordingMockSpan, "ENABLED", False):
+            span = RecordingMockSpan()
+            assert not span.is_recording()
+            span.set_attribute("k", "v")
+            assert span.get_attribute("k") is None
+
+    def test_gen_ai_key_cached(self):
+        """测试 kwargs 属性键缓存复用"""
+        from council.observability.tracer import _gen_ai_key
+
+        key = _gen_ai_key("temperature")
+        assert key == "gen_ai.temperature"
+        assert _gen_ai_key("temperature") is key
+
+    def test_trace_methods_share_span_factory(self):
+        """测试 trace_* 通过同一个 span 工厂创建 span"""
+        from contextlib import nullcontext
+        from council.observability.tracer import AgentTracer, RecordingMockSpan
+
+        tracer = AgentTracer(service_name="test-factory")
+        names = []
+
+        def factory(name):
+            names.append(name)
+            return nullcontext(RecordingMockSpan())
+
+        tracer._start_span = factory
+
+        with tracer.trace_llm_call("gpt-4o", "hi", temperature=0.1) as span:
+            assert span.get_attribute("gen_ai.system") == "gpt-4o"
+            assert span.get_attribute("gen_ai.temperature") == 0.1
+        with tracer.trace_tool_call("search", {"q": "x"}) as span:
+            assert span.get_attribute("tool.arguments") == "{'q': 'x'}"
+        with tracer.trace_agent_step("coder", "think") as span:
+            assert span.get_attribute("agent.step_type") == "think"
+
+        assert names == ["llm_call", "tool_call", "agent_think"]
+
     def test_trace_tool_call(self):
         """测试追踪工具调用"""
         from council.observability.tracer import AgentTracer
@@ -101,6 +213,22 @@ class TestSpanAttributes:
         assert data["agent.name"] == "Orchestrator"
         assert data["agent.confidence"] == 0.85
 
+    def test_set_on_matches_to_dict(self):
+        """测试 set_on 直接写入与 to_dict 一致的属性"""
+        from council.observability.tracer import (
+            AgentAttributes,
+            LLMAttributes,
+            RecordingMockSpan,
+        )
+
+        for attrs in (
+            LLMAttributes(model="gpt-4o", prompt_tokens=3, completion_tokens=4),
+            AgentAttributes(agent_name="Coder", task="fix", confidence=0.5),
+        ):
+            span = RecordingMockSpan()
+            attrs.set_on(span)
+            assert span._attributes == attrs.to_dict()
+
 
 # =============================================================
 # Test: Metrics
@@ -123,6 +251,28 @@ class TestMetrics:
         assert stats["total_prompt_tokens"] == 300
         assert stats["total_completion_tokens"] == 150
 
+    def test_token_counter_threads(self):
+        """测试多线程 Token 计数汇总"""
+        import threading
+
+        from council.observability.tracer import AgentTracer
+
+        tracer = AgentTracer(service_name="test")
+
+        def worker():
+            for _ in range(100):
+                tracer.record_tokens(model="m", prompt=2, completion=1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = tracer.get_stats()
+        assert stats["total_prompt_tokens"] == 800
+        assert stats["total_completion_tokens"] == 400
+
     def test_latency_histogram(self):
         """测试延迟直方图"""
         from council.observability.tracer import AgentTracer
@@ -136,3 +286,296 @@ class TestMetrics:
         # 延迟应该被记录
         stats = tracer.get_stats()
         assert "avg_latency_ms" in stats
+
+    def test_latency_window_bounded(self):
+        """测试延迟样本有界且平均值基于累计"""
+        from council.observability.tracer import AgentTracer
+
+        class SmallWindowTracer(AgentTracer):
+            LATENCY_WINDOW = 2
+
+        tracer = SmallWindowTracer(service_name="test")
+
+        for _ in range(5):
+            with tracer.trace_llm_call(model="test", prompt="p"):
+                pass
+
+        stats = tracer.get_stats()
+        assert len(stats["latencies"]) == 2
+        assert stats["avg_latency_ms"] >= 0
+        assert sum(c[3] for c in tracer._counters.values()) == 5
+
+    def test_thread_counters_bounded(self):
+        """测试短生命周期线程退出后计数器被回收且总数不丢失"""
+        import threading
+
+        from council.observability.tracer import AgentTracer
+
+        tracer = AgentTracer(service_name="test")
+        tracer.record_tokens("test", 1, 2)
+
+        for _ in range(20):
+            threads = [
+                threading.Thread(target=tracer.record_tokens, args=("test", 10, 5))
+                for _ in range(10)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert len(tracer._counters) <= 2
+        stats = tracer.get_stats()
+        assert stats["total_prompt_tokens"] == 1 + 200 * 10
+        assert stats["total_completion_tokens"] == 2 + 200 * 5
+
+
+# =============================================================
+# Test: StructuredLogger
+# =============================================================
+
+
+class TestStructuredLogger:
+    """结构化日志测试"""
+
+    def test_json_output_written_in_background(self, capsys):
+        """测试 JSON 日志经后台线程写出"""
+        import json
+
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test")
+        slogger.log("info", "custom", "agent", "first")
+        slogger.log("info", "custom", "agent", "second")
+        slogger.flush()
+
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == ["first", "second"]
+
+    def test_full_queue_drops_entries(self, monkeypatch):
+        """测试队列满时丢弃并计数"""
+        import queue
+
+        from council.observability import tracer as tracer_module
+
+        monkeypatch.setattr(tracer_module, "_log_writer", object())  # 不启动写线程
+        monkeypatch.setattr(tracer_module, "_log_queue", queue.Queue(maxsize=1))
+
+        slogger = tracer_module.StructuredLogger("test")
+        slogger.log("info", "custom", "agent", "kept")
+        slogger.log("info", "custom", "agent", "dropped")
+        assert slogger.dropped == 1
+
+    def test_failed_write_counts_dropped(self, monkeypatch):
+        """测试写出失败的整批条目计入丢弃数"""
+
+        class BrokenStdout:
+            def write(self, text):
+                raise OSError("closed")
+
+            def flush(self):
+                pass
+
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test")
+        slogger.log("info", "custom", "agent", "warmup")
+        slogger.flush()
+
+        monkeypatch.setattr("sys.stdout", BrokenStdout())
+        for i in range(3):
+            slogger.log("info", "custom", "agent", f"lost{i}")
+        slogger.flush()
+        assert slogger.dropped == 3
+
+    def test_entry_serialized_at_log_time(self, monkeypatch):
+        """测试条目在 log 时即序列化，之后修改 data 不影响输出"""
+        import json
+        import queue
+
+        from council.observability import tracer as tracer_module
+
+        monkeypatch.setattr(tracer_module, "_log_writer", object())  # 不启动写线程
+        monkeypatch.setattr(tracer_module, "_log_queue", queue.Queue())
+
+        slogger = tracer_module.StructuredLogger("test")
+        payload = ["before"]
+        slogger.log("info", "custom", "agent", "msg", items=payload)
+        payload.append("after")
+
+        line, owner = tracer_module._log_queue.get_nowait()
+        assert owner is slogger
+        assert json.loads(line)["data"]["items"] == ["before"]
+
+    def test_loggers_share_one_writer(self, capsys):
+        """测试所有日志器共用一个写线程"""
+        import threading
+
+        from council.observability.tracer import StructuredLogger
+
+        StructuredLogger("warmup").log("info", "custom", "agent", "start")
+        threads = threading.active_count()
+        loggers = [StructuredLogger(f"svc{i}") for i in range(50)]
+        for slogger in loggers:
+            slogger.log("info", "custom", "agent", slogger.service_name)
+        loggers[0].flush()
+
+        assert threading.active_count() == threads
+        assert capsys.readouterr().out.count("svc") == 50
+
+    def test_estimate_cost(self):
+        """测试成本估算"""
+        import pytest
+
+        from council.observability.tracer import MODEL_PRICING, estimate_cost
+
+        assert estimate_cost("gpt-4o", 1000, 1000) == pytest.approx(0.02)
+        assert estimate_cost("unknown-model", 1000, 0) == pytest.approx(0.001)
+
+        MODEL_PRICING["test-model"] = {"input": 0.01, "output": 0.02}
+        try:
+            assert estimate_cost("test-model", 2000, 500) == pytest.approx(0.03)
+        finally:
+            del MODEL_PRICING["test-model"]
+
+    def test_now_iso_cached_per_second(self, monkeypatch):
+        """测试时间戳按秒缓存并保留毫秒"""
+        from datetime import datetime
+
+        from council.observability import tracer as tracer_module
+
+        slogger = tracer_module.StructuredLogger("test")
+        clock = iter([1700000000.25, 1700000000.5, 1700000001.0])
+        monkeypatch.setattr(tracer_module.time, "time", lambda: next(clock))
+
+        base = datetime.fromtimestamp(1700000000).isoformat()
+        assert slogger._now_iso() == f"{base}.250"
+        assert slogger._now_iso() == f"{base}.500"
+        assert slogger._now_iso().endswith(".000")
+        assert slogger._ts_cache[0] == 1700000001
+
+    def test_log_entry_to_json(self):
+        """测试日志条目 JSON 序列化"""
+        import json
+        from datetime import datetime
+
+        from council.observability.tracer import StructuredLogEntry
+
+        entry = StructuredLogEntry(
+            timestamp="t",
+            level="info",
+            event_type="custom",
+            agent="代理",
+            message="hi",
+            data={"when": datetime(2026, 1, 1), 1: "int key"},
+        )
+        data = json.loads(entry.to_json())
+        assert data["agent"] == "代理"
+        assert "model" not in data
+        assert data["data"]["1"] == "int key"
+        assert data["data"]["when"].startswith("2026-01-01")
+
+    def test_records_use_slots(self):
+        """测试热路径记录使用 __slots__"""
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test", output_json=False)
+        decision = slogger.log_decision("planner", "Plan", "why", confidence=0.5)
+        usage = slogger.log_token_usage("gpt-4o", 10, 5, agent="coder")
+
+        assert not hasattr(decision, "__dict__")
+        assert not hasattr(usage, "__dict__")
+        assert decision.to_dict()["rationale"] == "why"
+        assert usage.to_dict()["total_tokens"] == 15
+
+    def test_bounded_history_and_summary(self):
+        """测试记录有界且汇总为累计值"""
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test", output_json=False, max_records=2)
+        for _ in range(3):
+            slogger.log_decision("planner", "Plan", "why")
+            slogger.log_token_usage("gpt-4o", 100, 50)
+        slogger.log_token_usage("deepseek-chat", 10, 10)
+
+        assert len(slogger.get_decision_chain()) == 2
+        assert len(slogger.get_token_usage()) == 2
+
+        summary = slogger.get_usage_summary()
+        assert summary["total_calls"] == 4
+        assert summary["by_model"]["gpt-4o"]["calls"] == 3
+        assert summary["by_model"]["gpt-4o"]["total_tokens"] == 450
+        assert summary["by_model"]["deepseek-chat"]["calls"] == 1
+
+        slogger.clear()
+        assert slogger.get_usage_summary()["by_model"] == {}
+
+    def test_disabled_level_skips_entry(self):
+        """测试底层 logger 未启用该级别时不构建日志条目"""
+        import logging
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test", output_json=False)
+        log = logging.getLogger("council.observability.tracer")
+        old_level = log.level
+        log.setLevel(logging.WARNING)
+        try:
+            assert slogger.log("info", "custom", "agent", "quiet") is None
+            entry = slogger.log("error", "custom", "agent", "loud")
+            assert entry is not None and entry.level == "error"
+        finally:
+            log.setLevel(old_level)
+
+    def test_snapshot_reused_until_change(self):
+        """测试快照在无新记录时复用"""
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test", output_json=False)
+        slogger.log_decision("planner", "A", "why")
+
+        snap = slogger._decision_snapshot()
+        assert slogger._decision_snapshot() is snap
+        chain = slogger.get_decision_chain()
+        chain.clear()  # 返回的是副本
+        assert len(slogger.get_decision_chain()) == 1
+
+        slogger.log_decision("planner", "B", "why")
+        assert slogger._decision_snapshot() is not snap
+        assert [r.decision for r in slogger.get_decision_chain()] == ["A", "B"]
+
+        slogger.clear()
+        assert slogger.get_decision_chain() == []
+        assert slogger.get_token_usage() == []
+
+    def test_llm_call_previews_truncated(self):
+        """测试 LLM 调用预览仅在超长时截断"""
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test", output_json=True)
+        slogger._emit = lambda entry, level=None: None  # 不写 stdout
+        short = "short prompt"
+        entry = slogger.log_llm_call("coder", "gpt-4o", short, "r" * 300)
+
+        assert entry.data["prompt_preview"] is short
+        assert len(entry.data["response_preview"]) == 200
+
+    def test_export_decision_chain_formats(self):
+        """测试决策链 json/ndjson 导出与流式写入"""
+        import io
+        import json
+        from council.observability.tracer import StructuredLogger
+
+        slogger = StructuredLogger("test", output_json=False)
+        slogger.log_decision("planner", "方案A", "why", confidence=0.9)
+        slogger.log_decision("coder", "Plan B", "because")
+
+        as_json = slogger.export_decision_chain("json")
+        sink = io.StringIO()
+        assert slogger.export_decision_chain("json", file=sink) == ""
+        assert sink.getvalue() == as_json
+
+        lines = slogger.export_decision_chain("ndjson").splitlines()
+        assert [json.loads(line)["decision"] for line in lines] == ["方案A", "Plan B"]
+        sink = io.StringIO()
+        slogger.export_decision_chain("ndjson", file=sink)
+        assert sink.getvalue().splitlines() == lines